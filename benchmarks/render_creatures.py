@@ -0,0 +1,68 @@
+"""Frame time of the creature pass against creature count.
+
+Compares one `Surface.blit` call per creature (how `_draw_creatures` used to
+work) with the batched `Surface.fblits` pass it uses now.
+
+    uv run python benchmarks/render_creatures.py --counts 100 1000 10000
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from sim.config import SimConfig  # noqa: E402
+from sim.game import GameState, create_game  # noqa: E402
+from sim.render import SPRITES, _draw_creatures  # noqa: E402
+
+
+def _draw_creatures_one_by_one(screen: pygame.Surface, state: GameState, config: SimConfig) -> None:
+    for creature in state.creatures:
+        sprite = SPRITES.sprite(creature.kind, creature.radius)
+        half = sprite.get_width() // 2
+        screen.blit(sprite, (int(creature.pos.x) - half, int(creature.pos.y) - half))
+
+
+def _frame_ms(draw, screen: pygame.Surface, state: GameState, config: SimConfig, frames: int) -> float:
+    draw(screen, state, config)
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(screen, state, config)
+    return 1000.0 * (time.perf_counter() - start) / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1_000, 5_000, 20_000])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--width", type=int, default=60, help="Board width in cells.")
+    parser.add_argument("--height", type=int, default=40, help="Board height in cells.")
+    parser.add_argument("--radius", type=int, default=6)
+    args = parser.parse_args()
+
+    pygame.init()
+    try:
+        print(f"{'creatures':>10} {'blit loop':>12} {'fblits':>12} {'speedup':>8}")
+        for count in args.counts:
+            config = SimConfig(
+                board_width=args.width,
+                board_height=args.height,
+                creature_count=count,
+                creature_radius=args.radius,
+                obstacle_count=0,
+                random_seed=0,
+            )
+            screen = pygame.display.set_mode((config.window_width, config.window_height))
+            state = create_game(config)
+            before = _frame_ms(_draw_creatures_one_by_one, screen, state, config, args.frames)
+            after = _frame_ms(_draw_creatures, screen, state, config, args.frames)
+            print(f"{count:>10} {before:>9.3f} ms {after:>9.3f} ms {before / after:>7.2f}x")
+    finally:
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
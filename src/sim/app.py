@@ -1,15 +1,29 @@
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from contextlib import ExitStack
 from datetime import datetime
-from dataclasses import replace
+from dataclasses import dataclass, replace
 from pathlib import Path
 import random
+from typing import TYPE_CHECKING
 
 from .config import SimConfig
-from .game import create_game, creature_counts, step_game
+from .game import GameState, create_game, creature_counts, step_game
+from .metrics import MetricsWriter, TickMetrics
 from .rps import CreatureType
+from .stats import TickStats
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointRecorder
+    from .record import FrameRecorder
+    from .replay import ReplayWriter
 
 
 def winner_kind_or_none(state) -> CreatureType | None:
-    counts = creature_counts(state)
+    return _winner_from_counts(creature_counts(state))
+
+
+def _winner_from_counts(counts: Counter[CreatureType]) -> CreatureType | None:
     alive = [kind for kind in CreatureType if counts[kind] > 0]
     if len(alive) == 1:
         return alive[0]
@@ -278,10 +292,20 @@ def _draw_winner_banner(screen, winner: CreatureType) -> None:
     screen.blit(body, body.get_rect(center=(panel.centerx, panel.top + 82)))
 
 
-def run(config: SimConfig | None = None) -> None:
+def _replay_path(path: Path, game_number: int) -> Path:
+    """`path` for the first game of a session, then `name-2.ext`, `name-3.ext`, ..."""
+    return path if game_number == 0 else path.with_stem(f"{path.stem}-{game_number + 1}")
+
+
+def run(
+    config: SimConfig | None = None,
+    sim_process: bool = False,
+    dirty_rects: bool = False,
+    save_replay: str | Path | None = None,
+) -> None:
     import pygame
 
-    from .render import draw_state
+    from .render import SPRITES, DirtyRects, LevelOfDetail, draw_state, draw_state_dirty
 
     config = config or SimConfig()
     rng = random.Random(config.random_seed)
@@ -292,6 +316,7 @@ def run(config: SimConfig | None = None) -> None:
     clock = pygame.time.Clock()
 
     app_running = True
+    game_number = 0
     while app_running:
         selected_config = _run_start_menu(screen, config)
         if selected_config is None:
@@ -299,13 +324,29 @@ def run(config: SimConfig | None = None) -> None:
         config = selected_config
 
         state = create_game(config)
+        SPRITES.prebuild(config.creature_radius)
+        simulation = None
+        if sim_process:
+            from .worker import SimulationProcess
+
+            simulation = SimulationProcess(state, config)
+            simulation.start()
+        replay = None
+        if save_replay is not None:
+            from .replay import ReplayWriter
+
+            replay = ReplayWriter(_replay_path(Path(save_replay), game_number))
+        game_number += 1
         running = True
         speed_multiplier = 1.0
         screenshot_requested = False
         show_debug_boundaries = False
+        tick_stats: TickStats | None = None
+        dirty = DirtyRects()
+        lod = LevelOfDetail(config.lod_dots_above, config.lod_heatmap_above)
         winner = winner_kind_or_none(state)
         winner_announced = False
-        draw_state(screen, state, config, show_debug_boundaries=show_debug_boundaries)
+        draw_state(screen, state, config, show_debug_boundaries=show_debug_boundaries, lod=lod)
         if winner is not None:
             _draw_winner_banner(screen, winner)
         _draw_restart_button(screen)
@@ -332,6 +373,11 @@ def run(config: SimConfig | None = None) -> None:
                         show_debug_boundaries = not show_debug_boundaries
                         state_label = "on" if show_debug_boundaries else "off"
                         print(f"Collision debug {state_label}")
+                    elif event.key == pygame.K_t:
+                        tick_stats = None if tick_stats is not None else TickStats()
+                        print(f"Tick timings {'on' if tick_stats is not None else 'off'}")
+                    elif event.key == pygame.K_l:
+                        print(f"Level of detail: {lod.cycle()}")
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     if _click_hits_restart(event.pos, screen.get_width()):
                         restart_requested = True
@@ -341,7 +387,17 @@ def run(config: SimConfig | None = None) -> None:
             if restart_requested or not app_running:
                 continue
 
-            if winner is None:
+            if simulation is not None:
+                # The worker keeps its own clock; just show its latest complete tick.
+                simulation.set_speed(speed_multiplier)
+                snapshot = simulation.latest()
+                if snapshot is not None:
+                    state = snapshot.state
+                    winner = snapshot.winner
+                if winner is not None and not winner_announced:
+                    print(f"Winner: {winner.value} at tick {state.tick}")
+                    winner_announced = True
+            elif winner is None:
                 state = step_game(
                     state,
                     rng,
@@ -350,55 +406,402 @@ def run(config: SimConfig | None = None) -> None:
                     grow_on_win=config.grow_on_win,
                     encounter_distance=config.creature_radius * 2,
                     dt_seconds=dt_seconds * speed_multiplier * config.tps_multiplier,
+                    stats=tick_stats,
+                    continuous_collision=config.continuous_collision,
                 )
                 winner = winner_kind_or_none(state)
                 if winner is not None and not winner_announced:
                     print(f"Winner: {winner.value} at tick {state.tick}")
                     winner_announced = True
-            draw_state(screen, state, config, show_debug_boundaries=show_debug_boundaries)
+            if replay is not None:
+                replay.capture(state)
+            update_rects = None
+            if dirty_rects and winner is None:
+                update_rects = draw_state_dirty(
+                    screen,
+                    state,
+                    config,
+                    dirty,
+                    show_debug_boundaries=show_debug_boundaries,
+                    tick_stats=tick_stats,
+                    lod=lod,
+                )
+            else:
+                # The winner banner dims the whole screen, so it always needs a full frame.
+                draw_state(
+                    screen,
+                    state,
+                    config,
+                    show_debug_boundaries=show_debug_boundaries,
+                    tick_stats=tick_stats,
+                    lod=lod,
+                )
+            if tick_stats is not None and tick_stats.ticks >= config.fps:
+                # Average the overlay over roughly a second of ticks.
+                tick_stats = TickStats()
             if winner is not None:
                 _draw_winner_banner(screen, winner)
             _draw_restart_button(screen)
-            pygame.display.flip()
+            if update_rects is None:
+                pygame.display.flip()
+            else:
+                update_rects.append(pygame.Rect(*_restart_button_rect(screen.get_width())))
+                pygame.display.update(update_rects)
             if screenshot_requested:
                 file_path = _save_screenshot(screen)
                 print(f"Screenshot saved: {file_path}")
                 screenshot_requested = False
 
+        if simulation is not None:
+            simulation.close()
+        if replay is not None:
+            replay.finish(state)
+            print(f"Saved a {replay.close()}-frame replay to {replay.path}")
+
+    pygame.quit()
+
+
+def _draw_replay_timeline(screen, position: int, last: int) -> None:
+    import pygame
+
+    width, height = screen.get_size()
+    pygame.draw.rect(screen, (205, 210, 218), (0, height - 5, width, 5))
+    filled = width if last == 0 else int(width * position / last)
+    pygame.draw.rect(screen, (70, 80, 100), (0, height - 5, filled, 5))
+
+
+def view_replay(path: str | Path, fps: int = 60) -> None:
+    """Play a saved replay in a window.
+
+    Space pauses, Left/Right step one frame, Page Up/Down jump a tenth of the
+    recording, Home/End go to either end, [ and ] change the playback speed
+    and L cycles the level of detail.
+    """
+    import pygame
+
+    from .render import LevelOfDetail, draw_state
+    from .replay import Replay
+
+    config = SimConfig()
+    with Replay(path) as replay:
+        if len(replay) == 0:
+            print(f"{path} has no frames")
+            return
+        last = len(replay) - 1
+        jump = max(1, len(replay) // 10)
+        pygame.init()
+        screen = pygame.display.set_mode((int(replay.board.width), int(replay.board.height)))
+        pygame.display.set_caption(f"RPS Battle replay: {Path(path).name}")
+        clock = pygame.time.Clock()
+        lod = LevelOfDetail(config.lod_dots_above, config.lod_heatmap_above)
+        position = 0.0
+        speed = 1.0
+        playing = True
+        running = True
+        while running:
+            clock.tick(fps)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type != pygame.KEYDOWN:
+                    continue
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    playing = False
+                    position = int(position) + (1 if event.key == pygame.K_RIGHT else -1)
+                elif event.key == pygame.K_PAGEUP:
+                    position -= jump
+                elif event.key == pygame.K_PAGEDOWN:
+                    position += jump
+                elif event.key == pygame.K_HOME:
+                    position = 0
+                elif event.key == pygame.K_END:
+                    position = last
+                elif event.key == pygame.K_LEFTBRACKET:
+                    speed = max(0.25, speed / 2)
+                    print(f"Speed x{speed:.2f}")
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    speed = min(64.0, speed * 2)
+                    print(f"Speed x{speed:.2f}")
+                elif event.key == pygame.K_l:
+                    print(f"Level of detail: {lod.cycle()}")
+            if playing:
+                position += speed
+            position = max(0.0, min(float(last), position))
+            draw_state(screen, replay.state(int(position)), config, lod=lod)
+            _draw_replay_timeline(screen, int(position), last)
+            pygame.display.flip()
     pygame.quit()
 
 
+@dataclass(frozen=True)
+class HeadlessResult:
+    winner: CreatureType | None
+    ticks: int
+    counts: Counter[CreatureType]
+
+
+def _finish_recordings(recorders, to_game, state) -> None:
+    if recorders:
+        current = to_game(state)
+        for recorder in recorders:
+            recorder.finish(current)
+
+
+def _headless_engine(
+    config: SimConfig, engine: str, dt_seconds: float, stats, max_ticks: int | None, state
+):
+    """`state` in `engine`'s representation, and that engine's count, contacts, advance and to_game."""
+    if stats is not None and engine != "step":
+        raise ValueError("Tick stats are only recorded by the 'step' engine")
+    if config.continuous_collision and engine not in ("step", "kinetic"):
+        raise ValueError("Continuous collision is only implemented by the 'step' engine")
+    if config.continuous_collision and engine == "step" and config.obstacle_collision == "sdf":
+        raise ValueError("Continuous collision sweeps exact obstacles, not the 'sdf' collision mode")
+    rng = random.Random(config.random_seed)
+    step_options = dict(
+        convert_loser_to_winner=config.convert_loser_to_winner,
+        bounce_off_creatures=config.bounce_off_creatures,
+        grow_on_win=config.grow_on_win,
+        encounter_distance=config.creature_radius * 2,
+        dt_seconds=dt_seconds * config.tps_multiplier,
+    )
+
+    if engine == "array":
+        from .soa import array_creature_counts, step_array_state, to_array_state
+        from .soa import to_game_state as array_to_game_state
+
+        state = to_array_state(state)
+        count = array_creature_counts
+        to_game = array_to_game_state
+
+        def contacts(current):
+            return len(current.active_collision_pairs)
+
+        def advance(current):
+            return step_array_state(current, **step_options)
+    elif engine == "inplace":
+        from .inplace import mutable_creature_counts, step_game_inplace, to_mutable_state
+        from .inplace import to_game_state as to_game
+
+        state = to_mutable_state(state)
+        count = mutable_creature_counts
+
+        def contacts(current):
+            return len(current.active_collision_pairs)
+
+        def advance(current):
+            step_game_inplace(current, **step_options)
+            return current
+    elif engine == "kinetic":
+        from .kinetic import kinetic_creature_counts, step_kinetic_state, to_kinetic_state
+        from .kinetic import to_game_state as to_game
+
+        state = to_kinetic_state(state, creature_radius=config.creature_radius, **step_options)
+        count = kinetic_creature_counts
+
+        def contacts(current):
+            return len(current.contacts)
+
+        def advance(current):
+            return step_kinetic_state(current, max_tick=max_ticks)
+    elif engine == "step":
+        count = creature_counts
+
+        def to_game(current):
+            return current
+
+        def contacts(current):
+            return len(current.active_collision_pairs)
+
+        def advance(current):
+            return step_game(
+                current,
+                rng,
+                stats=stats,
+                continuous_collision=config.continuous_collision,
+                **step_options,
+            )
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+    return state, count, contacts, advance, to_game
+
+
+def iter_game(
+    config: SimConfig,
+    dt_seconds: float = 1.0 / 60.0,
+    every: int | None = 1,
+    engine: str = "step",
+    max_ticks: int | None = None,
+    initial_state: GameState | None = None,
+    snapshots: bool = False,
+    stats: TickStats | None = None,
+    recorders: Sequence["FrameRecorder | ReplayWriter | CheckpointRecorder"] = (),
+) -> Iterator[TickMetrics]:
+    """Play one game lazily, yielding its metrics every `every` ticks and on its last tick.
+
+    The game ends with a winner or at `max_ticks` (never, when None); stop
+    iterating to end it earlier. `every=None` yields only the last tick.
+    Metrics are only gathered for ticks that are yielded, and a full
+    `GameState` snapshot is only built for them with `snapshots=True`, so
+    sparse sampling leaves just the engine's own stepping. Recorders are
+    driven as in `play_headless`.
+    """
+    if every is not None and every < 1:
+        raise ValueError("Metrics can be recorded at most once per tick")
+    state = create_game(config) if initial_state is None else initial_state
+    engine_state, *engine_functions = _headless_engine(
+        config, engine, dt_seconds, stats, max_ticks, state
+    )
+    return _iter_metrics(engine_state, *engine_functions, every, max_ticks, snapshots, recorders)
+
+
+def _iter_metrics(
+    state, count, contacts, advance, to_game, every, max_ticks, snapshots, recorders
+) -> Iterator[TickMetrics]:
+    next_record = state.tick
+    recorded_conversions = state.conversions
+    while True:
+        if recorders and state.tick >= min(recorder.next_tick for recorder in recorders):
+            current = to_game(state)
+            for recorder in recorders:
+                recorder.capture(current)
+        counts = count(state)
+        done = _winner_from_counts(counts) is not None or (
+            max_ticks is not None and state.tick >= max_ticks
+        )
+        if done:
+            _finish_recordings(recorders, to_game, state)
+        if done or (every is not None and state.tick >= next_record):
+            yield TickMetrics(
+                tick=state.tick,
+                rock=counts[CreatureType.ROCK],
+                paper=counts[CreatureType.PAPER],
+                scissors=counts[CreatureType.SCISSORS],
+                contacts=contacts(state),
+                conversions=state.conversions - recorded_conversions,
+                state=to_game(state) if snapshots else None,
+            )
+            recorded_conversions = state.conversions
+            if every is not None:
+                next_record = ((state.tick // every) + 1) * every
+        if done:
+            return
+        state = advance(state)
+
+
+def _headless_result(metrics: TickMetrics) -> HeadlessResult:
+    return HeadlessResult(winner=metrics.winner, ticks=metrics.tick, counts=metrics.counts)
+
+
+def play_headless(
+    config: SimConfig,
+    max_ticks: int = 10_000,
+    dt_seconds: float = 1.0 / 60.0,
+    engine: str = "step",
+    stats: TickStats | None = None,
+    recorders: Sequence["FrameRecorder | ReplayWriter | CheckpointRecorder"] = (),
+    initial_state: GameState | None = None,
+) -> HeadlessResult:
+    """Play one game without a window until it has a winner or reaches `max_ticks`.
+
+    `initial_state`, such as a restored checkpoint, replaces the game
+    `create_game(config)` would deal; ticks carry on from its tick.
+    Recorders see the game every tick they ask for through `next_tick`,
+    plus its final state.
+    """
+    games = iter_game(
+        config,
+        dt_seconds,
+        every=None,
+        engine=engine,
+        max_ticks=max_ticks,
+        initial_state=initial_state,
+        stats=stats,
+        recorders=recorders,
+    )
+    for last in games:
+        pass
+    return _headless_result(last)
+
+
 def run_headless(
     config: SimConfig | None = None,
     max_ticks: int = 10_000,
     dt_seconds: float = 1.0 / 60.0,
+    engine: str = "step",
+    profile: bool = False,
+    record: str | Path | None = None,
+    record_every: int = 1,
+    record_format: str = "png",
+    save_replay: str | Path | None = None,
+    save_replay_every: int = 1,
+    from_checkpoint: str | Path | None = None,
+    save_checkpoint: str | Path | None = None,
+    metrics_out: str | Path | None = None,
+    metrics_every: int = 1,
 ) -> CreatureType | None:
     config = config or SimConfig()
-    rng = random.Random(config.random_seed)
-    state = create_game(config)
-
-    for _ in range(max_ticks):
-        winner = winner_kind_or_none(state)
-        if winner is not None:
-            print(f"Winner: {winner.value} at tick {state.tick}")
-            return winner
-
-        state = step_game(
-            state,
-            rng,
-            convert_loser_to_winner=config.convert_loser_to_winner,
-            bounce_off_creatures=config.bounce_off_creatures,
-            grow_on_win=config.grow_on_win,
-            encounter_distance=config.creature_radius * 2,
-            dt_seconds=dt_seconds * config.tps_multiplier,
+    stats = TickStats() if profile else None
+    initial_state = None
+    if from_checkpoint is not None:
+        from .checkpoint import load_checkpoint
+
+        initial_state = load_checkpoint(from_checkpoint, config)
+    # Each recorder with the line reporting what it wrote, given `close()`'s result.
+    recorders: list[tuple["FrameRecorder | ReplayWriter | CheckpointRecorder", str]] = []
+    if record is not None:
+        from .record import FrameRecorder
+
+        recorder = FrameRecorder(record, config, every=record_every, image_format=record_format)
+        recorders.append((recorder, f"Recorded {{}} frames to {record}"))
+    if save_replay is not None:
+        from .replay import ReplayWriter
+
+        recorder = ReplayWriter(save_replay, every=save_replay_every)
+        recorders.append((recorder, f"Saved a {{}}-frame replay to {save_replay}"))
+    if save_checkpoint is not None:
+        from .checkpoint import CheckpointRecorder
+
+        recorder = CheckpointRecorder(save_checkpoint)
+        recorders.append((recorder, f"Saved a {{}}-byte checkpoint to {save_checkpoint}"))
+    outputs = list(recorders)
+    metrics = None
+    if metrics_out is not None:
+        metrics = MetricsWriter(metrics_out)
+        outputs.append((metrics, f"Wrote {{}} metrics records to {metrics_out}"))
+    try:
+        games = iter_game(
+            config,
+            dt_seconds,
+            every=None if metrics is None else metrics_every,
+            engine=engine,
+            max_ticks=max_ticks,
+            initial_state=initial_state,
+            stats=stats,
+            recorders=[recorder for recorder, _ in recorders],
         )
-
-    winner = winner_kind_or_none(state)
-    counts = creature_counts(state)
-    if winner is not None:
-        print(f"Winner: {winner.value} at tick {state.tick}")
-        return winner
-
+        for last in games:
+            if metrics is not None:
+                metrics.write(last)
+        result = _headless_result(last)
+    finally:
+        written = []
+        with ExitStack() as closing:
+            # Callbacks run last-in first-out, and every one of them runs even if
+            # an earlier close raises, so each file is finalized either way.
+            for output, _ in reversed(outputs):
+                closing.callback(lambda output=output: written.append(output.close()))
+    for (_, report), amount in zip(outputs, written):
+        print(report.format(amount))
+    if stats is not None:
+        print("\n".join(stats.summary_lines()))
+    if result.winner is not None:
+        print(f"Winner: {result.winner.value} at tick {result.ticks}")
+        return result.winner
+
+    counts = result.counts
     print(
         "No winner after "
         f"{max_ticks} ticks. "
@@ -0,0 +1,236 @@
+"""Exact binary snapshots of a game, for resuming and forking it mid-way.
+
+Layout, little-endian:
+
+    header     magic, version, board width/height, tick, creature, obstacle
+               and collision-pair counts, conversions so far
+    obstacles  as in replay files
+    creatures  one column each: ids (int64), kinds (uint8), then x, y, vx,
+               vy, radius and mass (float64)
+    pairs      active collision pairs, two int64 ids each
+
+Creatures are stored column by column so the array engine can restore a
+checkpoint with `numpy.frombuffer` and no per-creature work. That,
+`soa.restore_array_checkpoint`, is the fast path for big games: restoring a
+`GameState` has to build a `Creature` per creature, which takes the better
+part of a second per 100k. Both sides share `pack_header` / `read_header`.
+Unlike replays nothing is quantized: a restored game continues exactly as the
+original would have.
+"""
+
+from array import array
+from dataclasses import dataclass
+import math
+from pathlib import Path
+import random
+import struct
+import sys
+
+from .board import Board, Obstacle, Position
+from .config import SimConfig
+from .creature import Creature
+from .game import GameState, _with_collision_model
+from .obstacles import ObstacleField, bake_obstacles
+from .replay import pack_obstacles, unpack_obstacles
+from .rps import CreatureType
+
+_MAGIC = b"RPSC"
+_VERSION = 2
+# magic, version, board width, board height, tick, creatures, obstacles, collision pairs, conversions
+_HEADER = struct.Struct("<4sHddqqIqq")
+_FLOAT_COLUMNS = 6
+_KINDS = tuple(CreatureType)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+@dataclass(frozen=True)
+class CheckpointHeader:
+    """Everything in a checkpoint before the creature columns, which start at `columns_offset`."""
+
+    board: Board
+    tick: int
+    creature_count: int
+    obstacles: list[Obstacle]
+    pair_count: int
+    conversions: int
+    columns_offset: int
+
+
+def pack_header(
+    board: Board,
+    tick: int,
+    creature_count: int,
+    obstacles: list[Obstacle],
+    pairs: set[tuple[int, int]],
+    conversions: int,
+) -> bytes:
+    return _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        board.width,
+        board.height,
+        tick,
+        creature_count,
+        len(obstacles),
+        len(pairs),
+        conversions,
+    ) + pack_obstacles(obstacles)
+
+
+def read_header(data) -> CheckpointHeader:
+    magic, version, width, height, tick, count, obstacle_count, pair_count, conversions = (
+        _HEADER.unpack_from(data, 0)
+    )
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Not a version {_VERSION} checkpoint")
+    obstacles, offset = unpack_obstacles(data, _HEADER.size, obstacle_count)
+    return CheckpointHeader(
+        board=Board(width=width, height=height),
+        tick=tick,
+        creature_count=count,
+        obstacles=obstacles,
+        pair_count=pair_count,
+        conversions=conversions,
+        columns_offset=offset,
+    )
+
+
+def restore_obstacle_field(
+    obstacles: list[Obstacle], board: Board, config: SimConfig | None
+) -> ObstacleField:
+    """Re-bake saved obstacles, with the signed-distance grid `config` asks for if given."""
+    field = bake_obstacles(obstacles)
+    return field if config is None else _with_collision_model(field, board, config)
+
+
+def checkpoint_bytes(state: GameState) -> bytes:
+    creatures = state.creatures
+    pairs = state.active_collision_pairs
+    columns = [
+        _little_endian(array("q", [creature.id for creature in creatures])),
+        bytes([_KIND_CODES[creature.kind] for creature in creatures]),
+        _little_endian(array("d", [creature.pos.x for creature in creatures])),
+        _little_endian(array("d", [creature.pos.y for creature in creatures])),
+        _little_endian(array("d", [creature.vx for creature in creatures])),
+        _little_endian(array("d", [creature.vy for creature in creatures])),
+        _little_endian(array("d", [creature.radius for creature in creatures])),
+        _little_endian(array("d", [creature.mass for creature in creatures])),
+        _little_endian(array("q", [creature_id for pair in sorted(pairs) for creature_id in pair])),
+    ]
+    header = pack_header(
+        state.board, state.tick, len(creatures), state.obstacles, pairs, state.conversions
+    )
+    return b"".join([header, *columns])
+
+
+def restore_checkpoint(data: bytes, config: SimConfig | None = None) -> GameState:
+    """The game saved by `checkpoint_bytes`.
+
+    Obstacles are re-baked for exact collision; pass the game's `config` to
+    rebuild its signed-distance grid too when it used `obstacle_collision="sdf"`.
+    For a large game headed for the array engine, `soa.restore_array_checkpoint`
+    skips building creatures altogether.
+    """
+    data = memoryview(data)
+    header = read_header(data)
+    count = header.creature_count
+    offset = header.columns_offset
+    ids = _from_little_endian("q", data[offset : offset + (8 * count)])
+    offset += 8 * count
+    kinds = data[offset : offset + count]
+    offset += count
+    floats = _from_little_endian("d", data[offset : offset + (8 * _FLOAT_COLUMNS * count)])
+    offset += 8 * _FLOAT_COLUMNS * count
+    pair_ids = _from_little_endian("q", data[offset : offset + (16 * header.pair_count)])
+    x, y, vx, vy, radius, mass = (
+        floats[column * count : (column + 1) * count] for column in range(_FLOAT_COLUMNS)
+    )
+    # Positional `map` calls build the creatures about a quarter faster than keyword calls in a loop.
+    creatures = list(
+        map(Creature, ids, map(_KINDS.__getitem__, kinds), map(Position, x, y), vx, vy, radius, mass)
+    )
+    return GameState(
+        board=header.board,
+        creatures=creatures,
+        obstacles=header.obstacles,
+        tick=header.tick,
+        active_collision_pairs=set(zip(pair_ids[0::2], pair_ids[1::2])),
+        obstacle_field=restore_obstacle_field(header.obstacles, header.board, config),
+        conversions=header.conversions,
+    )
+
+
+def save_checkpoint(state: GameState, path: str | Path) -> int:
+    """Write `state` to `path`; returns the number of bytes written."""
+    return Path(path).write_bytes(checkpoint_bytes(state))
+
+
+def load_checkpoint(path: str | Path, config: SimConfig | None = None) -> GameState:
+    return restore_checkpoint(Path(path).read_bytes(), config)
+
+
+class CheckpointRecorder:
+    """Saves the last state of a `play_headless` run; it skips every tick before that."""
+
+    next_tick = math.inf
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.size = 0
+
+    def capture(self, state: GameState) -> None:
+        pass
+
+    def finish(self, state: GameState) -> None:
+        self.size = save_checkpoint(state, self.path)
+
+    def close(self) -> int:
+        return self.size
+
+
+def fork_state(state: GameState, rng: random.Random, velocity_jitter: float = 0.0) -> GameState:
+    """A copy of `state` whose creatures' headings are each turned by up to `velocity_jitter` radians.
+
+    Speeds, positions and everything else are kept, so forks of one
+    checkpoint share its past and diverge from its tick on.
+    """
+    creatures = []
+    for creature in state.creatures:
+        angle = rng.uniform(-velocity_jitter, velocity_jitter)
+        cos_angle = math.cos(angle)
+        sin_angle = math.sin(angle)
+        creatures.append(
+            Creature(
+                id=creature.id,
+                kind=creature.kind,
+                pos=creature.pos,
+                vx=(creature.vx * cos_angle) - (creature.vy * sin_angle),
+                vy=(creature.vx * sin_angle) + (creature.vy * cos_angle),
+                radius=creature.radius,
+                mass=creature.mass,
+            )
+        )
+    return GameState(
+        board=state.board,
+        creatures=creatures,
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=set(state.active_collision_pairs),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
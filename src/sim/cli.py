@@ -1,102 +1,270 @@
 import argparse
+from pathlib import Path
 
-from .config import SimConfig
+from .config import DEFAULT_FORK_JITTER, SimConfig
 
 
-def build_parser() -> argparse.ArgumentParser:
+def _simulation_parser(keep_defaults: bool = True) -> argparse.ArgumentParser:
+    """Parent parser with the options shared by a plain run and the tournament subcommand.
+
+    Without `keep_defaults` an option only lands in the namespace when given, so
+    the subcommand does not reset values given before its name.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
     defaults = SimConfig()
-    parser = argparse.ArgumentParser(description="Run the RPS creature simulation.")
-    parser.add_argument("--width", type=int, default=defaults.board_width, help="Board width in cells.")
-    parser.add_argument("--height", type=int, default=defaults.board_height, help="Board height in cells.")
-    parser.add_argument("--cell-size", type=int, default=defaults.cell_size, help="Size of each cell in pixels.")
-    parser.add_argument("--fps", type=int, default=defaults.fps, help="Frames per second.")
-    parser.add_argument("--count", type=int, default=defaults.creature_count, help="Number of creatures.")
-    parser.add_argument(
+
+    def add_argument(*names: str, **options) -> None:
+        if not keep_defaults:
+            options["default"] = argparse.SUPPRESS
+        parser.add_argument(*names, **options)
+
+    add_argument("--width", type=int, default=defaults.board_width, help="Board width in cells.")
+    add_argument("--height", type=int, default=defaults.board_height, help="Board height in cells.")
+    add_argument("--cell-size", type=int, default=defaults.cell_size, help="Size of each cell in pixels.")
+    add_argument("--fps", type=int, default=defaults.fps, help="Frames per second.")
+    add_argument("--count", type=int, default=defaults.creature_count, help="Number of creatures.")
+    add_argument(
         "--speed",
         type=float,
         default=defaults.creature_speed,
         help="Base creature speed in pixels per second.",
     )
-    parser.add_argument(
+    add_argument(
         "--mass",
         type=float,
         default=defaults.creature_mass,
         help="Starting mass for each creature.",
     )
-    parser.add_argument(
+    add_argument(
         "--min-speed-mult",
         type=float,
         default=defaults.min_speed_multiplier,
         help="Minimum speed multiplier for spawn randomization.",
     )
-    parser.add_argument(
+    add_argument(
         "--max-speed-mult",
         type=float,
         default=defaults.max_speed_multiplier,
         help="Maximum speed multiplier for spawn randomization.",
     )
-    parser.add_argument(
+    add_argument(
         "--tps-multiplier",
         type=float,
         default=defaults.tps_multiplier,
         help="Global ticks-per-second multiplier for simulation speed.",
     )
-    parser.add_argument(
+    add_argument(
         "--seed",
         type=int,
         default=defaults.random_seed,
         help="Random seed (default: random each run).",
     )
-    parser.add_argument(
+    add_argument(
         "--no-convert",
         action="store_true",
         help="Disable loser conversion during encounters.",
     )
-    parser.add_argument(
+    add_argument(
         "--no-bounce",
         action="store_true",
         help="Disable creature-to-creature bounce on contact.",
     )
-    parser.add_argument(
+    add_argument(
         "--obstacle-count",
         type=int,
         default=defaults.obstacle_count,
         help="Number of obstacles to spawn at game start.",
     )
-    parser.add_argument(
+    add_argument(
         "--obstacle-avg-size",
         type=float,
         default=defaults.obstacle_avg_size,
         help="Average obstacle size in pixels. Actual obstacles vary around this.",
     )
-    parser.add_argument(
+    add_argument(
         "--obstacle-radius",
         dest="obstacle_avg_size",
         type=float,
         help=argparse.SUPPRESS,
     )
-    parser.add_argument(
+    add_argument(
+        "--spawn",
+        choices=["random", "grid"],
+        default=defaults.spawn_mode,
+        help="Creature placement. 'grid' deals a jittered grid, fast and free of overlaps.",
+    )
+    add_argument(
         "--grow-on-win",
         action="store_true",
         help="Make creatures grow by the loser's mass when they win or convert another creature.",
     )
-    parser.add_argument(
-        "--headless",
+    add_argument(
+        "--obstacle-collision",
+        choices=["exact", "sdf"],
+        default=defaults.obstacle_collision,
+        help="Obstacle collision model. 'sdf' samples a baked signed-distance grid.",
+    )
+    add_argument(
+        "--sdf-resolution",
+        type=float,
+        default=defaults.sdf_resolution,
+        help="Signed-distance grid spacing in pixels for --obstacle-collision sdf.",
+    )
+    add_argument(
+        "--ccd",
         action="store_true",
-        help="Run simulation without graphics and print winner.",
+        help=(
+            "Sweep creatures along each step so contacts are found at their time of impact; "
+            "keeps large --headless-dt from tunneling (step engine and exact obstacle collision only)."
+        ),
     )
-    parser.add_argument(
+    add_argument(
+        "--from-checkpoint",
+        metavar="FILE",
+        default=None,
+        help="Continue a game saved by --save-checkpoint instead of dealing a new one.",
+    )
+    add_argument(
         "--max-ticks",
         type=int,
         default=10_000,
         help="Maximum ticks to run in headless mode.",
     )
-    parser.add_argument(
+    add_argument(
         "--headless-dt",
         type=float,
         default=1.0 / 60.0,
         help="Seconds per tick in headless mode.",
     )
+    add_argument(
+        "--engine",
+        choices=["step", "inplace", "array", "kinetic"],
+        default="step",
+        help=(
+            "Simulation engine for headless mode. 'inplace' mutates creature records; "
+            "'array' needs numpy (rpsbattle[fast]); 'kinetic' jumps from contact to contact "
+            "instead of stepping every tick."
+        ),
+    )
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run the RPS creature simulation.", parents=[_simulation_parser()]
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run simulation without graphics and print winner.",
+    )
+    parser.add_argument(
+        "--sim-process",
+        action="store_true",
+        help="Step the simulation in a worker process so rendering keeps a steady frame rate.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        default=None,
+        help="Run headless and write rendered frames to DIR (implies --headless).",
+    )
+    parser.add_argument(
+        "--record-every",
+        type=int,
+        default=1,
+        help="Ticks between recorded frames.",
+    )
+    parser.add_argument(
+        "--record-format",
+        choices=["png", "raw"],
+        default="png",
+        help="One PNG per frame, or every frame appended to DIR/frames.rgb as packed RGB24.",
+    )
+    parser.add_argument(
+        "--save-replay",
+        metavar="FILE",
+        default=None,
+        help="Write a compact per-tick replay of the game(s) to FILE while running.",
+    )
+    parser.add_argument(
+        "--save-replay-every",
+        type=int,
+        default=1,
+        help="Ticks between replay frames in headless mode.",
+    )
+    parser.add_argument(
+        "--save-checkpoint",
+        metavar="FILE",
+        default=None,
+        help="Save the final state of a headless run to FILE, exactly, to continue or fork later.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="FILE",
+        default=None,
+        help="Run headless and stream per-tick counts to FILE, CSV if it ends in .csv, "
+        "else JSON Lines (implies --headless).",
+    )
+    parser.add_argument(
+        "--metrics-every",
+        type=int,
+        default=1,
+        help="Ticks between --metrics-out records.",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        default=None,
+        help="Play back a file written by --save-replay instead of simulating.",
+    )
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="Only redraw and push the screen regions that changed each frame.",
+    )
+    parser.add_argument(
+        "--lod-dots-above",
+        type=int,
+        default=SimConfig.lod_dots_above,
+        help="Draw creatures as colored dots above this many (press L to cycle levels of detail).",
+    )
+    parser.add_argument(
+        "--lod-heatmap-above",
+        type=int,
+        default=SimConfig.lod_heatmap_above,
+        help="Draw a kind-density heatmap instead of creatures above this many.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase step timings and counters after a headless run (step engine only).",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    tournament = subparsers.add_parser(
+        "tournament",
+        help="Play many seeded headless games across processes and report win statistics.",
+        description="Play many seeded headless games across processes and report win statistics.",
+        parents=[_simulation_parser(keep_defaults=False)],
+    )
+    tournament.add_argument("--runs", type=int, default=100, help="Number of games to play.")
+    tournament.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU). 1 plays every game in this process.",
+    )
+    tournament.add_argument(
+        "--fork-jitter",
+        type=float,
+        default=DEFAULT_FORK_JITTER,
+        help="With --from-checkpoint, turn each creature's heading by up to this many radians per game.",
+    )
+    tournament.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only print the summary, not one line per finished game.",
+    )
     return parser
 
 
@@ -113,8 +281,10 @@ def main() -> None:
         parser.error("--obstacle-count must be greater than or equal to 0")
     if args.obstacle_avg_size < 0:
         parser.error("--obstacle-avg-size must be greater than or equal to 0")
-
-    from .app import run, run_headless
+    if args.sdf_resolution <= 0:
+        parser.error("--sdf-resolution must be greater than 0")
+    if args.lod_dots_above < 0 or args.lod_heatmap_above < args.lod_dots_above:
+        parser.error("--lod-heatmap-above must be at least --lod-dots-above, and both at least 0")
 
     config = SimConfig(
         board_width=args.width,
@@ -132,10 +302,85 @@ def main() -> None:
         bounce_off_creatures=not args.no_bounce,
         obstacle_count=args.obstacle_count,
         obstacle_avg_size=args.obstacle_avg_size,
+        spawn_mode=args.spawn,
+        obstacle_collision=args.obstacle_collision,
+        sdf_resolution=args.sdf_resolution,
         grow_on_win=args.grow_on_win,
+        continuous_collision=args.ccd,
+        lod_dots_above=args.lod_dots_above,
+        lod_heatmap_above=args.lod_heatmap_above,
     )
-    if args.headless:
-        run_headless(config, max_ticks=args.max_ticks, dt_seconds=args.headless_dt)
+    if args.ccd and args.engine not in ("step", "kinetic"):
+        parser.error("--ccd needs --engine step (the kinetic engine is already continuous)")
+    if args.ccd and args.obstacle_collision == "sdf":
+        parser.error("--ccd sweeps the exact obstacle shapes and needs --obstacle-collision exact")
+    if args.profile and args.engine != "step":
+        parser.error("--profile needs --engine step")
+    if args.command == "tournament":
+        if args.runs < 0:
+            parser.error("--runs must be greater than or equal to 0")
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers must be at least 1")
+        _run_tournament(args, config)
+        return
+
+    from .app import run, run_headless, view_replay
+
+    if args.replay is not None:
+        view_replay(args.replay, fps=args.fps)
+        return
+    if min(args.record_every, args.save_replay_every, args.metrics_every) < 1:
+        parser.error("--record-every, --save-replay-every and --metrics-every must be at least 1")
+    headless = args.headless or args.record is not None or args.metrics_out is not None
+    if args.from_checkpoint is not None and not headless:
+        parser.error("--from-checkpoint needs --headless or the tournament command")
+    if args.save_checkpoint is not None and not headless:
+        parser.error("--save-checkpoint needs --headless")
+    if headless:
+        run_headless(
+            config,
+            max_ticks=args.max_ticks,
+            dt_seconds=args.headless_dt,
+            engine=args.engine,
+            profile=args.profile,
+            record=args.record,
+            record_every=args.record_every,
+            record_format=args.record_format,
+            save_replay=args.save_replay,
+            save_replay_every=args.save_replay_every,
+            from_checkpoint=args.from_checkpoint,
+            save_checkpoint=args.save_checkpoint,
+            metrics_out=args.metrics_out,
+            metrics_every=args.metrics_every,
+        )
         return
 
-    run(config)
+    run(
+        config,
+        sim_process=args.sim_process,
+        dirty_rects=args.dirty_rects,
+        save_replay=args.save_replay,
+    )
+
+
+def _run_tournament(args: argparse.Namespace, config: SimConfig) -> None:
+    from .tournament import format_summary, run_tournament
+
+    def report(result) -> None:
+        if args.quiet:
+            return
+        winner = result.winner.value if result.winner is not None else "timeout"
+        print(f"seed={result.seed} winner={winner} ticks={result.ticks}", flush=True)
+
+    summary = run_tournament(
+        config,
+        runs=args.runs,
+        workers=args.workers,
+        max_ticks=args.max_ticks,
+        dt_seconds=args.headless_dt,
+        engine=args.engine,
+        on_result=report,
+        checkpoint=None if args.from_checkpoint is None else Path(args.from_checkpoint).read_bytes(),
+        fork_jitter=args.fork_jitter,
+    )
+    print(format_summary(summary))
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+# Heading jitter, in radians, that makes forks of one checkpoint diverge.
+DEFAULT_FORK_JITTER = 0.05
+
 
 @dataclass(frozen=True)
 class SimConfig:
@@ -19,7 +22,15 @@ class SimConfig:
     bounce_off_creatures: bool = True
     obstacle_count: int = 7
     obstacle_avg_size: float = 40.0
+    # "random" rejection-samples each creature clear of obstacles only; "grid"
+    # deals the whole population onto a jittered grid with no overlaps at all.
+    spawn_mode: str = "random"
     grow_on_win: bool = False
+    obstacle_collision: str = "exact"
+    sdf_resolution: float = 4.0
+    continuous_collision: bool = False
+    lod_dots_above: int = 3_000
+    lod_heatmap_above: int = 50_000
 
     @property
     def window_width(self) -> int:
@@ -1,7 +1,8 @@
 import math
+import os
 import random
 from collections import Counter
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field, replace
 
 from .board import Board, Obstacle, Position
 from .config import SimConfig
@@ -14,13 +15,36 @@ from .geometry import (
     circle_capsule_overlap,
     circle_circle_overlap,
     circle_polygon_overlap,
+    circle_time_of_impact,
+    distance_sq,
     normalize,
     polygon_capsule_overlap,
-    polygon_closest_point,
     polygon_polygon_overlap,
     primitive_support_distance,
 )
+from .obstacles import (
+    ObstacleField,
+    ObstacleShape,
+    bake_obstacle,
+    bake_obstacles,
+    circle_contact,
+    closest_point,
+    index_shapes,
+    time_of_impact,
+)
 from .rps import CreatureType, rps_winner
+from .sdf import DistanceField, bake_distance_field
+from .spatial import SpatialHash
+from .stats import TickStats
+
+_MIN_PAIR_CELL_SIZE = 1.0
+# Debug mode: recount every tick and assert the incremental kind counts agree.
+CHECK_COUNTS = os.environ.get("RPSBATTLE_CHECK_COUNTS", "") not in ("", "0")
+# The distance raster is exact out to this many starting radii (plus one grid
+# step); creatures that grow past it fall back to the exact obstacle path.
+_SDF_BAND_RADII = 2.0
+# Jittered points tried in a grid cell before it is given up as covered by obstacles.
+_GRID_SPAWN_ATTEMPTS = 4
 
 
 @dataclass
@@ -30,19 +54,24 @@ class GameState:
     obstacles: list[Obstacle] = field(default_factory=list)
     tick: int = 0
     active_collision_pairs: set[tuple[int, int]] = field(default_factory=set)
-
-
-def _translate(point: Position, dx: float, dy: float) -> Position:
-    return Position(point.x + dx, point.y + dy)
-
-
-def _rotate(point: Position, angle: float) -> Position:
-    cos_angle = math.cos(angle)
-    sin_angle = math.sin(angle)
-    return Position(
-        (point.x * cos_angle) - (point.y * sin_angle),
-        (point.x * sin_angle) + (point.y * cos_angle),
-    )
+    obstacle_field: ObstacleField | None = None
+    # Population per kind. step_game hands over the counts it kept up to date
+    # as creatures converted or died; any other state counts its creatures, so
+    # dataclasses.replace, which never passes them, cannot carry stale counts over.
+    kind_counts: Counter[CreatureType] = field(init=False, repr=False, compare=False)
+    # Encounters decided so far (conversions, or removals without
+    # convert_loser_to_winner), counted from when the state was dealt or loaded.
+    conversions: int = 0
+    _kind_counts: InitVar[Counter[CreatureType] | None] = None
+
+    def __post_init__(self, _kind_counts: Counter[CreatureType] | None) -> None:
+        # Obstacles never move, so their world-space geometry is baked once and
+        # handed from state to state by step_game.
+        if self.obstacle_field is None:
+            self.obstacle_field = bake_obstacles(self.obstacles)
+        if _kind_counts is None:
+            _kind_counts = Counter(creature.kind for creature in self.creatures)
+        self.kind_counts = _kind_counts
 
 
 def _creature_primitives(creature: Creature) -> list[Circle | Capsule | Polygon]:
@@ -61,39 +90,6 @@ def _creature_primitives_at_origin(kind: CreatureType, radius: float) -> list[Ci
     )
 
 
-def _obstacle_primitives(obstacle: Obstacle) -> list[Circle | Polygon]:
-    if obstacle.kind == "square":
-        points = (
-            Position(-obstacle.size, -obstacle.size),
-            Position(obstacle.size, -obstacle.size),
-            Position(obstacle.size, obstacle.size),
-            Position(-obstacle.size, obstacle.size),
-        )
-        return [
-            Polygon(
-                tuple(
-                    _translate(_rotate(point, obstacle.rotation), obstacle.pos.x, obstacle.pos.y)
-                    for point in points
-                )
-            )
-        ]
-    if obstacle.kind == "triangle":
-        points = (
-            Position(0.0, -obstacle.size),
-            Position(-obstacle.size, obstacle.size),
-            Position(obstacle.size, obstacle.size),
-        )
-        return [
-            Polygon(
-                tuple(
-                    _translate(_rotate(point, obstacle.rotation), obstacle.pos.x, obstacle.pos.y)
-                    for point in points
-                )
-            )
-        ]
-    return [Circle(center=obstacle.pos, radius=obstacle.size)]
-
-
 def _primitives_overlap(
     left: Circle | Capsule | Polygon,
     right: Circle | Capsule | Polygon,
@@ -134,12 +130,16 @@ def _creatures_overlap(left: Creature, right: Creature, fallback_distance: float
     return _shape_overlap(_creature_primitives(left), _creature_primitives(right))
 
 
-def _obstacles_overlap(left: Obstacle, right: Obstacle) -> bool:
-    return _shape_overlap(_obstacle_primitives(left), _obstacle_primitives(right))
+def _obstacles_overlap(left: ObstacleShape, right: ObstacleShape) -> bool:
+    if not left.may_touch_shape(right):
+        return False
+    return _shape_overlap([left.primitive], [right.primitive])
 
 
-def _creature_overlaps_obstacle(creature: Creature, obstacle: Obstacle) -> bool:
-    return _shape_overlap(_creature_primitives(creature), _obstacle_primitives(obstacle))
+def _creature_overlaps_obstacle(creature: Creature, obstacle: ObstacleShape) -> bool:
+    if not obstacle.may_touch_circle(creature.pos.x, creature.pos.y, creature.radius):
+        return False
+    return _shape_overlap(_creature_primitives(creature), [obstacle.primitive])
 
 
 def _creature_support_distance(creature: Creature, normal_x: float, normal_y: float) -> float:
@@ -150,13 +150,24 @@ def _creature_support_distance(creature: Creature, normal_x: float, normal_y: fl
     )
 
 
-def _obstacle_normal(obstacle: Obstacle, point: Position) -> tuple[float, float]:
-    primitive = _obstacle_primitives(obstacle)[0]
+def _wall_extents(kind: CreatureType, radius: float) -> tuple[float, float, float, float]:
+    """Support distances towards the left, right, top and bottom walls."""
+    relative_primitives = _creature_primitives_at_origin(kind, radius)
+    return (
+        max(primitive_support_distance(-1.0, 0.0, primitive) for primitive in relative_primitives),
+        max(primitive_support_distance(1.0, 0.0, primitive) for primitive in relative_primitives),
+        max(primitive_support_distance(0.0, -1.0, primitive) for primitive in relative_primitives),
+        max(primitive_support_distance(0.0, 1.0, primitive) for primitive in relative_primitives),
+    )
+
+
+def _obstacle_normal(obstacle: ObstacleShape, point: Position) -> tuple[float, float]:
+    primitive = obstacle.primitive
     if isinstance(primitive, Circle):
         return normalize(point.x - primitive.center.x, point.y - primitive.center.y)
 
-    closest = polygon_closest_point(point, primitive)
-    return normalize(point.x - closest.x, point.y - closest.y)
+    closest_x, closest_y = closest_point(obstacle, point.x, point.y)
+    return normalize(point.x - closest_x, point.y - closest_y)
 
 
 def _spawn_creature(
@@ -166,7 +177,7 @@ def _spawn_creature(
     creature_speed: float,
     creature_radius: float,
     creature_mass: float,
-    obstacles: list[Obstacle],
+    obstacles: ObstacleField,
 ) -> Creature:
     kind = rng.choice([CreatureType.ROCK, CreatureType.PAPER, CreatureType.SCISSORS])
 
@@ -188,8 +199,8 @@ def _spawn_creature(
                 radius=creature_radius,
                 mass=creature_mass,
             )
-            for obstacle in obstacles:
-                if _creature_overlaps_obstacle(candidate, obstacle):
+            for obstacle_index in obstacles.nearby_circle(pos.x, pos.y, creature_radius):
+                if _creature_overlaps_obstacle(candidate, obstacles.shapes[obstacle_index]):
                     blocked = True
                     break
             if not blocked:
@@ -210,16 +221,134 @@ def _spawn_creature(
     )
 
 
+def _spawn_creatures_on_grid(
+    rng: random.Random,
+    board: Board,
+    config: SimConfig,
+    obstacles: ObstacleField,
+) -> list[Creature]:
+    """`config.creature_count` creatures at jittered points of a shuffled grid, one per cell.
+
+    Cells are at least a creature across and every point keeps a radius clear
+    of its cell's edges, so no two creatures overlap. Cells are made smaller
+    until enough of them have room clear of obstacles; whatever still does not
+    fit is spawned like `_spawn_creature` does, overlaps and all.
+    """
+    count = config.creature_count
+    min_cell = max(2.0 * config.creature_radius, 1.0)
+    creatures: list[Creature] = []
+    if count > 0:
+        # Start with about a quarter more cells than creatures, for those obstacles cover.
+        cell = max(min_cell, math.sqrt((board.width * board.height) / (count * 1.25)))
+        while True:
+            creatures = _fill_grid(rng, board, config, obstacles, cell)
+            if len(creatures) == count or cell <= min_cell:
+                break
+            cell = max(min_cell, cell * 0.9)
+
+    leftovers = [
+        _spawn_creature(
+            rng,
+            board,
+            creature_id,
+            config.creature_speed,
+            config.creature_radius,
+            config.creature_mass,
+            obstacles,
+        )
+        for creature_id in range(len(creatures), count)
+    ]
+    return creatures + randomize_creature_speeds(
+        creatures=leftovers,
+        rng=rng,
+        min_speed=config.creature_speed * config.min_speed_multiplier,
+        max_speed=config.creature_speed * config.max_speed_multiplier,
+    )
+
+
+def _circle_hits_obstacles(pos: Position, radius: float, shapes: list[ObstacleShape]) -> bool:
+    circle = Circle(center=pos, radius=radius)
+    return any(
+        shape.may_touch_circle(pos.x, pos.y, radius) and _primitives_overlap(circle, shape.primitive)
+        for shape in shapes
+    )
+
+
+def _fill_grid(
+    rng: random.Random,
+    board: Board,
+    config: SimConfig,
+    obstacles: ObstacleField,
+    cell: float,
+) -> list[Creature]:
+    count = config.creature_count
+    radius = config.creature_radius
+    min_speed = config.creature_speed * config.min_speed_multiplier
+    max_speed = config.creature_speed * config.max_speed_multiplier
+    columns = int(board.width // cell)
+    rows = int(board.height // cell)
+    origin_x = (board.width - (columns * cell)) / 2.0
+    origin_y = (board.height - (rows * cell)) / 2.0
+    span = cell - (2.0 * radius)
+    kinds = (CreatureType.ROCK, CreatureType.PAPER, CreatureType.SCISSORS)
+    uniform = rng.uniform
+    shapes = obstacles.shapes
+    # Obstacles near each cell, from their bounds grown by a radius; the other
+    # cells skip obstacle tests entirely.
+    near_cells: dict[int, list[int]] = {}
+    for shape_index, shape in enumerate(shapes):
+        first_column = max(0, int((shape.min_x - radius - origin_x) // cell))
+        last_column = min(columns - 1, int((shape.max_x + radius - origin_x) // cell))
+        first_row = max(0, int((shape.min_y - radius - origin_y) // cell))
+        last_row = min(rows - 1, int((shape.max_y + radius - origin_y) // cell))
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                near_cells.setdefault((row * columns) + column, []).append(shape_index)
+
+    cells = list(range(columns * rows))
+    rng.shuffle(cells)
+    creatures: list[Creature] = []
+    for index in cells:
+        if len(creatures) == count:
+            break
+        row, column = divmod(index, columns)
+        left = origin_x + (column * cell) + radius
+        top = origin_y + (row * cell) + radius
+        for _attempt in range(_GRID_SPAWN_ATTEMPTS):
+            pos = Position(left + (rng.random() * span), top + (rng.random() * span))
+            nearby = near_cells.get(index)
+            if nearby and _circle_hits_obstacles(pos, radius, [shapes[i] for i in nearby]):
+                continue
+            angle = rng.random() * math.tau
+            speed = uniform(min_speed, max_speed)
+            creatures.append(
+                Creature(
+                    id=len(creatures),
+                    kind=kinds[int(rng.random() * 3)],
+                    pos=pos,
+                    vx=math.cos(angle) * speed,
+                    vy=math.sin(angle) * speed,
+                    radius=radius,
+                    mass=config.creature_mass,
+                )
+            )
+            break
+    return creatures
+
+
 def _spawn_obstacles(
     rng: random.Random,
     board: Board,
     obstacle_count: int,
     obstacle_avg_size: float,
-) -> list[Obstacle]:
+) -> list[ObstacleShape]:
     if obstacle_count <= 0 or obstacle_avg_size <= 0:
         return []
 
-    obstacles: list[Obstacle] = []
+    shapes: list[ObstacleShape] = []
+    # Placed obstacles by their bounds, so a candidate is only tested against its
+    # neighbours; cells fit the widest box a rotated square or triangle can have.
+    placed = SpatialHash(cell_size=obstacle_avg_size * 1.4 * 2.0 * math.sqrt(2.0))
     for _ in range(obstacle_count):
         for _attempt in range(50):
             size = rng.uniform(obstacle_avg_size * 0.6, obstacle_avg_size * 1.4)
@@ -249,41 +378,81 @@ def _spawn_obstacles(
                     ]
                 ),
             )
-            if any(_obstacles_overlap(candidate, other) for other in obstacles):
+            candidate_shape = bake_obstacle(candidate)
+            bounds = (
+                candidate_shape.min_x,
+                candidate_shape.min_y,
+                candidate_shape.max_x,
+                candidate_shape.max_y,
+            )
+            if any(_obstacles_overlap(candidate_shape, shapes[i]) for i in placed.query_bounds(*bounds)):
                 continue
-            obstacles.append(candidate)
+            placed.insert_bounds(len(shapes), *bounds)
+            shapes.append(candidate_shape)
             break
-    return obstacles
+    return shapes
 
 
 def create_game(config: SimConfig) -> GameState:
     rng = random.Random(config.random_seed)
     board = Board(width=config.window_width, height=config.window_height)
-    obstacles = _spawn_obstacles(
-        rng,
-        board,
-        obstacle_count=config.obstacle_count,
-        obstacle_avg_size=config.obstacle_avg_size,
+    obstacle_field = index_shapes(
+        tuple(
+            _spawn_obstacles(
+                rng,
+                board,
+                obstacle_count=config.obstacle_count,
+                obstacle_avg_size=config.obstacle_avg_size,
+            )
+        )
     )
-    creatures = [
-        _spawn_creature(
-            rng,
-            board,
-            i,
-            config.creature_speed,
-            config.creature_radius,
-            config.creature_mass,
-            obstacles,
+    if config.spawn_mode == "grid":
+        creatures = _spawn_creatures_on_grid(rng, board, config, obstacle_field)
+    elif config.spawn_mode == "random":
+        creatures = [
+            _spawn_creature(
+                rng,
+                board,
+                i,
+                config.creature_speed,
+                config.creature_radius,
+                config.creature_mass,
+                obstacle_field,
+            )
+            for i in range(config.creature_count)
+        ]
+        creatures = randomize_creature_speeds(
+            creatures=creatures,
+            rng=rng,
+            min_speed=config.creature_speed * config.min_speed_multiplier,
+            max_speed=config.creature_speed * config.max_speed_multiplier,
         )
-        for i in range(config.creature_count)
-    ]
-    creatures = randomize_creature_speeds(
+    else:
+        raise ValueError(f"Unknown spawn mode: {config.spawn_mode!r}")
+    obstacle_field = _with_collision_model(obstacle_field, board, config)
+    return GameState(
+        board=board,
         creatures=creatures,
-        rng=rng,
-        min_speed=config.creature_speed * config.min_speed_multiplier,
-        max_speed=config.creature_speed * config.max_speed_multiplier,
+        obstacles=[shape.obstacle for shape in obstacle_field.shapes],
+        obstacle_field=obstacle_field,
     )
-    return GameState(board=board, creatures=creatures, obstacles=obstacles)
+
+
+def _with_collision_model(obstacle_field: ObstacleField, board: Board, config: SimConfig) -> ObstacleField:
+    """Attach the signed-distance grid `config.obstacle_collision` asks for, if any."""
+    if config.obstacle_collision == "sdf":
+        return replace(
+            obstacle_field,
+            sdf=bake_distance_field(
+                obstacle_field.shapes,
+                board,
+                spacing=config.sdf_resolution,
+                band=(config.creature_radius * _SDF_BAND_RADII) + (config.sdf_resolution * 2),
+            ),
+        )
+    if config.obstacle_collision != "exact":
+        raise ValueError(f"Unknown obstacle collision mode: {config.obstacle_collision!r}")
+    return obstacle_field
 
 
 def randomize_creature_speeds(
@@ -323,26 +492,66 @@ def _grow_creature(creature: Creature, loser_mass: float) -> Creature:
     )
 
 
-def _bounce_off_obstacles(creature: Creature, obstacles: list[Obstacle]) -> Creature:
-    next_creature = creature
+def _bounce_off_distance_field(creature: Creature, sdf: DistanceField) -> Creature:
+    # One contact against the union of all obstacles, read from the raster.
+    distance, gradient_x, gradient_y = sdf.sample(creature.pos.x, creature.pos.y)
+    if distance > creature.radius:
+        return creature
+
+    normal_x, normal_y = normalize(gradient_x, gradient_y)
+    extent = _creature_support_distance(creature, normal_x, normal_y)
+    next_vx, next_vy = mirror_vector(normal_x, normal_y, creature.vx, creature.vy)
+    return Creature(
+        id=creature.id,
+        kind=creature.kind,
+        pos=Position(
+            creature.pos.x + (normal_x * (extent - distance)),
+            creature.pos.y + (normal_y * (extent - distance)),
+        ),
+        vx=-next_vx,
+        vy=-next_vy,
+        radius=creature.radius,
+        mass=creature.mass,
+    )
 
-    for obstacle in obstacles:
-        if not _creature_overlaps_obstacle(next_creature, obstacle):
+
+def _bounce_off_obstacles(
+    creature: Creature,
+    obstacles: ObstacleField,
+    swept_from: Position | None = None,
+    stats: TickStats | None = None,
+) -> Creature:
+    if obstacles.sdf is not None and obstacles.sdf.covers_radius(creature.radius):
+        if stats is not None:
+            stats.obstacle_tests += 1
+        return _bounce_off_distance_field(creature, obstacles.sdf)
+
+    next_creature = creature
+    start = creature.pos if swept_from is None else swept_from
+    candidates = obstacles.nearby(
+        min(start.x, creature.pos.x) - creature.radius,
+        min(start.y, creature.pos.y) - creature.radius,
+        max(start.x, creature.pos.x) + creature.radius,
+        max(start.y, creature.pos.y) + creature.radius,
+    )
+    position = 0
+
+    while position < len(candidates):
+        obstacle_index = candidates[position]
+        position += 1
+        obstacle = obstacles.shapes[obstacle_index]
+        if stats is not None:
+            stats.obstacle_tests += 1
+        # Creatures are single circles, so their contact is the circle's.
+        pos = next_creature.pos
+        contact = circle_contact(obstacle, pos.x, pos.y, next_creature.radius)
+        if contact is None:
             continue
 
-        normal_x, normal_y = _obstacle_normal(obstacle, next_creature.pos)
+        normal_x, normal_y = contact.normal_x, contact.normal_y
         extent = _creature_support_distance(next_creature, normal_x, normal_y)
-        obstacle_primitive = _obstacle_primitives(obstacle)[0]
-        if isinstance(obstacle_primitive, Circle):
-            surface_x = obstacle_primitive.center.x + (normal_x * obstacle_primitive.radius)
-            surface_y = obstacle_primitive.center.y + (normal_y * obstacle_primitive.radius)
-        else:
-            closest = polygon_closest_point(next_creature.pos, obstacle_primitive)
-            surface_x = closest.x
-            surface_y = closest.y
-
-        clamped_x = surface_x + (normal_x * extent)
-        clamped_y = surface_y + (normal_y * extent)
+        clamped_x = contact.point.x + (normal_x * extent)
+        clamped_y = contact.point.y + (normal_y * extent)
         next_vx, next_vy = mirror_vector(
             normal_x,
             normal_y,
@@ -360,14 +569,159 @@ def _bounce_off_obstacles(creature: Creature, obstacles: list[Obstacle]) -> Crea
             radius=next_creature.radius,
             mass=next_creature.mass,
         )
+        # The push-out moved the creature, so look up the remaining obstacles again.
+        candidates = [
+            later_index
+            for later_index in obstacles.nearby_circle(clamped_x, clamped_y, next_creature.radius)
+            if later_index > obstacle_index
+        ]
+        position = 0
 
     return next_creature
 
 
+def _clamp_to_board(creature: Creature, board: Board, x: float, y: float) -> Position:
+    extent_left, extent_right, extent_up, extent_down = _wall_extents(creature.kind, creature.radius)
+    return Position(
+        max(extent_left, min(board.width - extent_right, x)),
+        max(extent_up, min(board.height - extent_down, y)),
+    )
+
+
+def _sweep_obstacles(
+    start: Position,
+    creature: Creature,
+    board: Board,
+    obstacles: ObstacleField,
+    dt_seconds: float,
+) -> tuple[Creature, Position]:
+    """Stop at the first obstacle crossed between `start` and `creature.pos`.
+
+    The creature reflects off it at the time of impact and spends the rest of
+    the step on its new heading. Also returns where the path bent, for the
+    end-of-step overlap pass.
+    """
+    travel_x = creature.pos.x - start.x
+    travel_y = creature.pos.y - start.y
+    radius = creature.radius
+    hit_time = None
+    hit_index = -1
+    for obstacle_index in obstacles.nearby(
+        min(start.x, creature.pos.x) - radius,
+        min(start.y, creature.pos.y) - radius,
+        max(start.x, creature.pos.x) + radius,
+        max(start.y, creature.pos.y) + radius,
+    ):
+        time = time_of_impact(
+            obstacles.shapes[obstacle_index], start.x, start.y, travel_x, travel_y, radius
+        )
+        if time is not None and time <= 1.0 and (hit_time is None or time < hit_time):
+            hit_time = time
+            hit_index = obstacle_index
+    if hit_time is None:
+        return creature, start
+
+    contact = Position(start.x + (travel_x * hit_time), start.y + (travel_y * hit_time))
+    normal_x, normal_y = _obstacle_normal(obstacles.shapes[hit_index], contact)
+    next_vx, next_vy = mirror_vector(normal_x, normal_y, creature.vx, creature.vy)
+    next_vx = -next_vx
+    next_vy = -next_vy
+    remaining = dt_seconds * (1.0 - hit_time)
+    swept = Creature(
+        id=creature.id,
+        kind=creature.kind,
+        pos=_clamp_to_board(
+            creature, board, contact.x + (next_vx * remaining), contact.y + (next_vy * remaining)
+        ),
+        vx=next_vx,
+        vy=next_vy,
+        radius=creature.radius,
+        mass=creature.mass,
+    )
+    return swept, contact
+
+
+def _swept_contact_time(
+    left_start: Position,
+    left: Creature,
+    right_start: Position,
+    right: Creature,
+    fallback_distance: float,
+) -> float | None:
+    """Fraction of the step at which two creatures moving start-to-end first touch."""
+    reach = (
+        fallback_distance
+        if left.radius <= 0.0 or right.radius <= 0.0
+        else left.radius + right.radius
+    )
+    time = circle_time_of_impact(
+        right_start.x - left_start.x,
+        right_start.y - left_start.y,
+        (right.pos.x - right_start.x) - (left.pos.x - left_start.x),
+        (right.pos.y - right_start.y) - (left.pos.y - left_start.y),
+        reach,
+    )
+    return time if time is not None and time <= 1.0 else None
+
+
+def _bounce_at_contact(
+    left_start: Position,
+    left: Creature,
+    right_start: Position,
+    right: Creature,
+    contact_time: float,
+    board: Board,
+    obstacles: ObstacleField,
+    dt_seconds: float,
+    stats: TickStats | None = None,
+) -> tuple[Creature, Creature, Position, Position]:
+    """Bounce a swept pair where it touched and sweep both on for the rest of the step.
+
+    Also returns where each creature touched the other, which is where the
+    rest of its path starts.
+    """
+    left_x = left_start.x + ((left.pos.x - left_start.x) * contact_time)
+    left_y = left_start.y + ((left.pos.y - left_start.y) * contact_time)
+    right_x = right_start.x + ((right.pos.x - right_start.x) * contact_time)
+    right_y = right_start.y + ((right.pos.y - right_start.y) * contact_time)
+    (left_vx, left_vy), (right_vx, right_vy) = _bounce_velocity_components(
+        left_x, left_y, left.vx, left.vy, left.mass, right_x, right_y, right.vx, right.vy, right.mass
+    )
+    remaining = dt_seconds * (1.0 - contact_time)
+    left_contact = Position(left_x, left_y)
+    right_contact = Position(right_x, right_y)
+    bounced_left = Creature(
+        id=left.id,
+        kind=left.kind,
+        pos=_clamp_to_board(left, board, left_x + (left_vx * remaining), left_y + (left_vy * remaining)),
+        vx=left_vx,
+        vy=left_vy,
+        radius=left.radius,
+        mass=left.mass,
+    )
+    bounced_right = Creature(
+        id=right.id,
+        kind=right.kind,
+        pos=_clamp_to_board(
+            right, board, right_x + (right_vx * remaining), right_y + (right_vy * remaining)
+        ),
+        vx=right_vx,
+        vy=right_vy,
+        radius=right.radius,
+        mass=right.mass,
+    )
+    # The new headings are swept like the original step, so they cannot tunnel either.
+    return (
+        _collide_with_obstacles(left_contact, bounced_left, board, obstacles, remaining, stats, True),
+        _collide_with_obstacles(right_contact, bounced_right, board, obstacles, remaining, stats, True),
+        left_contact,
+        right_contact,
+    )
+
+
 def _move_creature(
     creature: Creature,
     board: Board,
-    obstacles: list[Obstacle],
     default_radius: float | None,
     dt_seconds: float,
 ) -> Creature:
@@ -381,26 +735,7 @@ def _move_creature(
     next_vx = creature.vx
     next_vy = creature.vy
 
-    extent_right = _creature_support_distance(
-        Creature(id=creature.id, kind=creature.kind, pos=creature.pos, radius=radius),
-        1.0,
-        0.0,
-    )
-    extent_left = _creature_support_distance(
-        Creature(id=creature.id, kind=creature.kind, pos=creature.pos, radius=radius),
-        -1.0,
-        0.0,
-    )
-    extent_down = _creature_support_distance(
-        Creature(id=creature.id, kind=creature.kind, pos=creature.pos, radius=radius),
-        0.0,
-        1.0,
-    )
-    extent_up = _creature_support_distance(
-        Creature(id=creature.id, kind=creature.kind, pos=creature.pos, radius=radius),
-        0.0,
-        -1.0,
-    )
+    extent_left, extent_right, extent_up, extent_down = _wall_extents(creature.kind, radius)
 
     if next_x < extent_left or next_x > board.width - extent_right:
         next_vx = -next_vx
@@ -410,7 +745,7 @@ def _move_creature(
         next_vy = -next_vy
         next_y = max(extent_up, min(board.height - extent_down, next_y))
 
-    moved_creature = Creature(
+    return Creature(
         id=creature.id,
         kind=creature.kind,
         pos=Position(next_x, next_y),
@@ -419,7 +754,23 @@ def _move_creature(
         radius=radius,
         mass=creature.mass,
     )
-    return _bounce_off_obstacles(moved_creature, obstacles)
+
+
+def _collide_with_obstacles(
+    start: Position,
+    moved_creature: Creature,
+    board: Board,
+    obstacles: ObstacleField,
+    dt_seconds: float,
+    stats: TickStats | None = None,
+    continuous_collision: bool = False,
+) -> Creature:
+    swept_from = start
+    if continuous_collision and obstacles.sdf is None:
+        moved_creature, swept_from = _sweep_obstacles(
+            start, moved_creature, board, obstacles, dt_seconds
+        )
+    return _bounce_off_obstacles(moved_creature, obstacles, swept_from=swept_from, stats=stats)
 
 
 def _within_distance(a: Creature, b: Creature, distance: float) -> bool:
@@ -452,34 +803,96 @@ def bounce_velocity(
     left_creature: Creature,
     right_creature: Creature,
 ) -> tuple[tuple[float, float], tuple[float, float]]:
-    mx = left_creature.pos.x - right_creature.pos.x
-    my = left_creature.pos.y - right_creature.pos.y
+    return _bounce_velocity_components(
+        left_creature.pos.x,
+        left_creature.pos.y,
+        left_creature.vx,
+        left_creature.vy,
+        left_creature.mass,
+        right_creature.pos.x,
+        right_creature.pos.y,
+        right_creature.vx,
+        right_creature.vy,
+        right_creature.mass,
+    )
+    # TODO(Jonah): implement collision bounce math here.
+    #return (left_creature.vx, left_creature.vy), (right_creature.vx, right_creature.vy)
+    #return (-left_creature.vx, -left_creature.vy), (-right_creature.vx, -right_creature.vy)
+    #return (-right_creature.vx, -right_creature.vy), (-left_creature.vx, -left_creature.vy)
+    #return (right_creature.vx, right_creature.vy), (left_creature.vx, left_creature.vy)
+
+
+def _bounce_velocity_components(
+    left_x: float,
+    left_y: float,
+    left_vx: float,
+    left_vy: float,
+    left_mass: float,
+    right_x: float,
+    right_y: float,
+    right_vx: float,
+    right_vy: float,
+    right_mass: float,
+) -> tuple[tuple[float, float], tuple[float, float]]:
+    mx = left_x - right_x
+    my = left_y - right_y
     if mx == 0.0 and my == 0.0:
-        mx = left_creature.vx - right_creature.vx
-        my = left_creature.vy - right_creature.vy
+        mx = left_vx - right_vx
+        my = left_vy - right_vy
         if mx == 0.0 and my == 0.0:
             mx = 1.0
-    new_vleft = mirror_vector(mx, my, left_creature.vx, left_creature.vy)
-    new_vright = mirror_vector(mx, my, right_creature.vx, right_creature.vy)
+    new_vleft = mirror_vector(mx, my, left_vx, left_vy)
+    new_vright = mirror_vector(mx, my, right_vx, right_vy)
     new_vleft = -new_vleft[0], -new_vleft[1]
     new_vright = -new_vright[0], -new_vright[1]
-    total_mass = max(0.000001, left_creature.mass + right_creature.mass)
-    left_factor = min(1.0, (2.0 * right_creature.mass) / total_mass)
-    right_factor = min(1.0, (2.0 * left_creature.mass) / total_mass)
+    total_mass = max(0.000001, left_mass + right_mass)
+    left_factor = min(1.0, (2.0 * right_mass) / total_mass)
+    right_factor = min(1.0, (2.0 * left_mass) / total_mass)
     blended_left = (
-        left_creature.vx + ((new_vleft[0] - left_creature.vx) * left_factor),
-        left_creature.vy + ((new_vleft[1] - left_creature.vy) * left_factor),
+        left_vx + ((new_vleft[0] - left_vx) * left_factor),
+        left_vy + ((new_vleft[1] - left_vy) * left_factor),
     )
     blended_right = (
-        right_creature.vx + ((new_vright[0] - right_creature.vx) * right_factor),
-        right_creature.vy + ((new_vright[1] - right_creature.vy) * right_factor),
+        right_vx + ((new_vright[0] - right_vx) * right_factor),
+        right_vy + ((new_vright[1] - right_vy) * right_factor),
     )
     return blended_left, blended_right
-    # TODO(Jonah): implement collision bounce math here.
-    #return (left_creature.vx, left_creature.vy), (right_creature.vx, right_creature.vy)
-    #return (-left_creature.vx, -left_creature.vy), (-right_creature.vx, -right_creature.vy)
-    #return (-right_creature.vx, -right_creature.vy), (-left_creature.vx, -left_creature.vy)
-    #return (right_creature.vx, right_creature.vy), (left_creature.vx, left_creature.vy)
+
+
+def _pair_grid(
+    creatures: list[Creature],
+    encounter_distance: float,
+) -> tuple[SpatialHash, float]:
+    max_radius = max((creature.radius for creature in creatures), default=0.0)
+    cell_size = max(encounter_distance, 2.0 * max_radius, _MIN_PAIR_CELL_SIZE)
+    grid = SpatialHash(cell_size=cell_size)
+    for index, creature in enumerate(creatures):
+        grid.insert(index, creature.pos.x, creature.pos.y)
+    return grid, max_radius
+
+
+def _refile_swept(
+    grid: SpatialHash, index: int, before: Creature, after: Creature, start: Position
+) -> float:
+    """File a creature bounced mid-sweep under its new cell; return how far it now travels."""
+    grid.move(index, before.pos.x, before.pos.y, after.pos.x, after.pos.y)
+    return math.sqrt(distance_sq(start, after.pos))
+
+
+def _pair_candidates(
+    grid: SpatialHash,
+    creature: Creature,
+    after_index: int,
+    max_radius: float,
+    encounter_distance: float,
+    sweep_margin: float = 0.0,
+) -> list[int]:
+    reach = max(encounter_distance, creature.radius + max_radius) + sweep_margin
+    return sorted(
+        index
+        for index in grid.query(creature.pos.x, creature.pos.y, reach)
+        if index > after_index
+    )
 
 
 def step_game(
@@ -491,23 +904,61 @@ def step_game(
     grow_on_win: bool = False,
     encounter_distance: float = 16.0,
     dt_seconds: float = 1.0,
+    stats: TickStats | None = None,
+    continuous_collision: bool = False,
 ) -> GameState:
+    """Advance one tick.
+
+    With `continuous_collision`, creatures are swept from their previous
+    position to their new one: obstacles and creature pairs crossed on the way
+    are resolved at their time of impact even if the end-of-step positions no
+    longer overlap, so a large `dt_seconds` does not tunnel. A pair that
+    bounces is swept on along its new headings, against obstacles too, but
+    pairs checked earlier in the tick are not revisited. Obstacles are only
+    swept when collision uses their exact shapes, not a distance field.
+    """
     del rng  # Kept in signature so the app can still pass one RNG object.
-    moved_creatures: list[Creature] = []
-
-    for creature in state.creatures:
-        moved_creatures.append(
-            _move_creature(
-                creature,
-                state.board,
-                state.obstacles,
-                creature_radius,
-                dt_seconds,
-            )
+    if stats is not None:
+        stats.start_tick()
+    moved_creatures = [
+        _move_creature(creature, state.board, creature_radius, dt_seconds) for creature in state.creatures
+    ]
+    if stats is not None:
+        stats.lap("move")
+    moved_creatures = [
+        _collide_with_obstacles(
+            creature.pos,
+            moved_creature,
+            state.board,
+            state.obstacle_field,
+            dt_seconds,
+            stats,
+            continuous_collision,
         )
+        for creature, moved_creature in zip(state.creatures, moved_creatures)
+    ]
+    if stats is not None:
+        stats.lap("obstacles")
 
     by_id: dict[int, Creature] = {c.id: c for c in moved_creatures}
+    kind_counts = Counter(state.kind_counts)
+    conversions = state.conversions
     creature_ids = sorted(by_id.keys())
+    # One grid serves every pair query. Only swept pair bounces move creatures
+    # mid-tick, and they re-file them; radii can grow mid-tick too, so
+    # candidates are re-queried after either.
+    grid, max_radius = _pair_grid([by_id[creature_id] for creature_id in creature_ids], encounter_distance)
+    starts: dict[int, Position] = {}
+    sweep_margin = 0.0
+    if continuous_collision:
+        # A pair can touch mid-step and be apart again by its end, so widen
+        # every pair query by the most any two creatures moved this tick.
+        starts = {creature.id: creature.pos for creature in state.creatures}
+        sweep_margin = 2.0 * max(
+            (math.sqrt(distance_sq(starts[c.id], c.pos)) for c in moved_creatures), default=0.0
+        )
+    if stats is not None:
+        stats.lap("broad_phase")
 
     if not convert_loser_to_winner:
         collisions_this_tick: set[tuple[int, int]] = set()
@@ -515,18 +966,64 @@ def step_game(
         for left_index, left_id in enumerate(creature_ids):
             if left_id not in alive_ids:
                 continue
-            for right_id in creature_ids[left_index + 1 :]:
+            candidates = _pair_candidates(
+                grid, by_id[left_id], left_index, max_radius, encounter_distance, sweep_margin
+            )
+            if stats is not None:
+                stats.candidate_pairs += len(candidates)
+            position = 0
+            while position < len(candidates):
+                right_index = candidates[position]
+                position += 1
+                right_id = creature_ids[right_index]
                 if right_id not in alive_ids:
                     continue
                 left = by_id[left_id]
                 right = by_id[right_id]
-                if not _creatures_overlap(left, right, encounter_distance):
+                overlapping = _creatures_overlap(left, right, encounter_distance)
+                contact_time = None
+                if continuous_collision and not overlapping:
+                    contact_time = _swept_contact_time(
+                        starts[left_id], left, starts[right_id], right, encounter_distance
+                    )
+                    overlapping = contact_time is not None
+                if stats is not None:
+                    stats.narrow_tests += 1
+                    stats.overlaps += overlapping
+                if not overlapping:
                     continue
 
                 pair = _pair_key(left_id, right_id)
                 if bounce_off_creatures:
                     collisions_this_tick.add(pair)
-                if bounce_off_creatures and pair not in state.active_collision_pairs:
+                new_contact = bounce_off_creatures and pair not in state.active_collision_pairs
+                if new_contact and contact_time is not None:
+                    bounced = _bounce_at_contact(
+                        starts[left_id],
+                        left,
+                        starts[right_id],
+                        right,
+                        contact_time,
+                        state.board,
+                        state.obstacle_field,
+                        dt_seconds,
+                        stats,
+                    )
+                    by_id[left_id], by_id[right_id], starts[left_id], starts[right_id] = bounced
+                    if stats is not None:
+                        stats.bounces += 1
+                    sweep_margin = max(
+                        sweep_margin,
+                        2.0 * _refile_swept(grid, left_index, left, by_id[left_id], starts[left_id]),
+                        2.0 * _refile_swept(grid, right_index, right, by_id[right_id], starts[right_id]),
+                    )
+                    candidates = _pair_candidates(
+                        grid, by_id[left_id], right_index, max_radius, encounter_distance, sweep_margin
+                    )
+                    if stats is not None:
+                        stats.candidate_pairs += len(candidates)
+                    position = 0
+                elif new_contact:
                     (next_left_vx, next_left_vy), (next_right_vx, next_right_vy) = (
                         bounce_velocity(
                             left,
@@ -551,21 +1048,38 @@ def step_game(
                         radius=right.radius,
                         mass=right.mass,
                     )
+                    if stats is not None:
+                        stats.bounces += 1
 
                 winner = rps_winner(left.kind, right.kind)
                 if winner is None:
                     continue
+                conversions += 1
+                if stats is not None:
+                    stats.conversions += 1
                 if winner == left.kind:
+                    kind_counts[right.kind] -= 1
                     if grow_on_win:
                         by_id[left_id] = _grow_creature(by_id[left_id], by_id[right_id].mass)
+                        max_radius = max(max_radius, by_id[left_id].radius)
+                        candidates = _pair_candidates(
+                            grid, by_id[left_id], right_index, max_radius, encounter_distance, sweep_margin
+                        )
+                        if stats is not None:
+                            stats.candidate_pairs += len(candidates)
+                        position = 0
                     alive_ids.discard(right_id)
                 else:
+                    kind_counts[left.kind] -= 1
                     if grow_on_win:
                         by_id[right_id] = _grow_creature(by_id[right_id], by_id[left_id].mass)
+                        max_radius = max(max_radius, by_id[right_id].radius)
                     alive_ids.discard(left_id)
                     break
 
-        return GameState(
+        if stats is not None:
+            stats.lap("pairs")
+        next_state = GameState(
             board=state.board,
             creatures=sorted(
                 [by_id[c.id] for c in moved_creatures if c.id in alive_ids],
@@ -574,22 +1088,76 @@ def step_game(
             obstacles=state.obstacles,
             tick=state.tick + 1,
             active_collision_pairs=collisions_this_tick,
+            obstacle_field=state.obstacle_field,
+            conversions=conversions,
+            _kind_counts=kind_counts,
         )
+        if stats is not None:
+            stats.lap("finalize")
+        if CHECK_COUNTS:
+            _check_kind_counts(next_state)
+        return next_state
 
     collisions_this_tick: set[tuple[int, int]] = set()
     kinds_by_id: dict[int, CreatureType] = {c.id: c.kind for c in moved_creatures}
 
     for left_index, left_id in enumerate(creature_ids):
-        for right_id in creature_ids[left_index + 1 :]:
+        candidates = _pair_candidates(
+            grid, by_id[left_id], left_index, max_radius, encounter_distance, sweep_margin
+        )
+        if stats is not None:
+            stats.candidate_pairs += len(candidates)
+        position = 0
+        while position < len(candidates):
+            right_index = candidates[position]
+            position += 1
+            right_id = creature_ids[right_index]
             left = by_id[left_id]
             right = by_id[right_id]
-            if not _creatures_overlap(left, right, encounter_distance):
+            overlapping = _creatures_overlap(left, right, encounter_distance)
+            contact_time = None
+            if continuous_collision and not overlapping:
+                contact_time = _swept_contact_time(
+                    starts[left_id], left, starts[right_id], right, encounter_distance
+                )
+                overlapping = contact_time is not None
+            if stats is not None:
+                stats.narrow_tests += 1
+                stats.overlaps += overlapping
+            if not overlapping:
                 continue
 
             pair = _pair_key(left_id, right_id)
             if bounce_off_creatures:
                 collisions_this_tick.add(pair)
-            if bounce_off_creatures and pair not in state.active_collision_pairs:
+            new_contact = bounce_off_creatures and pair not in state.active_collision_pairs
+            if new_contact and contact_time is not None:
+                bounced = _bounce_at_contact(
+                    starts[left_id],
+                    left,
+                    starts[right_id],
+                    right,
+                    contact_time,
+                    state.board,
+                    state.obstacle_field,
+                    dt_seconds,
+                    stats,
+                )
+                by_id[left_id], by_id[right_id], starts[left_id], starts[right_id] = bounced
+                if stats is not None:
+                    stats.bounces += 1
+                sweep_margin = max(
+                    sweep_margin,
+                    2.0 * _refile_swept(grid, left_index, left, by_id[left_id], starts[left_id]),
+                    2.0 * _refile_swept(grid, right_index, right, by_id[right_id], starts[right_id]),
+                )
+                candidates = _pair_candidates(
+                    grid, by_id[left_id], right_index, max_radius, encounter_distance, sweep_margin
+                )
+                if stats is not None:
+                    stats.candidate_pairs += len(candidates)
+                position = 0
+            elif new_contact:
                 (next_left_vx, next_left_vy), (next_right_vx, next_right_vy) = (
                     bounce_velocity(
                         left,
@@ -614,22 +1182,41 @@ def step_game(
                     radius=right.radius,
                     mass=right.mass,
                 )
+                if stats is not None:
+                    stats.bounces += 1
 
             left_kind = kinds_by_id[left_id]
             right_kind = kinds_by_id[right_id]
             winner = rps_winner(left_kind, right_kind)
             if winner is None:
                 continue
+            conversions += 1
+            if stats is not None:
+                stats.conversions += 1
 
             if winner == left_kind:
                 kinds_by_id[right_id] = left_kind
+                kind_counts[left_kind] += 1
+                kind_counts[right_kind] -= 1
                 if grow_on_win:
                     by_id[left_id] = _grow_creature(by_id[left_id], by_id[right_id].mass)
+                    max_radius = max(max_radius, by_id[left_id].radius)
+                    candidates = _pair_candidates(
+                        grid, by_id[left_id], right_index, max_radius, encounter_distance, sweep_margin
+                    )
+                    if stats is not None:
+                        stats.candidate_pairs += len(candidates)
+                    position = 0
             else:
                 kinds_by_id[left_id] = right_kind
+                kind_counts[right_kind] += 1
+                kind_counts[left_kind] -= 1
                 if grow_on_win:
                     by_id[right_id] = _grow_creature(by_id[right_id], by_id[left_id].mass)
+                    max_radius = max(max_radius, by_id[right_id].radius)
 
+    if stats is not None:
+        stats.lap("pairs")
     resolved = [
         Creature(
             id=creature.id,
@@ -643,14 +1230,32 @@ def step_game(
         for creature in moved_creatures
     ]
 
-    return GameState(
+    next_state = GameState(
         board=state.board,
         creatures=sorted(resolved, key=lambda c: c.id),
         obstacles=state.obstacles,
         tick=state.tick + 1,
         active_collision_pairs=collisions_this_tick,
+        obstacle_field=state.obstacle_field,
+        conversions=conversions,
+        _kind_counts=kind_counts,
     )
+    if stats is not None:
+        stats.lap("finalize")
+    if CHECK_COUNTS:
+        _check_kind_counts(next_state)
+    return next_state
+
+
+def _check_kind_counts(state: GameState) -> None:
+    recounted = Counter(c.kind for c in state.creatures)
+    if +state.kind_counts != recounted:
+        raise AssertionError(
+            f"Incremental kind counts {dict(state.kind_counts)} != recount {dict(recounted)} "
+            f"at tick {state.tick}"
+        )
 
 
 def creature_counts(state: GameState) -> Counter[CreatureType]:
-    return Counter(c.kind for c in state.creatures)
+    # Unary plus copies the counter and drops kinds that have died out.
+    return +state.kind_counts
@@ -1,8 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import math
+from typing import TYPE_CHECKING
 
 from .board import Position
 
+if TYPE_CHECKING:
+    import numpy as np
+
+# Relative slack on squared distances in time-of-impact tests, so a pair that
+# was just separated is not found touching again because of rounding.
+CONTACT_TOLERANCE = 1e-9
+# Separating-axis early outs only reject gaps wider than this (relative) slack,
+# so they never disagree with the exact tests that follow them.
+_AXIS_PADDING = 1e-9
+
 
 @dataclass(frozen=True)
 class Circle:
@@ -19,7 +30,73 @@ class Capsule:
 
 @dataclass(frozen=True)
 class Polygon:
+    """A closed outline, with its outward edge normals, bounds and convexity worked out once.
+
+    `edge_normals[i]` is the unit normal of the edge from vertex i to vertex
+    i + 1, or (0.0, 0.0) when those vertices coincide.
+    """
+
     vertices: tuple[Position, ...]
+    edge_normals: tuple[tuple[float, float], ...] = field(init=False, repr=False, compare=False)
+    convex: bool = field(init=False, repr=False, compare=False)
+    min_x: float = field(init=False, repr=False, compare=False)
+    min_y: float = field(init=False, repr=False, compare=False)
+    max_x: float = field(init=False, repr=False, compare=False)
+    max_y: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        vertices = self.vertices
+        xs = [vertex.x for vertex in vertices]
+        ys = [vertex.y for vertex in vertices]
+        edges = list(
+            zip(
+                [next_x - x for next_x, x in zip(xs[1:] + xs[:1], xs)],
+                [next_y - y for next_y, y in zip(ys[1:] + ys[:1], ys)],
+            )
+        )
+        area = 0.0
+        for x, y, (edge_x, edge_y) in zip(xs, ys, edges):
+            area += (x * (y + edge_y)) - ((x + edge_x) * y)
+        outward = 1.0 if area > 0.0 else -1.0
+        normals = []
+        crosses = []
+        previous_x, previous_y = edges[-1]
+        for edge_x, edge_y in edges:
+            edge_length = math.sqrt(length_sq(edge_x, edge_y))
+            if edge_length == 0.0:
+                normals.append((0.0, 0.0))
+            else:
+                normals.append((outward * edge_y / edge_length, -outward * edge_x / edge_length))
+            crosses.append((previous_x * edge_y) - (previous_y * edge_x))
+            previous_x, previous_y = edge_x, edge_y
+        # Convex: a non-degenerate outline that turns one way only, and only once
+        # around. Five or more vertices can turn one way twice, like a pentagram.
+        convex = area != 0.0 and (min(crosses) >= 0.0 or max(crosses) <= 0.0)
+        if convex and len(vertices) > 4:
+            winding = 0.0
+            for (edge_x, edge_y), (next_x, next_y) in zip(edges, edges[1:] + edges[:1]):
+                cross = (edge_x * next_y) - (edge_y * next_x)
+                winding += math.atan2(cross, dot(edge_x, edge_y, next_x, next_y))
+            convex = abs(winding) < 3.0 * math.pi
+        set_field = object.__setattr__
+        set_field(self, "edge_normals", tuple(normals))
+        set_field(self, "convex", convex)
+        set_field(self, "min_x", min(xs))
+        set_field(self, "min_y", min(ys))
+        set_field(self, "max_x", max(xs))
+        set_field(self, "max_y", max(ys))
+
+
+@dataclass(frozen=True)
+class Contact:
+    """Where a circle touches a shape: the closest point of the shape's outline,
+    the unit normal from that point towards the circle's center, and how far the
+    circle reaches past the point along it."""
+
+    point: Position
+    normal_x: float
+    normal_y: float
+    depth: float
 
 
 def dot(ax: float, ay: float, bx: float, by: float) -> float:
@@ -96,12 +173,32 @@ def point_in_polygon(point: Position, polygon: Polygon) -> bool:
     return inside
 
 
+def _separated_by_edge_normals(
+    polygon: Polygon, points: tuple[Position, ...], reach: float = 0.0, slack: float = 0.0
+) -> bool:
+    """Whether an edge normal of convex `polygon` has all of `points`, grown by `reach`, beyond it."""
+    for start, (normal_x, normal_y) in zip(polygon.vertices, polygon.edge_normals):
+        offset = dot(start.x, start.y, normal_x, normal_y)
+        if min(dot(point.x, point.y, normal_x, normal_y) for point in points) - reach > offset + slack:
+            return True
+    return False
+
+
+def _circle_clear_of_convex(polygon: Polygon, points: tuple[Position, ...], radius: float) -> bool:
+    # A cheap reject ahead of an exact test, padded so it never overrules it.
+    return polygon.convex and _separated_by_edge_normals(
+        polygon, points, radius, _AXIS_PADDING * max(1.0, radius)
+    )
+
+
 def circle_circle_overlap(left: Circle, right: Circle) -> bool:
     radius_sum = left.radius + right.radius
     return distance_sq(left.center, right.center) <= radius_sum * radius_sum
 
 
 def circle_polygon_overlap(circle: Circle, polygon: Polygon) -> bool:
+    if _circle_clear_of_convex(polygon, (circle.center,), circle.radius):
+        return False
     if point_in_polygon(circle.center, polygon):
         return True
 
@@ -114,6 +211,20 @@ def circle_polygon_overlap(circle: Circle, polygon: Polygon) -> bool:
 
 
 def polygon_polygon_overlap(left: Polygon, right: Polygon) -> bool:
+    if (
+        left.max_x < right.min_x
+        or right.max_x < left.min_x
+        or left.max_y < right.min_y
+        or right.max_y < left.min_y
+    ):
+        return False
+    if left.convex and right.convex:
+        # Two convex outlines are apart exactly when one of their edge normals separates them.
+        return not (
+            _separated_by_edge_normals(left, right.vertices)
+            or _separated_by_edge_normals(right, left.vertices)
+        )
+
     for index, start in enumerate(left.vertices):
         end = left.vertices[(index + 1) % len(left.vertices)]
         for other_index, other_start in enumerate(right.vertices):
@@ -147,6 +258,8 @@ def capsule_capsule_overlap(left: Capsule, right: Capsule) -> bool:
 
 
 def polygon_capsule_overlap(polygon: Polygon, capsule: Capsule) -> bool:
+    if _circle_clear_of_convex(polygon, (capsule.start, capsule.end), capsule.radius):
+        return False
     if point_in_polygon(capsule.start, polygon) or point_in_polygon(capsule.end, polygon):
         return True
 
@@ -175,6 +288,98 @@ def polygon_closest_point(point: Position, polygon: Polygon) -> Position:
     return best_point
 
 
+def _convex_closest_point(point: Position, polygon: Polygon) -> tuple[Position, bool]:
+    """`polygon_closest_point` for convex `polygon`, and whether `point` is inside it.
+
+    The edge normals give how far `point` lies beyond each edge's line. From the
+    edge it lies furthest beyond, step along the outline while it projects past
+    an end to reach the nearest feature; only the edges around that feature are
+    then measured, in `polygon_closest_point`'s order so ties land the same way.
+    """
+    vertices = polygon.vertices
+    count = len(vertices)
+    offsets = []
+    for start, (normal_x, normal_y) in zip(vertices, polygon.edge_normals):
+        if normal_x == 0.0 and normal_y == 0.0:
+            offsets.append(-math.inf)
+        else:
+            offsets.append(dot(point.x - start.x, point.y - start.y, normal_x, normal_y))
+    furthest = max(offsets)
+    edge = offsets.index(furthest)
+    inside = furthest <= 0.0
+    nearby = {edge}
+    if inside:
+        # From inside, the nearest edges are the ones whose lines are nearest.
+        slack = _AXIS_PADDING * max(1.0, -furthest)
+        nearby.update(index for index, offset in enumerate(offsets) if offset >= furthest - slack)
+    else:
+        step = 0
+        for _ in range(count):
+            start = vertices[edge]
+            end = vertices[(edge + 1) % count]
+            seg_x = end.x - start.x
+            seg_y = end.y - start.y
+            seg_len_sq = length_sq(seg_x, seg_y)
+            along = dot(point.x - start.x, point.y - start.y, seg_x, seg_y)
+            if along < 0.0 and step <= 0:
+                step = -1
+            elif along > seg_len_sq and step >= 0:
+                step = 1
+            elif seg_len_sq != 0.0:
+                break
+            edge = (edge + step) % count
+        nearby.add(edge)
+    for index in list(nearby):
+        nearby.update(((index - 1) % count, (index + 1) % count))
+
+    best_point = vertices[0]
+    best_distance = distance_sq(point, best_point)
+    for index in sorted(nearby):
+        candidate = closest_point_on_segment(point, vertices[index], vertices[(index + 1) % count])
+        candidate_distance = distance_sq(point, candidate)
+        if candidate_distance < best_distance:
+            best_point = candidate
+            best_distance = candidate_distance
+    return best_point, inside
+
+
+def circle_circle_contact(circle: Circle, other: Circle) -> Contact | None:
+    """How `circle` touches `other`, with the normal pointing from `other` towards it; None if apart."""
+    if not circle_circle_overlap(circle, other):
+        return None
+    normal_x, normal_y = normalize(circle.center.x - other.center.x, circle.center.y - other.center.y)
+    return Contact(
+        point=Position(
+            other.center.x + (normal_x * other.radius), other.center.y + (normal_y * other.radius)
+        ),
+        normal_x=normal_x,
+        normal_y=normal_y,
+        depth=circle.radius + other.radius - math.sqrt(distance_sq(circle.center, other.center)),
+    )
+
+
+def circle_polygon_contact(circle: Circle, polygon: Polygon) -> Contact | None:
+    """How `circle` touches `polygon`, from the outline point closest to its center; None if apart.
+
+    Like `_obstacle_normal` in the step engine, the normal always points from
+    that closest point to the center, so it points inwards for a center inside
+    the polygon.
+    """
+    center = circle.center
+    if _circle_clear_of_convex(polygon, (center,), circle.radius):
+        return None
+    if polygon.convex:
+        closest, inside = _convex_closest_point(center, polygon)
+    else:
+        inside = point_in_polygon(center, polygon)
+        closest = polygon_closest_point(center, polygon)
+    gap_sq = distance_sq(center, closest)
+    if not inside and gap_sq > circle.radius * circle.radius:
+        return None
+    normal_x, normal_y = normalize(center.x - closest.x, center.y - closest.y)
+    return Contact(closest, normal_x, normal_y, circle.radius - math.sqrt(gap_sq))
+
+
 def primitive_support_distance(normal_x: float, normal_y: float, primitive: Circle | Capsule | Polygon) -> float:
     if isinstance(primitive, Circle):
         return primitive.radius
@@ -191,3 +396,132 @@ def normalize(dx: float, dy: float) -> tuple[float, float]:
     if magnitude == 0.0:
         return 1.0, 0.0
     return dx / magnitude, dy / magnitude
+
+
+def circle_time_of_impact(dx: float, dy: float, dvx: float, dvy: float, reach: float) -> float | None:
+    """First time a point at offset (dx, dy) closing at (dvx, dvy) comes within `reach`.
+
+    Returns 0.0 if it is already within reach and still closing, and None if
+    it never gets there.
+    """
+    b = 2.0 * ((dx * dvx) + (dy * dvy))
+    c = (dx * dx) + (dy * dy) - (reach * reach)
+    if c <= CONTACT_TOLERANCE * max(1.0, reach * reach):
+        return 0.0 if b < 0.0 else None
+    a = (dvx * dvx) + (dvy * dvy)
+    if b >= 0.0 or a == 0.0:
+        return None
+    discriminant = (b * b) - (4.0 * a * c)
+    if discriminant < 0.0:
+        return None
+    return max(0.0, (-b - math.sqrt(discriminant)) / (2.0 * a))
+
+
+# Batch counterparts of the functions above: many points or circles, given as
+# coordinate arrays, against one shape. Each does the same float arithmetic as
+# its scalar version, element by element. They need NumPy, which is imported
+# on first use so the scalar functions work without it.
+
+
+def closest_point_on_segment_batch(
+    xs: "np.ndarray", ys: "np.ndarray", start: Position, end: Position
+) -> tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    seg_x = end.x - start.x
+    seg_y = end.y - start.y
+    seg_len_sq = length_sq(seg_x, seg_y)
+    if seg_len_sq == 0.0:
+        return np.full_like(xs, start.x), np.full_like(ys, start.y)
+    t = (((xs - start.x) * seg_x) + ((ys - start.y) * seg_y)) / seg_len_sq
+    t = np.maximum(0.0, np.minimum(1.0, t))
+    return start.x + (seg_x * t), start.y + (seg_y * t)
+
+
+def distance_sq_point_segment_batch(
+    xs: "np.ndarray", ys: "np.ndarray", start: Position, end: Position
+) -> "np.ndarray":
+    closest_x, closest_y = closest_point_on_segment_batch(xs, ys, start, end)
+    dx = xs - closest_x
+    dy = ys - closest_y
+    return (dx * dx) + (dy * dy)
+
+
+def point_in_polygon_batch(xs: "np.ndarray", ys: "np.ndarray", polygon: Polygon) -> "np.ndarray":
+    import numpy as np
+
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    inside = np.zeros(xs.shape, dtype=bool)
+    vertices = polygon.vertices
+    # Horizontal edges divide by zero, but only where `crosses` already rules them out.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for index, left in enumerate(vertices):
+            right = vertices[(index + 1) % len(vertices)]
+            crosses = (left.y > ys) != (right.y > ys)
+            inside ^= crosses & (
+                xs < ((right.x - left.x) * (ys - left.y) / (right.y - left.y)) + left.x
+            )
+    return inside
+
+
+def circle_circle_overlap_batch(
+    xs: "np.ndarray", ys: "np.ndarray", radii: "np.ndarray | float", circle: Circle
+) -> "np.ndarray":
+    dx = xs - circle.center.x
+    dy = ys - circle.center.y
+    radius_sum = radii + circle.radius
+    return ((dx * dx) + (dy * dy)) <= radius_sum * radius_sum
+
+
+def circle_polygon_overlap_batch(
+    xs: "np.ndarray", ys: "np.ndarray", radii: "np.ndarray | float", polygon: Polygon
+) -> "np.ndarray":
+    overlaps = point_in_polygon_batch(xs, ys, polygon)
+    radii_sq = radii * radii
+    vertices = polygon.vertices
+    for index, start in enumerate(vertices):
+        end = vertices[(index + 1) % len(vertices)]
+        overlaps |= distance_sq_point_segment_batch(xs, ys, start, end) <= radii_sq
+    return overlaps
+
+
+def circle_capsule_overlap_batch(
+    xs: "np.ndarray", ys: "np.ndarray", radii: "np.ndarray | float", capsule: Capsule
+) -> "np.ndarray":
+    radius_sum = radii + capsule.radius
+    distances_sq = distance_sq_point_segment_batch(xs, ys, capsule.start, capsule.end)
+    return distances_sq <= radius_sum * radius_sum
+
+
+def polygon_closest_point_batch(
+    xs: "np.ndarray", ys: "np.ndarray", polygon: Polygon
+) -> tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    vertices = polygon.vertices
+    best_x = np.full_like(xs, vertices[0].x)
+    best_y = np.full_like(ys, vertices[0].y)
+    best_distance = ((xs - best_x) * (xs - best_x)) + ((ys - best_y) * (ys - best_y))
+    for index, start in enumerate(vertices):
+        end = vertices[(index + 1) % len(vertices)]
+        closest_x, closest_y = closest_point_on_segment_batch(xs, ys, start, end)
+        distance = ((xs - closest_x) * (xs - closest_x)) + ((ys - closest_y) * (ys - closest_y))
+        better = distance < best_distance
+        best_x = np.where(better, closest_x, best_x)
+        best_y = np.where(better, closest_y, best_y)
+        best_distance = np.where(better, distance, best_distance)
+    return best_x, best_y
+
+
+def normalize_batch(dxs: "np.ndarray", dys: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    magnitude = np.sqrt((dxs * dxs) + (dys * dys))
+    zero = magnitude == 0.0
+    safe = np.where(zero, 1.0, magnitude)
+    return np.where(zero, 1.0, dxs / safe), np.where(zero, 0.0, dys / safe)
@@ -0,0 +1,341 @@
+"""In-place simulation stepping on mutable creature records.
+
+`step_game_inplace` follows the same rules and pair order as `game.step_game`,
+but it updates `__slots__` records in place and reuses its pair grid and
+collision-pair sets from tick to tick, so a running game does not rebuild its
+creatures every tick. Convert with `to_mutable_state` / `to_game_state`.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+
+from .board import Board, Obstacle, Position
+from .creature import Creature
+from .game import (
+    _MIN_PAIR_CELL_SIZE,
+    GameState,
+    _bounce_off_obstacles,
+    _bounce_velocity_components,
+    _pair_key,
+    _wall_extents,
+)
+from .obstacles import ObstacleField, bake_obstacles
+from .rps import CreatureType, rps_winner
+from .spatial import SpatialHash
+
+
+class CreatureRecord:
+    __slots__ = (
+        "id",
+        "kind",
+        "x",
+        "y",
+        "vx",
+        "vy",
+        "radius",
+        "mass",
+        "alive",
+        "extent_radius",
+        "extent_left",
+        "extent_right",
+        "extent_up",
+        "extent_down",
+    )
+
+    def __init__(self, creature: Creature) -> None:
+        self.id = creature.id
+        self.kind = creature.kind
+        self.x = creature.pos.x
+        self.y = creature.pos.y
+        self.vx = creature.vx
+        self.vy = creature.vy
+        self.radius = creature.radius
+        self.mass = creature.mass
+        self.alive = True
+        # Wall extents only change with the radius, so they are cached per record.
+        self.extent_radius = float("nan")
+        self.extent_left = self.extent_right = self.extent_up = self.extent_down = 0.0
+
+    def to_creature(self) -> Creature:
+        return Creature(
+            id=self.id,
+            kind=self.kind,
+            pos=Position(self.x, self.y),
+            vx=self.vx,
+            vy=self.vy,
+            radius=self.radius,
+            mass=self.mass,
+        )
+
+
+@dataclass
+class MutableGameState:
+    board: Board
+    records: list[CreatureRecord]
+    obstacles: list[Obstacle] = field(default_factory=list)
+    tick: int = 0
+    active_collision_pairs: set[tuple[int, int]] = field(default_factory=set)
+    obstacle_field: ObstacleField | None = None
+    conversions: int = 0
+    pair_grid: SpatialHash = field(
+        default_factory=lambda: SpatialHash(cell_size=_MIN_PAIR_CELL_SIZE), repr=False
+    )
+    spare_pairs: set[tuple[int, int]] = field(default_factory=set, repr=False)
+    pair_candidates: list[int] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.obstacle_field is None:
+            self.obstacle_field = bake_obstacles(self.obstacles)
+
+
+def mutable_creature_counts(state: MutableGameState) -> Counter[CreatureType]:
+    return Counter(record.kind for record in state.records)
+
+
+def to_mutable_state(state: GameState) -> MutableGameState:
+    return MutableGameState(
+        board=state.board,
+        records=[CreatureRecord(c) for c in sorted(state.creatures, key=lambda c: c.id)],
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=set(state.active_collision_pairs),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
+
+
+def to_game_state(state: MutableGameState) -> GameState:
+    return GameState(
+        board=state.board,
+        creatures=[record.to_creature() for record in state.records],
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=set(state.active_collision_pairs),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
+
+
+def _may_touch_obstacle(record: CreatureRecord, obstacles: ObstacleField, start_x: float, start_y: float) -> bool:
+    radius = record.radius
+    sdf = obstacles.sdf
+    if sdf is not None and sdf.covers_radius(radius):
+        return sdf.sample(record.x, record.y)[0] <= radius
+
+    x = record.x
+    y = record.y
+    shapes = obstacles.shapes
+    if obstacles.index is None:
+        candidates = shapes
+    else:
+        candidates = [
+            shapes[index]
+            for index in obstacles.nearby(
+                min(start_x, x) - radius,
+                min(start_y, y) - radius,
+                max(start_x, x) + radius,
+                max(start_y, y) + radius,
+            )
+        ]
+    for shape in candidates:
+        if shape.may_touch_circle(x, y, radius):
+            return True
+    return False
+
+
+def _move_record(
+    record: CreatureRecord,
+    board: Board,
+    obstacles: ObstacleField,
+    default_radius: float | None,
+    dt_seconds: float,
+) -> None:
+    radius = (
+        record.radius
+        if record.radius > 0.0
+        else (default_radius if default_radius is not None else 0.0)
+    )
+    if radius != record.extent_radius:
+        (
+            record.extent_left,
+            record.extent_right,
+            record.extent_up,
+            record.extent_down,
+        ) = _wall_extents(record.kind, radius)
+        record.extent_radius = radius
+
+    start_x = record.x
+    start_y = record.y
+    next_x = start_x + (record.vx * dt_seconds)
+    next_y = start_y + (record.vy * dt_seconds)
+
+    extent_left = record.extent_left
+    extent_right = record.extent_right
+    if next_x < extent_left or next_x > board.width - extent_right:
+        record.vx = -record.vx
+        next_x = max(extent_left, min(board.width - extent_right, next_x))
+
+    extent_up = record.extent_up
+    extent_down = record.extent_down
+    if next_y < extent_up or next_y > board.height - extent_down:
+        record.vy = -record.vy
+        next_y = max(extent_up, min(board.height - extent_down, next_y))
+
+    record.x = next_x
+    record.y = next_y
+    record.radius = radius
+    if not _may_touch_obstacle(record, obstacles, start_x, start_y):
+        return
+
+    # Contacts are rare; resolve them with the exact scalar path.
+    bounced = _bounce_off_obstacles(
+        record.to_creature(), obstacles, swept_from=Position(start_x, start_y)
+    )
+    record.x = bounced.pos.x
+    record.y = bounced.pos.y
+    record.vx = bounced.vx
+    record.vy = bounced.vy
+
+
+def _records_overlap(left: CreatureRecord, right: CreatureRecord, fallback_distance: float) -> bool:
+    # Same arithmetic as game._creatures_overlap for circular creatures.
+    dx = left.x - right.x
+    dy = left.y - right.y
+    if left.radius <= 0.0 or right.radius <= 0.0:
+        return (dx * dx) + (dy * dy) <= fallback_distance * fallback_distance
+    radius_sum = left.radius + right.radius
+    return (dx * dx) + (dy * dy) <= radius_sum * radius_sum
+
+
+def _fill_pair_grid(grid: SpatialHash, records: list[CreatureRecord], encounter_distance: float) -> float:
+    max_radius = 0.0
+    for record in records:
+        if record.radius > max_radius:
+            max_radius = record.radius
+    cell_size = max(encounter_distance, 2.0 * max_radius, _MIN_PAIR_CELL_SIZE)
+    if cell_size != grid.cell_size:
+        grid.cell_size = cell_size
+        grid.cells.clear()
+    else:
+        grid.clear()
+    for index, record in enumerate(records):
+        grid.insert(index, record.x, record.y)
+    return max_radius
+
+
+def _pair_candidates(
+    grid: SpatialHash,
+    record: CreatureRecord,
+    after_index: int,
+    max_radius: float,
+    encounter_distance: float,
+    candidates: list[int],
+) -> int:
+    """Refill `candidates` with nearby indices in order; returns where those past `after_index` start.
+
+    The cell buckets are filled in index order, so the list is a few sorted
+    runs and sorts in near-linear time without filtering out earlier indices.
+    """
+    reach = max(encounter_distance, record.radius + max_radius)
+    candidates.clear()
+    grid.query_into(record.x, record.y, reach, candidates)
+    candidates.sort()
+    return bisect_right(candidates, after_index)
+
+
+def _bounce_records(left: CreatureRecord, right: CreatureRecord) -> None:
+    (left.vx, left.vy), (right.vx, right.vy) = _bounce_velocity_components(
+        left.x,
+        left.y,
+        left.vx,
+        left.vy,
+        left.mass,
+        right.x,
+        right.y,
+        right.vx,
+        right.vy,
+        right.mass,
+    )
+
+
+def _grow_record(winner: CreatureRecord, loser: CreatureRecord) -> None:
+    winner.radius = winner.radius + loser.mass
+    winner.mass = winner.mass + loser.mass
+
+
+def step_game_inplace(
+    state: MutableGameState,
+    convert_loser_to_winner: bool = True,
+    bounce_off_creatures: bool = True,
+    creature_radius: float | None = None,
+    grow_on_win: bool = False,
+    encounter_distance: float = 16.0,
+    dt_seconds: float = 1.0,
+) -> None:
+    records = state.records
+    for record in records:
+        _move_record(record, state.board, state.obstacle_field, creature_radius, dt_seconds)
+
+    grid = state.pair_grid
+    max_radius = _fill_pair_grid(grid, records, encounter_distance)
+    active_pairs = state.active_collision_pairs
+    collisions_this_tick = state.spare_pairs
+    collisions_this_tick.clear()
+    candidates = state.pair_candidates
+
+    for left_index, left in enumerate(records):
+        if not left.alive:
+            continue
+        position = _pair_candidates(
+            grid, left, left_index, max_radius, encounter_distance, candidates
+        )
+        while position < len(candidates):
+            right_index = candidates[position]
+            position += 1
+            right = records[right_index]
+            if not right.alive or not _records_overlap(left, right, encounter_distance):
+                continue
+
+            pair = _pair_key(left.id, right.id)
+            if bounce_off_creatures:
+                collisions_this_tick.add(pair)
+                if pair not in active_pairs:
+                    _bounce_records(left, right)
+
+            winner = rps_winner(left.kind, right.kind)
+            if winner is None:
+                continue
+            state.conversions += 1
+            if winner == left.kind:
+                if grow_on_win:
+                    _grow_record(left, right)
+                    max_radius = max(max_radius, left.radius)
+                    position = _pair_candidates(
+                        grid, left, right_index, max_radius, encounter_distance, candidates
+                    )
+                if convert_loser_to_winner:
+                    right.kind = left.kind
+                else:
+                    right.alive = False
+            else:
+                if grow_on_win:
+                    _grow_record(right, left)
+                    max_radius = max(max_radius, right.radius)
+                if convert_loser_to_winner:
+                    left.kind = right.kind
+                else:
+                    left.alive = False
+                    break
+
+    if not convert_loser_to_winner:
+        alive_count = 0
+        for record in records:
+            if record.alive:
+                records[alive_count] = record
+                alive_count += 1
+        del records[alive_count:]
+
+    state.spare_pairs = active_pairs
+    state.active_collision_pairs = collisions_this_tick
+    state.tick += 1
@@ -0,0 +1,577 @@
+"""Event-driven (kinetic) simulation for headless runs.
+
+Between contacts every creature moves in a straight line, so instead of
+stepping a fixed `dt` this engine predicts when each creature next touches a
+wall, an obstacle or another creature, keeps those events in a priority queue
+and jumps from one event to the next. Events are invalidated lazily: each body
+carries a version that is bumped whenever its trajectory changes, and events
+recorded against an older version are skipped when popped.
+
+Bodies also sit in a uniform grid whose cells are at least one contact reach
+wide, so a body only predicts contacts with bodies in the 3x3 cells around it
+and with obstacles that meet its cell. A `_CELL` event fires when a body's
+center leaves its cell; it moves the body in the grid and predicts contacts
+with whatever just came into range, without touching the body's other events.
+
+The contact rules follow `game.step_game`: a pair bounces once when it first
+touches (the same role `active_collision_pairs` plays there), converts or
+eliminates on contact and again on later ticks while the pair still touches,
+and winners can grow. Because contacts are resolved at their exact
+time rather than at the end of a tick, games do not replay `step_game`
+move-for-move. Time is still reported in ticks: `tick` is the number of whole
+`dt_seconds` steps that have elapsed, and `step_kinetic_state` skips every
+tick in which nothing happens.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+import heapq
+import math
+
+from .board import Board, Obstacle, Position
+from .creature import Creature
+from .game import (
+    _MIN_PAIR_CELL_SIZE,
+    GameState,
+    _bounce_velocity_components,
+    _obstacle_normal,
+    _pair_key,
+    _wall_extents,
+    mirror_vector,
+)
+from .geometry import CONTACT_TOLERANCE, circle_time_of_impact
+from .obstacles import ObstacleField, bake_obstacles, time_of_impact
+from .rps import CreatureType, rps_winner
+from .spatial import SpatialHash
+
+_WALL_X = 0
+_WALL_Y = 1
+_OBSTACLE = 2
+_CONTACT = 3
+_SEPARATE = 4
+_CONVERT = 5
+_CELL = 6
+_PAIR_EVENTS = (_CONTACT, _SEPARATE, _CONVERT)
+# Cells are a little wider than the largest contact reach, so bodies that are
+# touching (within CONTACT_TOLERANCE) always sit in neighbouring cells.
+_CELL_PADDING = 1e-6
+# A body wedged between obstacles and walls (usually after growing) can keep
+# reflecting back and forth without time advancing. After this many events at
+# one instant it stops reacting to obstacles it already overlaps.
+_MAX_EVENTS_PER_INSTANT = 16
+
+
+class _Body:
+    __slots__ = (
+        "id",
+        "kind",
+        "x",
+        "y",
+        "vx",
+        "vy",
+        "radius",
+        "mass",
+        "time",
+        "version",
+        "alive",
+        "instant",
+        "instant_events",
+        "cell",
+        "extent_left",
+        "extent_right",
+        "extent_up",
+        "extent_down",
+    )
+
+    def __init__(self, creature: Creature, radius: float) -> None:
+        self.id = creature.id
+        self.kind = creature.kind
+        self.x = creature.pos.x
+        self.y = creature.pos.y
+        self.vx = creature.vx
+        self.vy = creature.vy
+        self.radius = radius
+        self.mass = creature.mass
+        self.time = 0.0
+        self.version = 0
+        self.alive = True
+        self.instant = -1.0
+        self.instant_events = 0
+        self.cell = (0, 0)
+        self.set_radius(radius)
+
+    def set_radius(self, radius: float) -> None:
+        self.radius = radius
+        self.extent_left, self.extent_right, self.extent_up, self.extent_down = _wall_extents(
+            self.kind, radius
+        )
+
+    def position_at(self, time: float) -> tuple[float, float]:
+        elapsed = time - self.time
+        return self.x + (self.vx * elapsed), self.y + (self.vy * elapsed)
+
+    def advance(self, time: float) -> None:
+        self.x, self.y = self.position_at(time)
+        self.time = time
+
+
+@dataclass
+class KineticState:
+    board: Board
+    bodies: list[_Body]
+    dt_seconds: float
+    convert_loser_to_winner: bool = True
+    bounce_off_creatures: bool = True
+    grow_on_win: bool = False
+    encounter_distance: float = 16.0
+    obstacles: list[Obstacle] = field(default_factory=list)
+    obstacle_field: ObstacleField | None = None
+    time: float = 0.0
+    tick: int = 0
+    contacts: set[tuple[int, int]] = field(default_factory=set)
+    kind_counts: Counter[CreatureType] = field(default_factory=Counter)
+    conversions: int = 0
+    events_processed: int = 0
+    _events: list[tuple] = field(default_factory=list, repr=False)
+    _sequence: int = 0
+    _grid: SpatialHash = field(
+        default_factory=lambda: SpatialHash(cell_size=_MIN_PAIR_CELL_SIZE), repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.obstacle_field is None:
+            self.obstacle_field = bake_obstacles(self.obstacles)
+
+
+def kinetic_creature_counts(state: KineticState) -> Counter[CreatureType]:
+    return +state.kind_counts
+
+
+def to_kinetic_state(
+    state: GameState,
+    dt_seconds: float,
+    convert_loser_to_winner: bool = True,
+    bounce_off_creatures: bool = True,
+    creature_radius: float | None = None,
+    grow_on_win: bool = False,
+    encounter_distance: float = 16.0,
+) -> KineticState:
+    default_radius = creature_radius if creature_radius is not None else 0.0
+    bodies = [
+        _Body(creature, creature.radius if creature.radius > 0.0 else default_radius)
+        for creature in sorted(state.creatures, key=lambda c: c.id)
+    ]
+    kinetic = KineticState(
+        board=state.board,
+        bodies=bodies,
+        dt_seconds=dt_seconds,
+        convert_loser_to_winner=convert_loser_to_winner,
+        bounce_off_creatures=bounce_off_creatures,
+        grow_on_win=grow_on_win,
+        encounter_distance=encounter_distance,
+        obstacles=state.obstacles,
+        obstacle_field=state.obstacle_field,
+        time=state.tick * dt_seconds,
+        tick=state.tick,
+        kind_counts=Counter(body.kind for body in bodies),
+        conversions=state.conversions,
+    )
+    index_by_id = {body.id: index for index, body in enumerate(bodies)}
+    for left_id, right_id in state.active_collision_pairs:
+        if left_id in index_by_id and right_id in index_by_id:
+            kinetic.contacts.add(_pair_key(index_by_id[left_id], index_by_id[right_id]))
+    for body in bodies:
+        body.time = kinetic.time
+    kinetic._grid.cell_size = _pair_cell_size(kinetic)
+    _schedule_all(kinetic)
+    for left, right in list(kinetic.contacts):
+        # A pair the grid does not see as neighbours is too far apart to still touch.
+        if not _neighbour_cells(bodies[left].cell, bodies[right].cell):
+            _schedule_pair(kinetic, left, right)
+    return kinetic
+
+
+def to_game_state(state: KineticState) -> GameState:
+    creatures = []
+    for body in state.bodies:
+        if not body.alive:
+            continue
+        x, y = body.position_at(state.time)
+        creatures.append(
+            Creature(
+                id=body.id,
+                kind=body.kind,
+                pos=Position(x, y),
+                vx=body.vx,
+                vy=body.vy,
+                radius=body.radius,
+                mass=body.mass,
+            )
+        )
+    return GameState(
+        board=state.board,
+        creatures=creatures,
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=(
+            {_pair_key(state.bodies[i].id, state.bodies[j].id) for i, j in state.contacts}
+            if state.bounce_off_creatures
+            else set()
+        ),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
+
+
+def _push(state: KineticState, time: float, kind: int, index: int, other: int) -> None:
+    other_version = state.bodies[other].version if kind in _PAIR_EVENTS else -1
+    heapq.heappush(
+        state._events,
+        (time, state._sequence, kind, index, other, state.bodies[index].version, other_version),
+    )
+    state._sequence += 1
+
+
+def _fit_board(state: KineticState, body: _Body) -> None:
+    # A creature wider than the board cannot bounce between the walls, so it
+    # is pinned to the middle along that axis. Only called on bodies that are
+    # current at `state.time`.
+    if body.extent_left > state.board.width - body.extent_right:
+        body.x = state.board.width / 2.0
+        body.vx = 0.0
+    if body.extent_up > state.board.height - body.extent_down:
+        body.y = state.board.height / 2.0
+        body.vy = 0.0
+
+
+def _wall_time(position: float, velocity: float, low: float, high: float) -> float | None:
+    if velocity > 0.0:
+        return max(0.0, (high - position) / velocity)
+    if velocity < 0.0:
+        return max(0.0, (low - position) / velocity)
+    return None
+
+
+def _pair_reach(state: KineticState, left: _Body, right: _Body) -> float:
+    if left.radius <= 0.0 or right.radius <= 0.0:
+        return state.encounter_distance
+    return left.radius + right.radius
+
+
+def _schedule_pair(state: KineticState, index: int, other: int) -> None:
+    left = state.bodies[index]
+    right = state.bodies[other]
+    now = state.time
+    left_x, left_y = left.position_at(now)
+    right_x, right_y = right.position_at(now)
+    dx = right_x - left_x
+    dy = right_y - left_y
+    dvx = right.vx - left.vx
+    dvy = right.vy - left.vy
+    reach = _pair_reach(state, left, right)
+    pair = _pair_key(index, other)
+
+    if pair in state.contacts:
+        distance_sq = (dx * dx) + (dy * dy)
+        closing = (dx * dvx) + (dy * dvy)
+        if distance_sq > reach * reach * (1.0 + CONTACT_TOLERANCE) and closing >= 0.0:
+            state.contacts.discard(pair)
+            return
+        if rps_winner(left.kind, right.kind) is not None:
+            # One side changed kind while they were touching; step_game would
+            # convert the pair on its next tick, so do the same here.
+            _push(state, (math.floor(now / state.dt_seconds) + 1) * state.dt_seconds, _CONVERT, index, other)
+        a = (dvx * dvx) + (dvy * dvy)
+        if a == 0.0:
+            return
+        b = 2.0 * closing
+        c = distance_sq - (reach * reach)
+        leave = (-b + math.sqrt(max(0.0, (b * b) - (4.0 * a * c)))) / (2.0 * a)
+        _push(state, now + max(0.0, leave), _SEPARATE, index, other)
+        return
+
+    time = circle_time_of_impact(dx, dy, dvx, dvy, reach)
+    if time is None and (dx * dx) + (dy * dy) < reach * reach * (1.0 - CONTACT_TOLERANCE):
+        # Overlapping but drifting apart: step_game still counts this as a new contact.
+        time = 0.0
+    if time is not None:
+        _push(state, now + time, _CONTACT, index, other)
+
+
+def _pair_cell_size(state: KineticState) -> float:
+    max_radius = max((body.radius for body in state.bodies if body.alive), default=0.0)
+    reach = max(state.encounter_distance, 2.0 * max_radius, _MIN_PAIR_CELL_SIZE)
+    return reach * (1.0 + _CELL_PADDING)
+
+
+def _neighbour_cells(left: tuple[int, int], right: tuple[int, int]) -> bool:
+    return abs(left[0] - right[0]) <= 1 and abs(left[1] - right[1]) <= 1
+
+
+def _schedule_all(state: KineticState) -> None:
+    """Put every live body in the grid and predict all of its events from scratch."""
+    grid = state._grid
+    grid.cells.clear()
+    for index, body in enumerate(state.bodies):
+        if body.alive:
+            _fit_board(state, body)
+            body.cell = grid.cell_of(*body.position_at(state.time))
+            grid.cells.setdefault(body.cell, []).append(index)
+    for index, body in enumerate(state.bodies):
+        if body.alive:
+            _schedule_body(state, index, partners_after=index)
+
+
+def _regrid(state: KineticState) -> None:
+    # A winner grew past the cell size. Widen the cells at least twofold so
+    # this stays rare, and re-predict everything against the new grid.
+    state._grid.cell_size = max(_pair_cell_size(state), 2.0 * state._grid.cell_size)
+    for body in state.bodies:
+        if body.alive:
+            _touch(body, state.time)
+    _schedule_all(state)
+
+
+def _move_to_cell(state: KineticState, index: int, cell: tuple[int, int]) -> None:
+    body = state.bodies[index]
+    if cell != body.cell:
+        cells = state._grid.cells
+        cells[body.cell].remove(index)
+        cells.setdefault(cell, []).append(index)
+        body.cell = cell
+
+
+def _schedule_cell_exit(state: KineticState, index: int, x: float, y: float) -> None:
+    body = state.bodies[index]
+    cell_size = state._grid.cell_size
+    cell_x, cell_y = body.cell
+    exit_x = _wall_time(x, body.vx, cell_x * cell_size, (cell_x + 1) * cell_size)
+    exit_y = _wall_time(y, body.vy, cell_y * cell_size, (cell_y + 1) * cell_size)
+    if exit_x is not None and (exit_y is None or exit_x <= exit_y):
+        _push(state, state.time + exit_x, _CELL, index, _WALL_X)
+    elif exit_y is not None:
+        _push(state, state.time + exit_y, _CELL, index, _WALL_Y)
+
+
+def _cell_bounds(
+    state: KineticState, cell: tuple[int, int], margin: float
+) -> tuple[float, float, float, float]:
+    cell_size = state._grid.cell_size
+    return (
+        (cell[0] * cell_size) - margin,
+        (cell[1] * cell_size) - margin,
+        ((cell[0] + 1) * cell_size) + margin,
+        ((cell[1] + 1) * cell_size) + margin,
+    )
+
+
+def _schedule_obstacles(
+    state: KineticState,
+    index: int,
+    x: float,
+    y: float,
+    seen: tuple[float, float, float, float] | None = None,
+) -> None:
+    """Predict hits with obstacles near the body's cell, except those meeting the `seen` box."""
+    body = state.bodies[index]
+    now = state.time
+    wedged = body.instant == now and body.instant_events >= _MAX_EVENTS_PER_INSTANT
+    shapes = state.obstacle_field.shapes
+    for shape_index in state.obstacle_field.nearby(*_cell_bounds(state, body.cell, body.radius)):
+        shape = shapes[shape_index]
+        if (
+            seen is not None
+            and shape.min_x <= seen[2]
+            and shape.max_x >= seen[0]
+            and shape.min_y <= seen[3]
+            and shape.max_y >= seen[1]
+        ):
+            continue
+        time = time_of_impact(shape, x, y, body.vx, body.vy, body.radius)
+        if time is not None and not (wedged and time == 0.0):
+            _push(state, now + time, _OBSTACLE, index, shape_index)
+
+
+def _schedule_body(state: KineticState, index: int, partners_after: int = -1, skip: int = -1) -> None:
+    body = state.bodies[index]
+    now = state.time
+    _fit_board(state, body)
+    x, y = body.position_at(now)
+    board = state.board
+    wall_x = _wall_time(x, body.vx, body.extent_left, board.width - body.extent_right)
+    if wall_x is not None:
+        _push(state, now + wall_x, _WALL_X, index, index)
+    wall_y = _wall_time(y, body.vy, body.extent_up, board.height - body.extent_down)
+    if wall_y is not None:
+        _push(state, now + wall_y, _WALL_Y, index, index)
+    grid = state._grid
+    _move_to_cell(state, index, grid.cell_of(x, y))
+    _schedule_cell_exit(state, index, x, y)
+    _schedule_obstacles(state, index, x, y)
+    cell_x, cell_y = body.cell
+    partners = []
+    for neighbour_x in range(cell_x - 1, cell_x + 2):
+        for neighbour_y in range(cell_y - 1, cell_y + 2):
+            partners.extend(grid.cells.get((neighbour_x, neighbour_y), ()))
+    # Index order, so simultaneous contacts resolve in the same order as a full scan.
+    partners.sort()
+    for other in partners:
+        if other > partners_after and other != index and other != skip and state.bodies[other].alive:
+            _schedule_pair(state, index, other)
+
+
+def _enter_next_cell(state: KineticState, index: int, axis: int) -> None:
+    # The trajectory is unchanged, so every event already predicted stays
+    # valid; only bodies and obstacles that just came into range are new.
+    body = state.bodies[index]
+    old_cell = body.cell
+    x, y = body.position_at(state.time)
+    if axis == _WALL_X:
+        step = 1 if body.vx > 0.0 else -1
+        cell = (old_cell[0] + step, old_cell[1])
+        entering = [(cell[0] + step, cell[1] + offset) for offset in (-1, 0, 1)]
+    else:
+        step = 1 if body.vy > 0.0 else -1
+        cell = (old_cell[0], old_cell[1] + step)
+        entering = [(cell[0] + offset, cell[1] + step) for offset in (-1, 0, 1)]
+    _move_to_cell(state, index, cell)
+    cells = state._grid.cells
+    for neighbour in entering:
+        for other in cells.get(neighbour, ()):
+            if other != index and state.bodies[other].alive:
+                _schedule_pair(state, index, other)
+    _schedule_obstacles(state, index, x, y, seen=_cell_bounds(state, old_cell, body.radius))
+    _schedule_cell_exit(state, index, x, y)
+
+
+def _is_stale(state: KineticState, event: tuple) -> bool:
+    _, _, kind, index, other, version, other_version = event
+    body = state.bodies[index]
+    if not body.alive or body.version != version:
+        return True
+    if kind in _PAIR_EVENTS:
+        partner = state.bodies[other]
+        return not partner.alive or partner.version != other_version
+    return False
+
+
+def _touch(body: _Body, time: float) -> None:
+    body.advance(time)
+    body.version += 1
+
+
+def _resolve_contact(state: KineticState, index: int, other: int) -> None:
+    left = state.bodies[index]
+    right = state.bodies[other]
+    state.contacts.add(_pair_key(index, other))
+    if state.bounce_off_creatures:
+        (left.vx, left.vy), (right.vx, right.vy) = _bounce_velocity_components(
+            left.x, left.y, left.vx, left.vy, left.mass, right.x, right.y, right.vx, right.vy, right.mass
+        )
+    _convert(state, left, right)
+
+
+def _convert(state: KineticState, left: _Body, right: _Body) -> None:
+    winner = rps_winner(left.kind, right.kind)
+    if winner is None:
+        return
+    winner_body, loser_body = (left, right) if winner == left.kind else (right, left)
+    state.conversions += 1
+    state.kind_counts[loser_body.kind] -= 1
+    if state.grow_on_win:
+        winner_body.mass += loser_body.mass
+        winner_body.set_radius(winner_body.radius + loser_body.mass)
+    if state.convert_loser_to_winner:
+        loser_body.kind = winner_body.kind
+        state.kind_counts[winner_body.kind] += 1
+    else:
+        loser_body.alive = False
+
+
+def _process(state: KineticState, event: tuple) -> None:
+    time, _, kind, index, other, _, _ = event
+    state.time = time
+    if kind == _CELL:
+        _enter_next_cell(state, index, other)
+        return
+    body = state.bodies[index]
+    if body.instant == time:
+        body.instant_events += 1
+    else:
+        body.instant = time
+        body.instant_events = 1
+    _touch(body, time)
+    if kind == _WALL_X:
+        body.vx = -body.vx
+        body.x = max(body.extent_left, min(state.board.width - body.extent_right, body.x))
+    elif kind == _WALL_Y:
+        body.vy = -body.vy
+        body.y = max(body.extent_up, min(state.board.height - body.extent_down, body.y))
+    elif kind == _OBSTACLE:
+        normal_x, normal_y = _obstacle_normal(
+            state.obstacle_field.shapes[other], Position(body.x, body.y)
+        )
+        next_vx, next_vy = mirror_vector(normal_x, normal_y, body.vx, body.vy)
+        body.vx = -next_vx
+        body.vy = -next_vy
+    elif kind == _SEPARATE:
+        _touch(state.bodies[other], time)
+        state.contacts.discard(_pair_key(index, other))
+    elif kind == _CONVERT:
+        _touch(state.bodies[other], time)
+        _convert(state, body, state.bodies[other])
+    else:
+        _touch(state.bodies[other], time)
+        _resolve_contact(state, index, other)
+
+    if kind in _PAIR_EVENTS:
+        grown = 2.0 * max(body.radius, state.bodies[other].radius) * (1.0 + _CELL_PADDING)
+        if state.grow_on_win and grown > state._grid.cell_size:
+            _regrid(state)
+            return
+        for changed in (index, other):
+            if state.bodies[changed].alive:
+                _schedule_body(state, changed, skip=index if changed == other else -1)
+    else:
+        _schedule_body(state, index)
+
+
+def step_kinetic_state(state: KineticState, max_tick: int | None = None) -> KineticState:
+    """Advance to the end of the next tick in which any event happens.
+
+    Ticks without events are skipped, so `tick` may jump by more than one.
+    `max_tick` caps how far an empty stretch can skip.
+    """
+    events = state._events
+    horizon = math.inf
+    if max_tick is not None and max_tick > state.tick:
+        horizon = max_tick * state.dt_seconds
+    while events:
+        if _is_stale(state, events[0]):
+            heapq.heappop(events)
+        elif events[0][2] == _CELL and events[0][0] <= horizon:
+            # Moving through the grid does not make a tick happen on its own.
+            _process(state, heapq.heappop(events))
+        else:
+            break
+
+    next_tick = state.tick + 1
+    if events:
+        next_tick = max(next_tick, math.ceil(events[0][0] / state.dt_seconds))
+    elif max_tick is not None:
+        next_tick = max(next_tick, max_tick)
+    if max_tick is not None and max_tick > state.tick:
+        next_tick = min(next_tick, max_tick)
+
+    end_time = next_tick * state.dt_seconds
+    while events and events[0][0] <= end_time:
+        event = heapq.heappop(events)
+        if _is_stale(state, event):
+            continue
+        _process(state, event)
+        if event[2] != _CELL:
+            state.events_processed += 1
+
+    state.time = end_time
+    state.tick = next_tick
+    return state
@@ -0,0 +1,87 @@
+"""Per-tick game metrics, as yielded by `app.iter_game`, and a streaming writer for them.
+
+`MetricsWriter` picks its format from the file name: `.csv` gets a header row
+and one line per record, anything else gets JSON Lines. Records go through a
+large write buffer, so a long run costs a few syscalls per thousand records and
+no memory beyond the buffer.
+"""
+
+from collections import Counter
+import csv
+from dataclasses import dataclass
+import json
+from pathlib import Path
+
+from .game import GameState
+from .rps import CreatureType
+
+METRIC_FIELDS = ("tick", "rock", "paper", "scissors", "contacts", "conversions")
+_BUFFER_BYTES = 1 << 16
+
+
+@dataclass(frozen=True)
+class TickMetrics:
+    """Counts of one tick. `conversions` counts those since the previous record of the run.
+
+    `contacts` is the number of touching creature pairs; engines only track
+    those when creatures bounce off each other. `state` is only filled in
+    when the run was asked for snapshots.
+    """
+
+    tick: int
+    rock: int
+    paper: int
+    scissors: int
+    contacts: int
+    conversions: int
+    state: GameState | None = None
+
+    @property
+    def counts(self) -> Counter[CreatureType]:
+        return Counter(
+            {
+                CreatureType.ROCK: self.rock,
+                CreatureType.PAPER: self.paper,
+                CreatureType.SCISSORS: self.scissors,
+            }
+        )
+
+    @property
+    def winner(self) -> CreatureType | None:
+        alive = [kind for kind, count in self.counts.items() if count > 0]
+        return alive[0] if len(alive) == 1 else None
+
+    def row(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in METRIC_FIELDS}
+
+
+class MetricsWriter:
+    """Streams `TickMetrics` records to a `.csv` or JSON Lines file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.records = 0
+        self._file = open(self.path, "w", buffering=_BUFFER_BYTES, newline="")
+        self._csv = None
+        if self.path.suffix.lower() == ".csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(METRIC_FIELDS)
+
+    def write(self, metrics: TickMetrics) -> None:
+        if self._csv is not None:
+            self._csv.writerow([getattr(metrics, name) for name in METRIC_FIELDS])
+        else:
+            self._file.write(json.dumps(metrics.row(), separators=(",", ":")) + "\n")
+        self.records += 1
+
+    def close(self) -> int:
+        """Flush and close the file; returns how many records were written."""
+        self._file.close()
+        return self.records
+
+    def __enter__(self) -> "MetricsWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,269 @@
+from dataclasses import dataclass
+import math
+from typing import TYPE_CHECKING
+
+from .board import Obstacle, Position
+from .geometry import (
+    Circle,
+    Contact,
+    Polygon,
+    circle_circle_contact,
+    circle_polygon_contact,
+    circle_time_of_impact,
+    normalize,
+)
+from .spatial import SpatialHash
+
+if TYPE_CHECKING:
+    from .sdf import DistanceField
+
+# Bounding-circle rejects are padded by this relative amount so float rounding
+# can never reject a contact that the exact primitive test would accept.
+_BOUNDS_PADDING = 1e-9
+_QUERY_PADDING = 1e-6
+_INDEX_MIN_SHAPES = 8
+
+
+def _translate(point: Position, dx: float, dy: float) -> Position:
+    return Position(point.x + dx, point.y + dy)
+
+
+def _rotate(point: Position, angle: float) -> Position:
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    return Position(
+        (point.x * cos_angle) - (point.y * sin_angle),
+        (point.x * sin_angle) + (point.y * cos_angle),
+    )
+
+
+def obstacle_primitives(obstacle: Obstacle) -> list[Circle | Polygon]:
+    if obstacle.kind == "square":
+        points = (
+            Position(-obstacle.size, -obstacle.size),
+            Position(obstacle.size, -obstacle.size),
+            Position(obstacle.size, obstacle.size),
+            Position(-obstacle.size, obstacle.size),
+        )
+        return [
+            Polygon(
+                tuple(
+                    _translate(_rotate(point, obstacle.rotation), obstacle.pos.x, obstacle.pos.y)
+                    for point in points
+                )
+            )
+        ]
+    if obstacle.kind == "triangle":
+        points = (
+            Position(0.0, -obstacle.size),
+            Position(-obstacle.size, obstacle.size),
+            Position(obstacle.size, obstacle.size),
+        )
+        return [
+            Polygon(
+                tuple(
+                    _translate(_rotate(point, obstacle.rotation), obstacle.pos.x, obstacle.pos.y)
+                    for point in points
+                )
+            )
+        ]
+    return [Circle(center=obstacle.pos, radius=obstacle.size)]
+
+
+@dataclass(frozen=True)
+class ObstacleShape:
+    """World-space collision geometry for one obstacle, computed once per game."""
+
+    obstacle: Obstacle
+    primitive: Circle | Polygon
+    edges: tuple[tuple[float, float], ...]
+    edge_lengths_sq: tuple[float, ...]
+    bounding_radius: float
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    def may_touch_circle(self, x: float, y: float, radius: float) -> bool:
+        dx = x - self.obstacle.pos.x
+        dy = y - self.obstacle.pos.y
+        reach = (radius + self.bounding_radius) * (1.0 + _BOUNDS_PADDING)
+        return (dx * dx) + (dy * dy) <= reach * reach
+
+    def may_touch_shape(self, other: "ObstacleShape") -> bool:
+        return self.may_touch_circle(other.obstacle.pos.x, other.obstacle.pos.y, other.bounding_radius)
+
+
+@dataclass(frozen=True)
+class ObstacleField:
+    shapes: tuple[ObstacleShape, ...]
+    index: SpatialHash | None = None
+    sdf: "DistanceField | None" = None
+
+    def nearby(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list[int]:
+        """Indices, in obstacle order, of shapes whose AABB may meet the given box."""
+        if self.index is None:
+            return list(range(len(self.shapes)))
+        return sorted(
+            self.index.query_bounds(
+                min_x - _QUERY_PADDING,
+                min_y - _QUERY_PADDING,
+                max_x + _QUERY_PADDING,
+                max_y + _QUERY_PADDING,
+            )
+        )
+
+    def nearby_circle(self, x: float, y: float, radius: float) -> list[int]:
+        return self.nearby(x - radius, y - radius, x + radius, y + radius)
+
+
+def index_shapes(shapes: tuple[ObstacleShape, ...]) -> ObstacleField:
+    # A handful of obstacles is cheaper to scan than to look up in a grid.
+    if len(shapes) < _INDEX_MIN_SHAPES:
+        return ObstacleField(shapes=shapes)
+
+    mean_extent = sum(
+        max(shape.max_x - shape.min_x, shape.max_y - shape.min_y) for shape in shapes
+    ) / len(shapes)
+    index = SpatialHash(cell_size=max(1.0, mean_extent))
+    for shape_index, shape in enumerate(shapes):
+        index.insert_bounds(shape_index, shape.min_x, shape.min_y, shape.max_x, shape.max_y)
+    return ObstacleField(shapes=shapes, index=index)
+
+
+def bake_obstacle(obstacle: Obstacle) -> ObstacleShape:
+    primitive = obstacle_primitives(obstacle)[0]
+    if isinstance(primitive, Circle):
+        return ObstacleShape(
+            obstacle=obstacle,
+            primitive=primitive,
+            edges=(),
+            edge_lengths_sq=(),
+            bounding_radius=primitive.radius,
+            min_x=primitive.center.x - primitive.radius,
+            min_y=primitive.center.y - primitive.radius,
+            max_x=primitive.center.x + primitive.radius,
+            max_y=primitive.center.y + primitive.radius,
+        )
+
+    vertices = primitive.vertices
+    edges = tuple(
+        (
+            vertices[(index + 1) % len(vertices)].x - start.x,
+            vertices[(index + 1) % len(vertices)].y - start.y,
+        )
+        for index, start in enumerate(vertices)
+    )
+    return ObstacleShape(
+        obstacle=obstacle,
+        primitive=primitive,
+        edges=edges,
+        edge_lengths_sq=tuple((edge_x * edge_x) + (edge_y * edge_y) for edge_x, edge_y in edges),
+        bounding_radius=max(
+            math.hypot(vertex.x - obstacle.pos.x, vertex.y - obstacle.pos.y)
+            for vertex in vertices
+        ),
+        min_x=min(vertex.x for vertex in vertices),
+        min_y=min(vertex.y for vertex in vertices),
+        max_x=max(vertex.x for vertex in vertices),
+        max_y=max(vertex.y for vertex in vertices),
+    )
+
+
+def bake_obstacles(obstacles: list[Obstacle]) -> ObstacleField:
+    return index_shapes(tuple(bake_obstacle(obstacle) for obstacle in obstacles))
+
+
+def closest_point(shape: ObstacleShape, x: float, y: float) -> tuple[float, float]:
+    """Closest point on the obstacle outline to (x, y).
+
+    Uses the baked edge vectors but the same arithmetic as
+    `geometry.polygon_closest_point`, so results are bit-for-bit identical.
+    """
+    primitive = shape.primitive
+    if isinstance(primitive, Circle):
+        normal_x, normal_y = normalize(x - primitive.center.x, y - primitive.center.y)
+        return (
+            primitive.center.x + (normal_x * primitive.radius),
+            primitive.center.y + (normal_y * primitive.radius),
+        )
+
+    vertices = primitive.vertices
+    best_x = vertices[0].x
+    best_y = vertices[0].y
+    best_distance = ((x - best_x) * (x - best_x)) + ((y - best_y) * (y - best_y))
+    for start, (edge_x, edge_y), edge_length_sq in zip(
+        vertices, shape.edges, shape.edge_lengths_sq, strict=True
+    ):
+        if edge_length_sq == 0.0:
+            candidate_x = start.x
+            candidate_y = start.y
+        else:
+            t = (((x - start.x) * edge_x) + ((y - start.y) * edge_y)) / edge_length_sq
+            t = max(0.0, min(1.0, t))
+            candidate_x = start.x + (edge_x * t)
+            candidate_y = start.y + (edge_y * t)
+        distance = ((x - candidate_x) * (x - candidate_x)) + ((y - candidate_y) * (y - candidate_y))
+        if distance < best_distance:
+            best_x = candidate_x
+            best_y = candidate_y
+            best_distance = distance
+    return best_x, best_y
+
+
+def circle_contact(shape: ObstacleShape, x: float, y: float, radius: float) -> Contact | None:
+    """How a circle at (x, y) overlaps the obstacle, or None if it does not."""
+    if not shape.may_touch_circle(x, y, radius):
+        return None
+    primitive = shape.primitive
+    if isinstance(primitive, Circle):
+        return circle_circle_contact(Circle(center=Position(x, y), radius=radius), primitive)
+    return circle_polygon_contact(Circle(center=Position(x, y), radius=radius), primitive)
+
+
+def _polygon_time_of_impact(
+    shape: ObstacleShape, x: float, y: float, vx: float, vy: float, radius: float
+) -> float | None:
+    vertices = shape.primitive.vertices
+    best = None
+    for start, (edge_x, edge_y), edge_length_sq, (normal_x, normal_y) in zip(
+        vertices, shape.edges, shape.edge_lengths_sq, shape.primitive.edge_normals, strict=True
+    ):
+        if edge_length_sq == 0.0:
+            continue
+        closing = (vx * normal_x) + (vy * normal_y)
+        gap = ((x - start.x) * normal_x) + ((y - start.y) * normal_y) - radius
+        if closing >= 0.0 or gap < 0.0:
+            continue
+        time = gap / -closing
+        along = (((x + (vx * time)) - start.x) * edge_x) + (((y + (vy * time)) - start.y) * edge_y)
+        if 0.0 <= along <= edge_length_sq and (best is None or time < best):
+            best = time
+    for vertex in vertices:
+        time = circle_time_of_impact(x - vertex.x, y - vertex.y, vx, vy, radius)
+        if time is not None and (best is None or time < best):
+            best = time
+    return best
+
+
+def time_of_impact(
+    shape: ObstacleShape, x: float, y: float, vx: float, vy: float, radius: float
+) -> float | None:
+    """When a circle at (x, y) moving at (vx, vy) first touches the obstacle.
+
+    0.0 means it already overlaps and is moving further in; None means no
+    contact ahead. Obstacle polygons are convex, so the first edge or vertex
+    the swept circle reaches is the contact.
+    """
+    primitive = shape.primitive
+    if isinstance(primitive, Circle):
+        return circle_time_of_impact(
+            x - primitive.center.x, y - primitive.center.y, vx, vy, radius + primitive.radius
+        )
+    closest_x, closest_y = closest_point(shape, x, y)
+    gap_x = x - closest_x
+    gap_y = y - closest_y
+    if (gap_x * gap_x) + (gap_y * gap_y) <= radius * radius:
+        normal_x, normal_y = normalize(gap_x, gap_y)
+        return 0.0 if (vx * normal_x) + (vy * normal_y) < 0.0 else None
+    return _polygon_time_of_impact(shape, x, y, vx, vy, radius)
@@ -0,0 +1,130 @@
+"""Render a headless run to disk, one frame every few ticks.
+
+Frames are drawn with `render.draw_state` onto an offscreen surface (the SDL
+dummy video driver is used when no display is configured), copied out as RGB
+bytes and handed to a writer thread through a bounded queue. The thread does
+the encoding, so the simulation only waits when the writer has fallen a whole
+queue behind, and memory stays flat however long the run is.
+
+`image_format="png"` writes `frame-0000000.png`, `frame-0000001.png`, ... and
+`"raw"` appends every frame to one `frames.rgb` file of packed 8-bit RGB, which
+ffmpeg reads with `-f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT`.
+"""
+
+import os
+from pathlib import Path
+import queue
+import threading
+
+from .config import SimConfig
+from .game import GameState
+
+IMAGE_FORMATS = ("png", "raw")
+_RAW_FILE_NAME = "frames.rgb"
+
+
+class FrameRecorder:
+    """Offscreen frames of one game every `every` ticks, written from a background thread."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        config: SimConfig,
+        every: int = 1,
+        image_format: str = "png",
+        queue_frames: int = 8,
+    ) -> None:
+        if every < 1:
+            raise ValueError("Frames can be recorded at most once per tick")
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown frame format: {image_format}")
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+
+        from .render import LevelOfDetail
+
+        pygame.init()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.config = config
+        self.every = every
+        self.image_format = image_format
+        self.size = (config.window_width, config.window_height)
+        self.frames = 0
+        self.next_tick = 0
+        self._last_tick = -1
+        self._surface = pygame.Surface(self.size)
+        self._lod = LevelOfDetail(config.lod_dots_above, config.lod_heatmap_above)
+        self._raw = open(self.directory / _RAW_FILE_NAME, "wb") if image_format == "raw" else None
+        self._queue: queue.Queue[tuple[int, bytes] | None] = queue.Queue(maxsize=queue_frames)
+        self._error: BaseException | None = None
+        self._writer = threading.Thread(target=self._write_frames, name="frame-writer", daemon=True)
+        self._writer.start()
+
+    def capture(self, state: GameState) -> None:
+        """Queue a frame of `state` if a recording tick has come round since the last one.
+
+        Engines that jump several ticks at once get a single frame, of the
+        first state they reach on or after the recording tick.
+        """
+        if state.tick < self.next_tick:
+            return
+        self.next_tick = ((state.tick // self.every) + 1) * self.every
+        self.write(state)
+
+    def finish(self, state: GameState) -> None:
+        """Queue the game's last state unless it was just captured, so recordings end on it."""
+        if state.tick != self._last_tick:
+            self.write(state)
+
+    def write(self, state: GameState) -> None:
+        """Queue a frame of `state` unconditionally."""
+        import pygame
+
+        from .render import draw_state
+
+        self._raise_writer_error()
+        draw_state(self._surface, state, self.config, lod=self._lod)
+        self._queue.put((self.frames, pygame.image.tobytes(self._surface, "RGB")))
+        self.frames += 1
+        self._last_tick = state.tick
+
+    def close(self) -> int:
+        """Wait for every queued frame to be written; returns how many were recorded."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._raise_writer_error()
+        return self.frames
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Writing frames to {self.directory} failed") from self._error
+
+    def _write_frames(self) -> None:
+        import pygame
+
+        raw = self._raw
+        try:
+            while (item := self._queue.get()) is not None:
+                if self._error is not None:
+                    # Keep draining so a producer blocked on a full queue is released.
+                    continue
+                index, pixels = item
+                try:
+                    if raw is not None:
+                        raw.write(pixels)
+                    else:
+                        image = pygame.image.frombytes(pixels, self.size, "RGB")
+                        pygame.image.save(image, str(self.directory / f"frame-{index:07d}.png"))
+                except Exception as error:
+                    self._error = error
+        finally:
+            if raw is not None:
+                raw.close()
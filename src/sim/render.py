@@ -1,13 +1,15 @@
-from functools import lru_cache
+from dataclasses import dataclass, field
 import math
-from pathlib import Path
 
 import pygame
 
 from .config import SimConfig
-from .game import GameState, _creature_primitives, _obstacle_primitives, creature_counts
+from .creature import Creature
+from .game import GameState, _creature_primitives, creature_counts
 from .geometry import Capsule, Circle, Polygon
+from .obstacles import ObstacleField
 from .rps import CreatureType
+from .stats import TickStats
 
 _BG_COLOR = (240, 243, 247)
 _COLOR_BY_TYPE = {
@@ -16,10 +18,20 @@ _COLOR_BY_TYPE = {
     CreatureType.SCISSORS: (70, 170, 90),
 }
 _TEXT_COLOR = (25, 30, 40)
-_SPRITE_DIR = Path("assets/sprites")
 _DEBUG_CREATURE_COLOR = (255, 140, 60)
 _DEBUG_OBSTACLE_COLOR = (80, 20, 20)
 
+# Background fill plus obstacles for the current game, keyed on the identity of
+# its baked obstacle field: steps share one field, `create_game` makes a new one.
+_static_layer: tuple[ObstacleField, tuple[int, int], pygame.Surface] | None = None
+# Above this share of the screen, one full update beats many small ones.
+_DIRTY_FULL_FRAME_SHARE = 0.5
+LOD_LEVELS = ("sprites", "dots", "heatmap")
+# Side of a square heatmap cell, in pixels.
+_HEATMAP_CELL = 16
+# Never produced by the shading, so it can mark heatmap cells to leave untouched.
+_HEATMAP_EMPTY = (255, 0, 255)
+
 
 def _build_default_sprite(kind: CreatureType, radius: int) -> pygame.Surface:
     diameter = radius * 2
@@ -103,36 +115,219 @@ def _build_default_sprite(kind: CreatureType, radius: int) -> pygame.Surface:
     return sprite
 
 
-def _sprite_path(kind: CreatureType) -> Path:
-    return _SPRITE_DIR / f"{kind.value}.png"
+def radius_bucket(radius: float) -> int:
+    """Sprite radius drawn for `radius`: exact below 16 px, then 8 sizes per doubling."""
+    whole = max(1, int(round(radius)))
+    step = 1 << max(0, whole.bit_length() - 4)
+    return max(1, ((whole + (step // 2)) // step) * step)
 
 
-def _ensure_sprite_assets(radius: int) -> None:
-    _SPRITE_DIR.mkdir(parents=True, exist_ok=True)
-    for kind in CreatureType:
-        path = _sprite_path(kind)
-        # Keep default file sprites in sync with current built-in art.
-        pygame.image.save(_build_default_sprite(kind, radius), str(path))
+@dataclass
+class SpriteAtlas:
+    """Creature sprites per kind and radius bucket, drawn in memory on first use.
 
+    Growing creatures only ever add a sprite when they cross into a new
+    bucket, so a game never rebuilds art for every new radius.
+    """
 
-@lru_cache(maxsize=32)
-def _load_sprite(kind: CreatureType, radius: int) -> pygame.Surface:
-    _ensure_sprite_assets(radius)
-    sprite = pygame.image.load(str(_sprite_path(kind))).convert_alpha()
-    expected_size = radius * 2
-    if sprite.get_width() != expected_size or sprite.get_height() != expected_size:
-        sprite = pygame.transform.smoothscale(sprite, (expected_size, expected_size))
-    return sprite
+    sprites: dict[tuple[CreatureType, int], pygame.Surface] = field(default_factory=dict)
+
+    def sprite(self, kind: CreatureType, radius: float) -> pygame.Surface:
+        key = (kind, radius_bucket(radius))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = _build_default_sprite(kind, key[1])
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            self.sprites[key] = sprite
+        return sprite
+
+    def prebuild(self, radius: float) -> None:
+        for kind in CreatureType:
+            self.sprite(kind, radius)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(
+            sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+            for sprite in self.sprites.values()
+        )
+
+
+SPRITES = SpriteAtlas()
+# Reused by every frame's creature pass instead of building a new list.
+_blit_sequence: list[tuple[pygame.Surface, tuple[int, int]]] = []
+
+
+def _creature_rect(creature: Creature) -> pygame.Rect:
+    radius = radius_bucket(creature.radius)
+    return pygame.Rect(int(creature.pos.x) - radius, int(creature.pos.y) - radius, 2 * radius, 2 * radius)
+
+
+def _creature_blits(state: GameState) -> list[tuple[pygame.Surface, tuple[int, int]]]:
+    """Fill the shared blit sequence with one (sprite, top-left) pair per creature."""
+    sequence = _blit_sequence
+    del sequence[len(state.creatures) :]
+    # Most creatures share a handful of radii, so look each (kind, radius) up once per frame.
+    sprites: dict[tuple[CreatureType, float], tuple[pygame.Surface, int]] = {}
+    for index, creature in enumerate(state.creatures):
+        key = (creature.kind, creature.radius)
+        entry = sprites.get(key)
+        if entry is None:
+            sprite = SPRITES.sprite(creature.kind, creature.radius)
+            entry = sprites[key] = (sprite, sprite.get_width() // 2)
+        sprite, half = entry
+        item = (sprite, (int(creature.pos.x) - half, int(creature.pos.y) - half))
+        if index < len(sequence):
+            sequence[index] = item
+        else:
+            sequence.append(item)
+    return sequence
 
 
 def _draw_creatures(screen: pygame.Surface, state: GameState, config: SimConfig) -> None:
-    for creature in state.creatures:
-        radius = max(1, int(round(creature.radius)))
-        sprite = _load_sprite(creature.kind, radius)
-        center_x = int(creature.pos.x)
-        center_y = int(creature.pos.y)
-        top_left = (center_x - radius, center_y - radius)
-        screen.blit(sprite, top_left)
+    screen.fblits(_creature_blits(state))
+
+
+def _numpy_or_none():
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+def _creature_arrays(np, creatures: list[Creature]):
+    """Pixel x, pixel y and kind index of every creature, gathered in one pass."""
+    kind_index = {kind: index for index, kind in enumerate(CreatureType)}
+    coords: list[float] = []
+    extend = coords.extend
+    for creature in creatures:
+        pos = creature.pos
+        extend((pos.x, pos.y))
+    xy = np.array(coords, dtype=np.float64).reshape(-1, 2).astype(np.intp)
+    kinds = np.fromiter(
+        (kind_index[creature.kind] for creature in creatures), dtype=np.intp, count=len(creatures)
+    )
+    return xy[:, 0], xy[:, 1], kinds
+
+
+def _draw_creature_dots(screen: pygame.Surface, state: GameState) -> None:
+    """One 3x3 kind-colored dot per creature, written straight into the pixels."""
+    creatures = state.creatures
+    np = _numpy_or_none()
+    if np is None or screen.get_bytesize() not in (1, 2, 4):
+        for creature in creatures:
+            x, y = int(creature.pos.x), int(creature.pos.y)
+            screen.fill(_COLOR_BY_TYPE[creature.kind], (x - 1, y - 1, 3, 3))
+        return
+
+    xs, ys, kinds = _creature_arrays(np, creatures)
+    width, height = screen.get_size()
+    pixels = pygame.surfarray.pixels2d(screen)
+    try:
+        palette = np.array([screen.map_rgb(_COLOR_BY_TYPE[kind]) for kind in CreatureType])
+        palette = palette.astype(pixels.dtype)
+        colors = palette[kinds]
+        for dx in (-1, 0, 1):
+            column = np.clip(xs + dx, 0, width - 1)
+            for dy in (-1, 0, 1):
+                pixels[column, np.clip(ys + dy, 0, height - 1)] = colors
+    finally:
+        del pixels
+
+
+def _heatmap_color(totals, densest: int) -> tuple[int, int, int]:
+    total = sum(totals)
+    # Square root so sparse cells stay visible next to crowded ones.
+    strength = math.sqrt(total / densest)
+    mix = [
+        sum(_COLOR_BY_TYPE[kind][channel] * count for kind, count in zip(CreatureType, totals)) / total
+        for channel in range(3)
+    ]
+    return tuple(
+        int((_BG_COLOR[channel] * (1.0 - strength)) + (mix[channel] * strength)) for channel in range(3)
+    )
+
+
+def _draw_creature_heatmap(screen: pygame.Surface, state: GameState) -> None:
+    """Shade coarse cells by how many creatures they hold, tinted by the kinds present.
+
+    Empty cells are left alone so the obstacles underneath stay visible.
+    """
+    if not state.creatures:
+        return
+    width, height = screen.get_size()
+    columns = (width + _HEATMAP_CELL - 1) // _HEATMAP_CELL
+    rows = (height + _HEATMAP_CELL - 1) // _HEATMAP_CELL
+    np = _numpy_or_none()
+    if np is None:
+        kind_index = {kind: index for index, kind in enumerate(CreatureType)}
+        cells: dict[tuple[int, int], list[int]] = {}
+        for creature in state.creatures:
+            cell = (int(creature.pos.x) // _HEATMAP_CELL, int(creature.pos.y) // _HEATMAP_CELL)
+            totals = cells.get(cell)
+            if totals is None:
+                totals = cells[cell] = [0, 0, 0]
+            totals[kind_index[creature.kind]] += 1
+        densest = max(sum(totals) for totals in cells.values())
+        for (column, row), totals in cells.items():
+            screen.fill(
+                _heatmap_color(totals, densest),
+                (column * _HEATMAP_CELL, row * _HEATMAP_CELL, _HEATMAP_CELL, _HEATMAP_CELL),
+            )
+        return
+
+    xs, ys, kinds = _creature_arrays(np, state.creatures)
+    column = np.clip(xs // _HEATMAP_CELL, 0, columns - 1)
+    row = np.clip(ys // _HEATMAP_CELL, 0, rows - 1)
+    counts = np.bincount(
+        (((column * rows) + row) * 3) + kinds, minlength=columns * rows * 3
+    ).reshape(columns, rows, 3)
+    totals = counts.sum(axis=2)
+    strength = np.sqrt(totals / totals.max())[:, :, None]
+    kind_colors = np.array([_COLOR_BY_TYPE[kind] for kind in CreatureType], dtype=np.float64)
+    mix = (counts @ kind_colors) / np.maximum(totals, 1)[:, :, None]
+    shaded = (np.array(_BG_COLOR) * (1.0 - strength)) + (mix * strength)
+    shaded[totals == 0] = _HEATMAP_EMPTY
+    cells = pygame.surfarray.make_surface(shaded.astype(np.uint8))
+    cells.set_colorkey(_HEATMAP_EMPTY)
+    screen.blit(pygame.transform.scale(cells, (columns * _HEATMAP_CELL, rows * _HEATMAP_CELL)), (0, 0))
+
+
+@dataclass
+class LevelOfDetail:
+    """Chooses between sprites, dots and a heatmap from the creature count.
+
+    A level is entered above its threshold but only left again below
+    `hysteresis` times that threshold, so a population hovering around a
+    threshold does not flicker between looks. `forced` pins one level.
+    """
+
+    dots_above: int = 3_000
+    heatmap_above: int = 50_000
+    hysteresis: float = 0.8
+    forced: str | None = None
+    level: str = "sprites"
+
+    def update(self, creature_count: int) -> str:
+        if self.forced is not None:
+            self.level = self.forced
+            return self.level
+        thresholds = (self.dots_above, self.heatmap_above)
+        rank = LOD_LEVELS.index(self.level)
+        while rank < len(thresholds) and creature_count > thresholds[rank]:
+            rank += 1
+        while rank > 0 and creature_count < thresholds[rank - 1] * self.hysteresis:
+            rank -= 1
+        self.level = LOD_LEVELS[rank]
+        return self.level
+
+    def cycle(self) -> str:
+        """Step auto -> sprites -> dots -> heatmap -> auto; returns a label for the new mode."""
+        choices = (None, *LOD_LEVELS)
+        self.forced = choices[(choices.index(self.forced) + 1) % len(choices)]
+        return "auto" if self.forced is None else self.forced
 
 
 def _draw_obstacles(screen: pygame.Surface, state: GameState) -> None:
@@ -177,7 +372,24 @@ def _draw_obstacles(screen: pygame.Surface, state: GameState) -> None:
             pygame.draw.circle(screen, outline, center, size, 3)
 
 
-def _draw_hud(screen: pygame.Surface, state: GameState) -> None:
+def _background_layer(screen: pygame.Surface, state: GameState) -> pygame.Surface:
+    global _static_layer
+    size = screen.get_size()
+    if (
+        _static_layer is not None
+        and _static_layer[0] is state.obstacle_field
+        and _static_layer[1] == size
+    ):
+        return _static_layer[2]
+
+    layer = pygame.Surface(size, 0, screen)
+    layer.fill(_BG_COLOR)
+    _draw_obstacles(layer, state)
+    _static_layer = (state.obstacle_field, size, layer)
+    return layer
+
+
+def _draw_hud(screen: pygame.Surface, state: GameState) -> pygame.Rect:
     font = pygame.font.Font(None, 26)
     counts = creature_counts(state)
     label = (
@@ -187,7 +399,19 @@ def _draw_hud(screen: pygame.Surface, state: GameState) -> None:
         f"Scissors: {counts[CreatureType.SCISSORS]}"
     )
     text_surface = font.render(label, True, _TEXT_COLOR)
-    screen.blit(text_surface, (8, 8))
+    return screen.blit(text_surface, (8, 8))
+
+
+def _draw_tick_stats(screen: pygame.Surface, stats: TickStats) -> list[pygame.Rect]:
+    if stats.ticks == 0:
+        return []
+    font = pygame.font.Font(None, 20)
+    lines = stats.summary_lines()
+    lines.append(f"  sprite atlas: {len(SPRITES.sprites)} sprites, {SPRITES.memory_bytes / 1024:.0f} KiB")
+    return [
+        screen.blit(font.render(line, True, _TEXT_COLOR), (8, 34 + (row * 16)))
+        for row, line in enumerate(lines)
+    ]
 
 
 def _draw_debug_primitive(
@@ -219,9 +443,8 @@ def _draw_debug_primitive(
 
 
 def _draw_debug_boundaries(screen: pygame.Surface, state: GameState) -> None:
-    for obstacle in state.obstacles:
-        for primitive in _obstacle_primitives(obstacle):
-            _draw_debug_primitive(screen, primitive, _DEBUG_OBSTACLE_COLOR)
+    for shape in state.obstacle_field.shapes:
+        _draw_debug_primitive(screen, shape.primitive, _DEBUG_OBSTACLE_COLOR)
 
     for creature in state.creatures:
         for primitive in _creature_primitives(creature):
@@ -233,10 +456,99 @@ def draw_state(
     state: GameState,
     config: SimConfig,
     show_debug_boundaries: bool = False,
+    tick_stats: TickStats | None = None,
+    lod: LevelOfDetail | None = None,
 ) -> None:
-    screen.fill(_BG_COLOR)
-    _draw_obstacles(screen, state)
-    _draw_creatures(screen, state, config)
+    screen.blit(_background_layer(screen, state), (0, 0))
+    level = "sprites" if lod is None else lod.update(len(state.creatures))
+    if level == "dots":
+        _draw_creature_dots(screen, state)
+    elif level == "heatmap":
+        _draw_creature_heatmap(screen, state)
+    else:
+        _draw_creatures(screen, state, config)
     if show_debug_boundaries:
         _draw_debug_boundaries(screen, state)
-    _draw_hud(screen, state)
+    _draw_overlays(screen, state, tick_stats)
+
+
+def _draw_overlays(
+    screen: pygame.Surface, state: GameState, tick_stats: TickStats | None
+) -> list[pygame.Rect]:
+    rects = [_draw_hud(screen, state)]
+    if tick_stats is not None:
+        rects.extend(_draw_tick_stats(screen, tick_stats))
+    return rects
+
+
+@dataclass
+class DirtyRects:
+    """What the last `draw_state_dirty` frame drew, so the next one can erase just that."""
+
+    background: pygame.Surface | None = None
+    creature_rects: dict[int, pygame.Rect] = field(default_factory=dict)
+    overlay_rects: list[pygame.Rect] = field(default_factory=list)
+
+
+def draw_state_dirty(
+    screen: pygame.Surface,
+    state: GameState,
+    config: SimConfig,
+    dirty: DirtyRects,
+    show_debug_boundaries: bool = False,
+    tick_stats: TickStats | None = None,
+    lod: LevelOfDetail | None = None,
+) -> list[pygame.Rect]:
+    """Redraw only what changed since the previous call and return the rects to update.
+
+    Last frame's creature and HUD rects are restored from the static layer,
+    then creatures and the HUD are drawn again. Each creature contributes the
+    union of its old and new rect. A new game, the debug overlay, or a frame
+    that touches most of the screen falls back to a full redraw, as does any
+    level of detail other than sprites.
+    """
+    background = _background_layer(screen, state)
+    full_frame = [screen.get_rect()]
+    if lod is not None and lod.update(len(state.creatures)) != "sprites":
+        draw_state(screen, state, config, show_debug_boundaries, tick_stats, lod)
+        dirty.background = None
+        return full_frame
+    if show_debug_boundaries or dirty.background is not background:
+        screen.blit(background, (0, 0))
+        _draw_creatures(screen, state, config)
+        if show_debug_boundaries:
+            _draw_debug_boundaries(screen, state)
+        dirty.background = None if show_debug_boundaries else background
+        dirty.creature_rects = {
+            creature.id: _creature_rect(creature).clip(full_frame[0]) for creature in state.creatures
+        }
+        dirty.overlay_rects = _draw_overlays(screen, state, tick_stats)
+        return full_frame
+
+    for rect in dirty.creature_rects.values():
+        screen.blit(background, rect, rect)
+    for rect in dirty.overlay_rects:
+        screen.blit(background, rect, rect)
+
+    previous_rects = dirty.creature_rects
+    creature_rects: dict[int, pygame.Rect] = {}
+    update_rects = []
+    drawn = screen.blits(_creature_blits(state))
+    for creature, rect in zip(state.creatures, drawn, strict=True):
+        creature_rects[creature.id] = rect
+        previous = previous_rects.get(creature.id)
+        update_rects.append(rect if previous is None else rect.union(previous))
+    update_rects.extend(
+        rect for creature_id, rect in previous_rects.items() if creature_id not in creature_rects
+    )
+
+    overlay_rects = _draw_overlays(screen, state, tick_stats)
+    update_rects.extend(overlay_rects)
+    update_rects.extend(dirty.overlay_rects)
+
+    dirty.creature_rects = creature_rects
+    dirty.overlay_rects = overlay_rects
+    screen_area = screen.get_width() * screen.get_height()
+    if sum(rect.width * rect.height for rect in update_rects) > screen_area * _DIRTY_FULL_FRAME_SHARE:
+        return full_frame
+    return update_rects
@@ -0,0 +1,309 @@
+"""Compact per-tick game traces that can be played back without re-simulating.
+
+A replay file is a header (board size and obstacles) followed by one frame per
+recorded tick, then an index written when the recording is closed:
+
+    header   magic, version, board width/height, obstacle count, obstacles
+    frame    tick, creature count, flags
+             [ids, uint32 each]      only when the id order changed
+             [radii, uint32 1/16 px] only when any radius changed
+             kinds, one byte each
+             x/y pairs, uint16 each, quantized over the board
+    index    frame ticks, frame offsets, and for each frame the offsets of
+             the frames holding its ids and radii (int64 arrays)
+    trailer  index offset, frame count, magic
+
+Creatures are identified by their order, so a frame only carries ids or radii
+when they differ from the previous frame. Radii are stored to 1/16 px up to
+`MAX_RADIUS` (about 268 million px, which only `--grow-on-win` games get near);
+writing a larger one raises `ValueError` rather than storing a wrong size.
+`Replay` memory-maps the file and decodes any single frame on demand. A file
+whose recording was cut short has no index; it is rebuilt by walking the frame
+headers.
+"""
+
+from array import array
+from bisect import bisect_right
+import mmap
+from pathlib import Path
+import struct
+import sys
+
+from .board import Board, Obstacle, Position
+from .creature import Creature
+from .game import GameState
+from .obstacles import bake_obstacles
+from .rps import CreatureType
+
+_MAGIC = b"RPSR"
+_INDEX_MAGIC = b"RPSI"
+_VERSION = 2
+# magic, version, board width, board height, obstacle count
+_HEADER = struct.Struct("<4sHddI")
+# x, y, size, rotation, red, green, blue (after a length-prefixed kind name)
+_OBSTACLE = struct.Struct("<ddddBBB")
+# tick, creature count, flags
+_FRAME = struct.Struct("<qIB")
+# index offset, frame count, magic
+_TRAILER = struct.Struct("<qq4s")
+_HAS_IDS = 1
+_HAS_RADII = 2
+_POSITION_STEPS = 65535
+_RADIUS_STEPS_PER_PIXEL = 16
+_MAX_RADIUS_STEPS = 0xFFFFFFFF
+MAX_RADIUS = _MAX_RADIUS_STEPS / _RADIUS_STEPS_PER_PIXEL
+_KINDS = tuple(CreatureType)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+
+def _quantize(value: float, extent: float) -> int:
+    return max(0, min(_POSITION_STEPS, int(round(value / extent * _POSITION_STEPS))))
+
+
+def pack_obstacles(obstacles: list[Obstacle]) -> bytes:
+    """Obstacles as stored in replay and checkpoint headers."""
+    chunks = []
+    for obstacle in obstacles:
+        name = obstacle.kind.encode()
+        chunks.append(bytes([len(name)]) + name)
+        chunks.append(
+            _OBSTACLE.pack(obstacle.pos.x, obstacle.pos.y, obstacle.size, obstacle.rotation, *obstacle.color)
+        )
+    return b"".join(chunks)
+
+
+def unpack_obstacles(data, offset: int, count: int) -> tuple[list[Obstacle], int]:
+    """Obstacles written by `pack_obstacles` at `offset`, and the offset just past them."""
+    obstacles = []
+    for _ in range(count):
+        name_length = data[offset]
+        kind = bytes(data[offset + 1 : offset + 1 + name_length]).decode()
+        offset += 1 + name_length
+        x, y, size, rotation, *color = _OBSTACLE.unpack_from(data, offset)
+        offset += _OBSTACLE.size
+        obstacles.append(Obstacle(kind, Position(x, y), size, rotation, tuple(color)))
+    return obstacles, offset
+
+
+def _int64_array(data) -> array:
+    values = array("q")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class ReplayWriter:
+    """Appends one frame per recorded tick of a game to a replay file.
+
+    The board and obstacles are taken from the first state written.
+    """
+
+    def __init__(self, path: str | Path, every: int = 1) -> None:
+        if every < 1:
+            raise ValueError("Frames can be recorded at most once per tick")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.board: Board | None = None
+        self.every = every
+        self.frames = 0
+        self.next_tick = 0
+        self._last_tick = -1
+        self._ids: list[int] | None = None
+        self._radii: list[int] | None = None
+        self._ticks = array("q")
+        self._offsets = array("q")
+        self._ids_offsets = array("q")
+        self._radii_offsets = array("q")
+        self._file = open(self.path, "wb")
+
+    def capture(self, state: GameState) -> None:
+        """Append `state` if a recording tick has come round since the last frame."""
+        if state.tick < self.next_tick:
+            return
+        self.next_tick = ((state.tick // self.every) + 1) * self.every
+        self.write(state)
+
+    def finish(self, state: GameState) -> None:
+        """Append the game's last state unless it was just recorded."""
+        if state.tick != self._last_tick:
+            self.write(state)
+
+    def write(self, state: GameState) -> None:
+        if self.board is None:
+            self._write_header(state)
+        creatures = state.creatures
+        count = len(creatures)
+        offset = self._file.tell()
+        ids = [creature.id for creature in creatures]
+        radii = [int(round(creature.radius * _RADIUS_STEPS_PER_PIXEL)) for creature in creatures]
+        if radii and max(radii) > _MAX_RADIUS_STEPS:
+            creature = max(creatures, key=lambda c: c.radius)
+            raise ValueError(
+                f"Creature {creature.id} has radius {creature.radius:g} px; "
+                f"replays store radii up to {MAX_RADIUS:g} px"
+            )
+        flags = 0
+        if ids != self._ids:
+            flags |= _HAS_IDS
+            self._ids = ids
+        if radii != self._radii:
+            flags |= _HAS_RADII
+            self._radii = radii
+
+        width, height = self.board.width, self.board.height
+        positions: list[int] = []
+        extend = positions.extend
+        for creature in creatures:
+            extend((_quantize(creature.pos.x, width), _quantize(creature.pos.y, height)))
+        chunks = [_FRAME.pack(state.tick, count, flags)]
+        if flags & _HAS_IDS:
+            chunks.append(struct.pack(f"<{count}I", *ids))
+        if flags & _HAS_RADII:
+            chunks.append(struct.pack(f"<{count}I", *radii))
+        chunks.append(bytes(_KIND_CODES[creature.kind] for creature in creatures))
+        chunks.append(struct.pack(f"<{2 * count}H", *positions))
+        self._file.write(b"".join(chunks))
+
+        self._ticks.append(state.tick)
+        self._offsets.append(offset)
+        self._ids_offsets.append(offset if flags & _HAS_IDS else self._ids_offsets[-1])
+        self._radii_offsets.append(offset if flags & _HAS_RADII else self._radii_offsets[-1])
+        self.frames += 1
+        self._last_tick = state.tick
+
+    def close(self) -> int:
+        """Write the seek index and close the file; returns how many frames were recorded."""
+        if self._file.closed:
+            return self.frames
+        if self.board is None:
+            self._file.close()
+            return 0
+        index_offset = self._file.tell()
+        for values in (self._ticks, self._offsets, self._ids_offsets, self._radii_offsets):
+            if sys.byteorder == "big":
+                values = array("q", values)
+                values.byteswap()
+            self._file.write(values.tobytes())
+        self._file.write(_TRAILER.pack(index_offset, self.frames, _INDEX_MAGIC))
+        self._file.close()
+        return self.frames
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_header(self, state: GameState) -> None:
+        self.board = state.board
+        board = state.board
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, board.width, board.height, len(state.obstacles)))
+        self._file.write(pack_obstacles(state.obstacles))
+
+
+class Replay:
+    """A memory-mapped replay file; any recorded tick decodes without touching the others."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, height, obstacle_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {_VERSION} replay file")
+        self.board = Board(width=width, height=height)
+        self.obstacles, offset = unpack_obstacles(self._map, _HEADER.size, obstacle_count)
+        self.obstacle_field = bake_obstacles(self.obstacles)
+        self._read_index(offset)
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def frame_at_tick(self, tick: int) -> int:
+        """Index of the last frame recorded on or before `tick` (the first frame if none)."""
+        return max(0, bisect_right(self.ticks, tick) - 1)
+
+    def state_at_tick(self, tick: int) -> GameState:
+        return self.state(self.frame_at_tick(tick))
+
+    def state(self, index: int) -> GameState:
+        if not 0 <= index < len(self.ticks):
+            raise IndexError(f"Replay has {len(self.ticks)} frames, not {index + 1}")
+        data = self._map
+        offset = self._offsets[index]
+        tick, count, flags = _FRAME.unpack_from(data, offset)
+        ids = self._frame_ids(self._ids_offsets[index])
+        radii = self._frame_radii(self._radii_offsets[index])
+        offset += _FRAME.size + self._optional_size(flags, count)
+        kinds = data[offset : offset + count]
+        positions = struct.unpack_from(f"<{2 * count}H", data, offset + count)
+        x_scale = self.board.width / _POSITION_STEPS
+        y_scale = self.board.height / _POSITION_STEPS
+        creatures = [
+            Creature(
+                id=ids[slot],
+                kind=_KINDS[kinds[slot]],
+                pos=Position(positions[2 * slot] * x_scale, positions[(2 * slot) + 1] * y_scale),
+                radius=radii[slot] / _RADIUS_STEPS_PER_PIXEL,
+            )
+            for slot in range(count)
+        ]
+        return GameState(
+            board=self.board,
+            creatures=creatures,
+            obstacles=self.obstacles,
+            tick=tick,
+            obstacle_field=self.obstacle_field,
+        )
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "Replay":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _optional_size(flags: int, count: int) -> int:
+        return (4 * count if flags & _HAS_IDS else 0) + (4 * count if flags & _HAS_RADII else 0)
+
+    def _frame_ids(self, offset: int) -> tuple[int, ...]:
+        _, count, _ = _FRAME.unpack_from(self._map, offset)
+        return struct.unpack_from(f"<{count}I", self._map, offset + _FRAME.size)
+
+    def _frame_radii(self, offset: int) -> tuple[int, ...]:
+        _, count, flags = _FRAME.unpack_from(self._map, offset)
+        skip = 4 * count if flags & _HAS_IDS else 0
+        return struct.unpack_from(f"<{count}I", self._map, offset + _FRAME.size + skip)
+
+    def _read_index(self, frames_start: int) -> None:
+        data = self._map
+        if len(data) >= frames_start + _TRAILER.size:
+            index_offset, frames, magic = _TRAILER.unpack_from(data, len(data) - _TRAILER.size)
+            if magic == _INDEX_MAGIC:
+                size = 8 * frames
+                columns = [
+                    _int64_array(data[index_offset + (column * size) : index_offset + ((column + 1) * size)])
+                    for column in range(4)
+                ]
+                self.ticks, self._offsets, self._ids_offsets, self._radii_offsets = columns
+                return
+
+        # No index: the recording was interrupted. Walk the complete frames.
+        self.ticks, self._offsets, self._ids_offsets, self._radii_offsets = (array("q") for _ in range(4))
+        offset = frames_start
+        while offset + _FRAME.size <= len(data):
+            tick, count, flags = _FRAME.unpack_from(data, offset)
+            end = offset + _FRAME.size + self._optional_size(flags, count) + (5 * count)
+            if end > len(data) or (not self._offsets and (flags & (_HAS_IDS | _HAS_RADII)) == 0):
+                break
+            self.ticks.append(tick)
+            self._offsets.append(offset)
+            self._ids_offsets.append(offset if flags & _HAS_IDS else self._ids_offsets[-1])
+            self._radii_offsets.append(offset if flags & _HAS_RADII else self._radii_offsets[-1])
+            offset = end
@@ -0,0 +1,540 @@
+"""Structure-of-arrays simulation backend.
+
+Needs NumPy, which is an optional dependency (`pip install rpsbattle[fast]`).
+`step_array_state` follows the same rules and pair order as `game.step_game`,
+so converting back with `to_game_state` gives the same creatures.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+import heapq
+
+import numpy as np
+
+from .board import Board, Obstacle, Position
+from .config import SimConfig
+from .creature import Creature
+from .game import GameState, _bounce_velocity_components
+from .geometry import (
+    Circle,
+    circle_circle_overlap_batch,
+    circle_polygon_overlap_batch,
+    normalize_batch,
+    polygon_closest_point_batch,
+)
+from .obstacles import ObstacleField, ObstacleShape, bake_obstacles
+from .rps import CreatureType
+from .sdf import DistanceField
+
+KIND_ORDER = (CreatureType.ROCK, CreatureType.PAPER, CreatureType.SCISSORS)
+_KIND_CODES = {kind: code for code, kind in enumerate(KIND_ORDER)}
+
+
+@dataclass
+class ArrayState:
+    board: Board
+    ids: np.ndarray
+    kinds: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    vx: np.ndarray
+    vy: np.ndarray
+    radius: np.ndarray
+    mass: np.ndarray
+    obstacles: list[Obstacle] = field(default_factory=list)
+    tick: int = 0
+    active_collision_pairs: set[tuple[int, int]] = field(default_factory=set)
+    obstacle_field: ObstacleField | None = None
+    conversions: int = 0
+
+    def __post_init__(self) -> None:
+        if self.obstacle_field is None:
+            self.obstacle_field = bake_obstacles(self.obstacles)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def array_creature_counts(state: ArrayState) -> Counter[CreatureType]:
+    totals = np.bincount(state.kinds, minlength=len(KIND_ORDER))
+    return Counter({kind: int(totals[code]) for code, kind in enumerate(KIND_ORDER)})
+
+
+def _code_beats(left: int, right: int) -> bool:
+    # With ROCK=0, PAPER=1, SCISSORS=2 every type beats the one just before it.
+    return (left - right) % 3 == 1
+
+
+def to_array_state(state: GameState) -> ArrayState:
+    creatures = sorted(state.creatures, key=lambda c: c.id)
+    return ArrayState(
+        board=state.board,
+        ids=np.array([c.id for c in creatures], dtype=np.int64),
+        kinds=np.array([_KIND_CODES[c.kind] for c in creatures], dtype=np.int8),
+        x=np.array([c.pos.x for c in creatures], dtype=np.float64),
+        y=np.array([c.pos.y for c in creatures], dtype=np.float64),
+        vx=np.array([c.vx for c in creatures], dtype=np.float64),
+        vy=np.array([c.vy for c in creatures], dtype=np.float64),
+        radius=np.array([c.radius for c in creatures], dtype=np.float64),
+        mass=np.array([c.mass for c in creatures], dtype=np.float64),
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=set(state.active_collision_pairs),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
+
+
+def to_game_state(state: ArrayState) -> GameState:
+    creatures = [
+        Creature(
+            id=creature_id,
+            kind=KIND_ORDER[kind],
+            pos=Position(x, y),
+            vx=vx,
+            vy=vy,
+            radius=radius,
+            mass=mass,
+        )
+        for creature_id, kind, x, y, vx, vy, radius, mass in zip(
+            state.ids.tolist(),
+            state.kinds.tolist(),
+            state.x.tolist(),
+            state.y.tolist(),
+            state.vx.tolist(),
+            state.vy.tolist(),
+            state.radius.tolist(),
+            state.mass.tolist(),
+            strict=True,
+        )
+    ]
+    return GameState(
+        board=state.board,
+        creatures=creatures,
+        obstacles=state.obstacles,
+        tick=state.tick,
+        active_collision_pairs=set(state.active_collision_pairs),
+        obstacle_field=state.obstacle_field,
+        conversions=state.conversions,
+    )
+
+
+def array_checkpoint_bytes(state: ArrayState) -> bytes:
+    """`checkpoint.checkpoint_bytes` straight from the arrays, without building creatures."""
+    from .checkpoint import pack_header
+
+    pairs = state.active_collision_pairs
+    little = np.dtype("<f8")
+    return b"".join(
+        [
+            pack_header(state.board, state.tick, len(state), state.obstacles, pairs, state.conversions),
+            state.ids.astype("<i8").tobytes(),
+            state.kinds.astype(np.uint8).tobytes(),
+            *(
+                column.astype(little).tobytes()
+                for column in (state.x, state.y, state.vx, state.vy, state.radius, state.mass)
+            ),
+            np.array(sorted(pairs), dtype="<i8").tobytes(),
+        ]
+    )
+
+
+def restore_array_checkpoint(data: bytes, config: SimConfig | None = None) -> ArrayState:
+    """A checkpoint as an `ArrayState`; every column is one `numpy.frombuffer` copy."""
+    from .checkpoint import read_header, restore_obstacle_field
+
+    header = read_header(data)
+    count = header.creature_count
+    offset = header.columns_offset
+    ids = np.frombuffer(data, dtype="<i8", count=count, offset=offset).astype(np.int64)
+    offset += 8 * count
+    kinds = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset).astype(np.int8)
+    offset += count
+    columns = []
+    for _ in range(6):
+        columns.append(np.frombuffer(data, dtype="<f8", count=count, offset=offset).astype(np.float64))
+        offset += 8 * count
+    pairs = np.frombuffer(data, dtype="<i8", count=2 * header.pair_count, offset=offset).reshape(-1, 2)
+    # The array engine keeps creatures in id order, as `to_array_state` does.
+    order = np.argsort(ids, kind="stable")
+    x, y, vx, vy, radius, mass = (column[order] for column in columns)
+    return ArrayState(
+        board=header.board,
+        ids=ids[order],
+        kinds=kinds[order],
+        x=x,
+        y=y,
+        vx=vx,
+        vy=vy,
+        radius=radius,
+        mass=mass,
+        obstacles=header.obstacles,
+        tick=header.tick,
+        active_collision_pairs=set(map(tuple, pairs.tolist())),
+        obstacle_field=restore_obstacle_field(header.obstacles, header.board, config),
+        conversions=header.conversions,
+    )
+
+
+def _reflect(
+    normal_x: np.ndarray,
+    normal_y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Same arithmetic as mirror_vector followed by negation in game._bounce_off_obstacles.
+    scale = ((vx * normal_x) + (vy * normal_y)) / ((normal_x * normal_x) + (normal_y * normal_y))
+    return -((2.0 * (scale * normal_x)) - vx), -((2.0 * (scale * normal_y)) - vy)
+
+
+def _bounce_off_obstacles(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+    radius: np.ndarray,
+    obstacles: tuple[ObstacleShape, ...],
+) -> None:
+    # Obstacles are visited in list order, exactly like the scalar path, but each
+    # obstacle is tested against every nearby creature at once.
+    for shape in obstacles:
+        primitive = shape.primitive
+        # Slightly padded so float rounding can never reject a true contact.
+        reach = (shape.bounding_radius + radius) * (1.0 + 1e-9) + 1e-9
+        near = np.flatnonzero(
+            (np.abs(x - shape.obstacle.pos.x) <= reach) & (np.abs(y - shape.obstacle.pos.y) <= reach)
+        )
+        if near.size == 0:
+            continue
+        px = x[near]
+        py = y[near]
+        pr = radius[near]
+        if isinstance(primitive, Circle):
+            touching = circle_circle_overlap_batch(px, py, pr, primitive)
+        else:
+            touching = circle_polygon_overlap_batch(px, py, pr, primitive)
+        hit = near[touching]
+        if hit.size == 0:
+            continue
+        if isinstance(primitive, Circle):
+            normal_x, normal_y = normalize_batch(
+                x[hit] - primitive.center.x,
+                y[hit] - primitive.center.y,
+            )
+            surface_x = primitive.center.x + (normal_x * primitive.radius)
+            surface_y = primitive.center.y + (normal_y * primitive.radius)
+        else:
+            surface_x, surface_y = polygon_closest_point_batch(x[hit], y[hit], primitive)
+            normal_x, normal_y = normalize_batch(x[hit] - surface_x, y[hit] - surface_y)
+
+        x[hit] = surface_x + (normal_x * radius[hit])
+        y[hit] = surface_y + (normal_y * radius[hit])
+        vx[hit], vy[hit] = _reflect(normal_x, normal_y, vx[hit], vy[hit])
+
+
+def _sample_distance_field(
+    sdf: DistanceField, x: np.ndarray, y: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Same arithmetic as DistanceField.sample.
+    grid_x = x / sdf.spacing
+    grid_y = y / sdf.spacing
+    column = np.clip(np.floor(grid_x), 0, sdf.columns - 2).astype(np.intp)
+    row = np.clip(np.floor(grid_y), 0, sdf.rows - 2).astype(np.intp)
+    tx = np.clip(grid_x - column, 0.0, 1.0)
+    ty = np.clip(grid_y - row, 0.0, 1.0)
+    top_left = (row * sdf.columns) + column
+    w00 = (1.0 - tx) * (1.0 - ty)
+    w10 = tx * (1.0 - ty)
+    w01 = (1.0 - tx) * ty
+    w11 = tx * ty
+    values = []
+    for grid in (sdf.distances, sdf.gradient_x, sdf.gradient_y):
+        grid = np.frombuffer(grid, dtype=np.float64)
+        values.append(
+            (grid[top_left] * w00)
+            + (grid[top_left + 1] * w10)
+            + (grid[top_left + sdf.columns] * w01)
+            + (grid[top_left + sdf.columns + 1] * w11)
+        )
+    return values[0], values[1], values[2]
+
+
+def _bounce_off_distance_field(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+    radius: np.ndarray,
+    sdf: DistanceField,
+) -> np.ndarray:
+    """Resolve creatures the raster covers; return the mask of ones it does not."""
+    uncovered = (radius + sdf.spacing) > sdf.band
+    distance, gradient_x, gradient_y = _sample_distance_field(sdf, x, y)
+    hit = np.flatnonzero(~uncovered & (distance <= radius))
+    if hit.size:
+        normal_x, normal_y = normalize_batch(gradient_x[hit], gradient_y[hit])
+        depth = radius[hit] - distance[hit]
+        x[hit] = x[hit] + (normal_x * depth)
+        y[hit] = y[hit] + (normal_y * depth)
+        vx[hit], vy[hit] = _reflect(normal_x, normal_y, vx[hit], vy[hit])
+    return uncovered
+
+
+def _candidate_pairs(
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: np.ndarray,
+    encounter_distance: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return overlapping (left, right) index pairs with left < right, in scan order."""
+    count = len(x)
+    if count < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    cell_size = max(encounter_distance, 2.0 * float(radius.max()), 1.0)
+    cell_x = np.floor(x / cell_size).astype(np.int64)
+    cell_y = np.floor(y / cell_size).astype(np.int64)
+    cell_y -= cell_y.min() - 1
+    stride = int(cell_y.max()) + 2
+    keys = (cell_x * stride) + cell_y
+    order = np.argsort(keys, kind="stable")
+    cell_keys, cell_starts, cell_counts = np.unique(
+        keys[order], return_index=True, return_counts=True
+    )
+
+    lefts: list[np.ndarray] = []
+    rights: list[np.ndarray] = []
+    # Half of the 3x3 neighbourhood is enough: every unordered pair of cells is
+    # visited exactly once, and the same-cell offset keeps only left < right.
+    for offset_x, offset_y in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        neighbour_keys = cell_keys + (offset_x * stride) + offset_y
+        slots = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        present = cell_keys[slots] == neighbour_keys
+        home_cells = np.flatnonzero(present)
+        away_cells = slots[present]
+        home_counts = cell_counts[home_cells]
+        away_counts = cell_counts[away_cells]
+        pair_counts = home_counts * away_counts
+        total = int(pair_counts.sum())
+        if total == 0:
+            continue
+        # Expand each (home cell, away cell) match into its home x away members.
+        block_starts = np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        within = np.arange(total, dtype=np.int64) - block_starts
+        repeated_away_counts = np.repeat(away_counts, pair_counts)
+        left = order[np.repeat(cell_starts[home_cells], pair_counts) + (within // repeated_away_counts)]
+        right = order[np.repeat(cell_starts[away_cells], pair_counts) + (within % repeated_away_counts)]
+        if offset_x == 0 and offset_y == 0:
+            keep = left < right
+            left = left[keep]
+            right = right[keep]
+        else:
+            left, right = np.minimum(left, right), np.maximum(left, right)
+        lefts.append(left)
+        rights.append(right)
+
+    if not lefts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    left = np.concatenate(lefts)
+    right = np.concatenate(rights)
+    overlapping = _pairs_overlap(x, y, radius, left, right, encounter_distance)
+    left = left[overlapping]
+    right = right[overlapping]
+    scan_order = np.lexsort((right, left))
+    return left[scan_order], right[scan_order]
+
+
+def _pairs_overlap(
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+    encounter_distance: float,
+) -> np.ndarray:
+    dx = x[left] - x[right]
+    dy = y[left] - y[right]
+    distance_sq = (dx * dx) + (dy * dy)
+    left_radius = radius[left]
+    right_radius = radius[right]
+    radius_sum = left_radius + right_radius
+    return np.where(
+        (left_radius <= 0.0) | (right_radius <= 0.0),
+        distance_sq <= encounter_distance * encounter_distance,
+        distance_sq <= radius_sum * radius_sum,
+    )
+
+
+def _pair_overlaps(
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: np.ndarray,
+    left: int,
+    right: int,
+    encounter_distance: float,
+) -> bool:
+    dx = float(x[left]) - float(x[right])
+    dy = float(y[left]) - float(y[right])
+    distance_sq = (dx * dx) + (dy * dy)
+    left_radius = float(radius[left])
+    right_radius = float(radius[right])
+    if left_radius <= 0.0 or right_radius <= 0.0:
+        return distance_sq <= encounter_distance * encounter_distance
+    radius_sum = left_radius + right_radius
+    return distance_sq <= radius_sum * radius_sum
+
+
+def step_array_state(
+    state: ArrayState,
+    convert_loser_to_winner: bool = True,
+    bounce_off_creatures: bool = True,
+    creature_radius: float | None = None,
+    grow_on_win: bool = False,
+    encounter_distance: float = 16.0,
+    dt_seconds: float = 1.0,
+) -> ArrayState:
+    board = state.board
+    default_radius = creature_radius if creature_radius is not None else 0.0
+    radius = np.where(state.radius > 0.0, state.radius, default_radius)
+    mass = state.mass.copy()
+    kinds = state.kinds.copy()
+
+    x = state.x + (state.vx * dt_seconds)
+    y = state.y + (state.vy * dt_seconds)
+    hit_x = (x < radius) | (x > board.width - radius)
+    vx = np.where(hit_x, -state.vx, state.vx)
+    x = np.where(hit_x, np.maximum(radius, np.minimum(board.width - radius, x)), x)
+    hit_y = (y < radius) | (y > board.height - radius)
+    vy = np.where(hit_y, -state.vy, state.vy)
+    y = np.where(hit_y, np.maximum(radius, np.minimum(board.height - radius, y)), y)
+    sdf = state.obstacle_field.sdf
+    if sdf is None:
+        _bounce_off_obstacles(x, y, vx, vy, radius, state.obstacle_field.shapes)
+    else:
+        uncovered = np.flatnonzero(_bounce_off_distance_field(x, y, vx, vy, radius, sdf))
+        if uncovered.size:
+            sub = [array[uncovered] for array in (x, y, vx, vy)]
+            _bounce_off_obstacles(*sub, radius[uncovered], state.obstacle_field.shapes)
+            x[uncovered], y[uncovered], vx[uncovered], vy[uncovered] = sub
+
+    ids = state.ids
+    alive = np.ones(len(ids), dtype=bool)
+    collisions_this_tick: set[tuple[int, int]] = set()
+    conversions = state.conversions
+    left_indices, right_indices = _candidate_pairs(x, y, radius, encounter_distance)
+
+    if grow_on_win:
+        # Growth can create overlaps mid-tick, so pending pairs live in a heap that
+        # later growth can add to, and every pair is re-tested when it comes up.
+        pending = list(zip(left_indices.tolist(), right_indices.tolist()))
+        queued = set(pending)
+        heapq.heapify(pending)
+
+        def pairs():
+            while pending:
+                yield heapq.heappop(pending)
+
+        pair_iter = pairs()
+    else:
+        pair_iter = zip(left_indices.tolist(), right_indices.tolist())
+
+    for left, right in pair_iter:
+        if not convert_loser_to_winner and not (alive[left] and alive[right]):
+            continue
+        if grow_on_win and not _pair_overlaps(x, y, radius, left, right, encounter_distance):
+            continue
+
+        pair = (int(ids[left]), int(ids[right]))
+        if bounce_off_creatures:
+            collisions_this_tick.add(pair)
+        if bounce_off_creatures and pair not in state.active_collision_pairs:
+            (vx[left], vy[left]), (vx[right], vy[right]) = _bounce_velocity_components(
+                float(x[left]),
+                float(y[left]),
+                float(vx[left]),
+                float(vy[left]),
+                float(mass[left]),
+                float(x[right]),
+                float(y[right]),
+                float(vx[right]),
+                float(vy[right]),
+                float(mass[right]),
+            )
+
+        left_kind = int(kinds[left])
+        right_kind = int(kinds[right])
+        if left_kind == right_kind:
+            continue
+        if _code_beats(left_kind, right_kind):
+            winner, loser = left, right
+        else:
+            winner, loser = right, left
+        conversions += 1
+
+        if convert_loser_to_winner:
+            kinds[loser] = kinds[winner]
+        else:
+            alive[loser] = False
+        if grow_on_win:
+            radius[winner] += mass[loser]
+            mass[winner] += mass[loser]
+            _queue_grown_pairs(
+                winner, (left, right), x, y, radius, encounter_distance, pending, queued
+            )
+
+    if not convert_loser_to_winner:
+        ids = ids[alive]
+        kinds = kinds[alive]
+        x = x[alive]
+        y = y[alive]
+        vx = vx[alive]
+        vy = vy[alive]
+        radius = radius[alive]
+        mass = mass[alive]
+
+    return ArrayState(
+        board=board,
+        ids=ids,
+        kinds=kinds,
+        x=x,
+        y=y,
+        vx=vx,
+        vy=vy,
+        radius=radius,
+        mass=mass,
+        obstacles=state.obstacles,
+        tick=state.tick + 1,
+        active_collision_pairs=collisions_this_tick,
+        obstacle_field=state.obstacle_field,
+        conversions=conversions,
+    )
+
+
+def _queue_grown_pairs(
+    grown: int,
+    current_pair: tuple[int, int],
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: np.ndarray,
+    encounter_distance: float,
+    pending: list[tuple[int, int]],
+    queued: set[tuple[int, int]],
+) -> None:
+    others = np.flatnonzero(np.arange(len(x)) != grown)
+    touching = others[
+        _pairs_overlap(
+            x,
+            y,
+            radius,
+            np.full(len(others), grown, dtype=np.int64),
+            others,
+            encounter_distance,
+        )
+    ]
+    for other in touching.tolist():
+        pair = (grown, other) if grown < other else (other, grown)
+        if pair > current_pair and pair not in queued:
+            queued.add(pair)
+            heapq.heappush(pending, pair)
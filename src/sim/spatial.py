@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+import math
+
+
+@dataclass
+class SpatialHash:
+    """Uniform grid mapping integer cell coordinates to the items stored there."""
+
+    cell_size: float
+    cells: dict[tuple[int, int], list[int]] = field(default_factory=dict)
+
+    def cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def clear(self) -> None:
+        # Keep the cell lists so a grid rebuilt every tick stops allocating.
+        for items in self.cells.values():
+            items.clear()
+
+    def insert(self, item: int, x: float, y: float) -> None:
+        self.cells.setdefault(self.cell_of(x, y), []).append(item)
+
+    def move(self, item: int, from_x: float, from_y: float, to_x: float, to_y: float) -> None:
+        """Re-file an `item` inserted at (from_x, from_y) under (to_x, to_y)."""
+        old_cell = self.cell_of(from_x, from_y)
+        new_cell = self.cell_of(to_x, to_y)
+        if new_cell != old_cell:
+            self.cells[old_cell].remove(item)
+            self.cells.setdefault(new_cell, []).append(item)
+
+    def insert_bounds(
+        self,
+        item: int,
+        min_x: float,
+        min_y: float,
+        max_x: float,
+        max_y: float,
+    ) -> None:
+        min_cx, min_cy = self.cell_of(min_x, min_y)
+        max_cx, max_cy = self.cell_of(max_x, max_y)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def query(self, x: float, y: float, reach: float) -> list[int]:
+        """Return items in every cell that a circle of `reach` around (x, y) can touch."""
+        found: list[int] = []
+        self.query_into(x, y, reach, found)
+        return found
+
+    def query_into(self, x: float, y: float, reach: float, found: list[int]) -> None:
+        """Like `query`, but appends to `found` so a hot loop can reuse one list."""
+        center_x, center_y = self.cell_of(x, y)
+        rings = max(0, math.ceil(reach / self.cell_size))
+        cells = self.cells
+        if (2 * rings + 1) ** 2 > len(cells):
+            # Huge reach (e.g. a creature that grew a lot): walk occupied cells instead.
+            for (cx, cy), items in cells.items():
+                if abs(cx - center_x) <= rings and abs(cy - center_y) <= rings:
+                    found.extend(items)
+            return
+        for cx in range(center_x - rings, center_x + rings + 1):
+            for cy in range(center_y - rings, center_y + rings + 1):
+                items = cells.get((cx, cy))
+                if items:
+                    found.extend(items)
+
+    def query_bounds(self, min_x: float, min_y: float, max_x: float, max_y: float) -> set[int]:
+        min_cx, min_cy = self.cell_of(min_x, min_y)
+        max_cx, max_cy = self.cell_of(max_x, max_y)
+        found: set[int] = set()
+        cells = self.cells
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            for (cx, cy), items in cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    found.update(items)
+            return found
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                items = cells.get((cx, cy))
+                if items:
+                    found.update(items)
+        return found
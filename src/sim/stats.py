@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from time import perf_counter
+
+# Each phase is timed once per tick. Pair queries, narrow-phase tests, bounces
+# and conversions interleave pair by pair, so they share "pairs" and are told
+# apart by the counters instead.
+PHASES = (
+    "move",
+    "obstacles",
+    "broad_phase",
+    "pairs",
+    "finalize",
+)
+
+
+@dataclass
+class TickStats:
+    """Per-phase wall time and work counters, summed over every tick it sees.
+
+    Pass one to `step_game(stats=...)`; leaving it out costs nothing but a few
+    `is None` checks.
+    """
+
+    ticks: int = 0
+    phase_seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    candidate_pairs: int = 0
+    narrow_tests: int = 0
+    overlaps: int = 0
+    bounces: int = 0
+    conversions: int = 0
+    obstacle_tests: int = 0
+    _lap_start: float = field(default=0.0, repr=False)
+
+    def start_tick(self) -> None:
+        self.ticks += 1
+        self._lap_start = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = perf_counter()
+        self.phase_seconds[phase] += now - self._lap_start
+        self._lap_start = now
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phase_seconds.values())
+
+    def summary_lines(self) -> list[str]:
+        ticks = max(1, self.ticks)
+        total = self.total_seconds
+        lines = [f"{self.ticks} ticks, {1000.0 * total / ticks:.3f} ms/tick"]
+        for phase, seconds in self.phase_seconds.items():
+            share = seconds / total if total > 0.0 else 0.0
+            lines.append(f"  {phase:<12} {1000.0 * seconds / ticks:8.3f} ms/tick {share:6.1%}")
+        lines.append(
+            "  per tick: "
+            f"candidates={self.candidate_pairs / ticks:.1f} "
+            f"narrow={self.narrow_tests / ticks:.1f} "
+            f"overlaps={self.overlaps / ticks:.1f} "
+            f"bounces={self.bounces / ticks:.1f} "
+            f"conversions={self.conversions / ticks:.1f} "
+            f"obstacle_tests={self.obstacle_tests / ticks:.1f}"
+        )
+        return lines
@@ -0,0 +1,144 @@
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+import random
+import statistics
+
+from .app import play_headless
+from .checkpoint import fork_state, restore_checkpoint
+from .config import DEFAULT_FORK_JITTER, SimConfig
+from .game import GameState
+from .rps import CreatureType
+
+# The checkpoint every game of a tournament starts from, restored once per
+# worker process by `_share_checkpoint` and forked per seed.
+_shared_start: GameState | None = None
+
+
+@dataclass(frozen=True)
+class GameResult:
+    seed: int
+    winner: CreatureType | None
+    ticks: int
+
+
+@dataclass
+class TournamentSummary:
+    runs: int = 0
+    wins: Counter[CreatureType] = field(default_factory=Counter)
+    timeouts: int = 0
+    winning_ticks: list[int] = field(default_factory=list)
+
+    def add(self, result: GameResult) -> None:
+        self.runs += 1
+        if result.winner is None:
+            self.timeouts += 1
+            return
+        self.wins[result.winner] += 1
+        self.winning_ticks.append(result.ticks)
+
+    def win_rate(self, kind: CreatureType) -> float:
+        return self.wins[kind] / self.runs if self.runs else 0.0
+
+    def tick_percentiles(self) -> dict[str, float]:
+        ticks = sorted(self.winning_ticks)
+        if not ticks:
+            return {}
+        if len(ticks) > 1:
+            deciles = statistics.quantiles(ticks, n=10, method="inclusive")
+        else:
+            deciles = [float(ticks[0])] * 9
+        return {
+            "min": ticks[0],
+            "p10": deciles[0],
+            "p50": statistics.median(ticks),
+            "p90": deciles[8],
+            "max": ticks[-1],
+            "mean": statistics.fmean(ticks),
+        }
+
+
+def play_seed(
+    config: SimConfig,
+    seed: int,
+    max_ticks: int,
+    dt_seconds: float,
+    engine: str,
+    fork_jitter: float = DEFAULT_FORK_JITTER,
+) -> GameResult:
+    initial_state = None
+    if _shared_start is not None:
+        initial_state = fork_state(_shared_start, random.Random(seed), fork_jitter)
+    result = play_headless(
+        replace(config, random_seed=seed), max_ticks, dt_seconds, engine, initial_state=initial_state
+    )
+    return GameResult(seed=seed, winner=result.winner, ticks=result.ticks)
+
+
+def _share_checkpoint(checkpoint: bytes | None, config: SimConfig) -> None:
+    global _shared_start
+    _shared_start = None if checkpoint is None else restore_checkpoint(checkpoint, config)
+
+
+def run_tournament(
+    config: SimConfig,
+    runs: int,
+    workers: int | None = None,
+    max_ticks: int = 10_000,
+    dt_seconds: float = 1.0 / 60.0,
+    engine: str = "step",
+    on_result: Callable[[GameResult], None] | None = None,
+    checkpoint: bytes | None = None,
+    fork_jitter: float = DEFAULT_FORK_JITTER,
+) -> TournamentSummary:
+    """Play `runs` games seeded from `config.random_seed` (or 0) upwards.
+
+    With `workers=1` games run in this process; otherwise they are spread over
+    a process pool and reported to `on_result` in completion order.
+
+    Given a `checkpoint`, every game instead continues that saved game, with
+    each creature's heading turned by up to `fork_jitter` radians, drawn from
+    the game's seed. Each worker restores the checkpoint once.
+    """
+    first_seed = config.random_seed if config.random_seed is not None else 0
+    seeds = range(first_seed, first_seed + runs)
+    summary = TournamentSummary()
+
+    def record(result: GameResult) -> None:
+        summary.add(result)
+        if on_result is not None:
+            on_result(result)
+
+    if workers == 1:
+        _share_checkpoint(checkpoint, config)
+        try:
+            for seed in seeds:
+                record(play_seed(config, seed, max_ticks, dt_seconds, engine, fork_jitter))
+        finally:
+            _share_checkpoint(None, config)
+        return summary
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_share_checkpoint, initargs=(checkpoint, config)
+    ) as pool:
+        futures = [
+            pool.submit(play_seed, config, seed, max_ticks, dt_seconds, engine, fork_jitter)
+            for seed in seeds
+        ]
+        for future in as_completed(futures):
+            record(future.result())
+    return summary
+
+
+def format_summary(summary: TournamentSummary) -> str:
+    lines = [f"Runs: {summary.runs} (timeouts: {summary.timeouts})"]
+    for kind in CreatureType:
+        lines.append(f"{kind.value}: {summary.wins[kind]} wins ({summary.win_rate(kind):.1%})")
+    percentiles = summary.tick_percentiles()
+    if percentiles:
+        lines.append(
+            "Ticks to winner: "
+            + " ".join(f"{name}={value:g}" for name, value in percentiles.items())
+        )
+    return "\n".join(lines)
@@ -0,0 +1,229 @@
+"""Run `step_game` in a separate process and share snapshots with the renderer.
+
+The worker owns the game. After every tick it writes the creatures' ids, kinds,
+positions and radii into one of two snapshot buffers in a
+`multiprocessing.shared_memory` block, then flips the "latest" index and bumps
+a sequence number. Each buffer also carries its own stamp, which the worker
+makes odd before writing the buffer and even again once it is done (a seqlock).
+The renderer copies the latest buffer between two reads of that stamp and
+retries unless both are the same even value, so however the worker's writes
+interleave with the copy, the renderer only ever sees complete ticks and never
+waits on the simulation.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+import multiprocessing
+from multiprocessing import shared_memory
+import struct
+import time
+
+from .app import winner_kind_or_none
+from .board import Position
+from .config import SimConfig
+from .creature import Creature
+from .game import GameState, step_game
+from .rps import CreatureType
+
+# sequence, latest buffer, stop flag, speed multiplier
+_HEADER = struct.Struct("<qqqd")
+# per-buffer write stamp, odd while the worker is writing that buffer
+_STAMP = struct.Struct("<q")
+# tick, creature count, winner code (-1 for none), then one count per kind
+_BUFFER_HEADER = struct.Struct("<qqqqqq")
+# id, kind code, x, y, radius
+_SLOT = struct.Struct("<qqddd")
+_KINDS = tuple(CreatureType)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+_READ_ATTEMPTS = 8
+_JOIN_TIMEOUT_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    state: GameState
+    winner: CreatureType | None
+
+
+def _buffer_size(capacity: int) -> int:
+    return _STAMP.size + _BUFFER_HEADER.size + (capacity * _SLOT.size)
+
+
+def _buffer_offset(capacity: int, index: int) -> int:
+    return _HEADER.size + (index * _buffer_size(capacity))
+
+
+def _write_buffer(
+    buf: memoryview,
+    capacity: int,
+    index: int,
+    state: GameState,
+    winner: CreatureType | None,
+) -> None:
+    stamp_offset = _buffer_offset(capacity, index)
+    (stamp,) = _STAMP.unpack_from(buf, stamp_offset)
+    _STAMP.pack_into(buf, stamp_offset, stamp + 1)
+    offset = stamp_offset + _STAMP.size
+    creatures = state.creatures[:capacity]
+    _BUFFER_HEADER.pack_into(
+        buf,
+        offset,
+        state.tick,
+        len(creatures),
+        -1 if winner is None else _KIND_CODES[winner],
+        *(state.kind_counts[kind] for kind in _KINDS),
+    )
+    offset += _BUFFER_HEADER.size
+    for creature in creatures:
+        _SLOT.pack_into(
+            buf,
+            offset,
+            creature.id,
+            _KIND_CODES[creature.kind],
+            creature.pos.x,
+            creature.pos.y,
+            creature.radius,
+        )
+        offset += _SLOT.size
+    _STAMP.pack_into(buf, stamp_offset, stamp + 2)
+
+
+def _read_buffer(
+    buf: memoryview,
+    capacity: int,
+    index: int,
+) -> tuple[int, list[Creature], Counter[CreatureType], CreatureType | None] | None:
+    """Decode one buffer, or return None if the worker wrote to it during the copy."""
+    stamp_offset = _buffer_offset(capacity, index)
+    (stamp,) = _STAMP.unpack_from(buf, stamp_offset)
+    if stamp % 2:
+        return None
+    offset = stamp_offset + _STAMP.size
+    tick, count, winner_code, *kind_totals = _BUFFER_HEADER.unpack_from(buf, offset)
+    start = offset + _BUFFER_HEADER.size
+    data = bytes(buf[start : start + (min(count, capacity) * _SLOT.size)])
+    if _STAMP.unpack_from(buf, stamp_offset)[0] != stamp:
+        return None
+    creatures = [
+        Creature(id=creature_id, kind=_KINDS[kind_code], pos=Position(x, y), radius=radius)
+        for creature_id, kind_code, x, y, radius in _SLOT.iter_unpack(data)
+    ]
+    kind_counts = Counter(dict(zip(_KINDS, kind_totals, strict=True)))
+    return tick, creatures, kind_counts, (None if winner_code < 0 else _KINDS[winner_code])
+
+
+def _publish(buf: memoryview, capacity: int, state: GameState, winner: CreatureType | None) -> None:
+    sequence, latest, stop, speed = _HEADER.unpack_from(buf, 0)
+    target = 1 - latest if sequence > 0 else 0
+    _write_buffer(buf, capacity, target, state, winner)
+    struct.pack_into("<q", buf, 8, target)
+    struct.pack_into("<q", buf, 0, sequence + 1)
+
+
+def _simulation_main(name: str, capacity: int, state: GameState, config: SimConfig) -> None:
+    # Children share the parent's resource tracker, so attaching here does not
+    # take ownership; the renderer unlinks the block in SimulationProcess.close.
+    memory = shared_memory.SharedMemory(name=name)
+    buf = memory.buf
+    try:
+        tick_seconds = 1.0 / config.fps
+        winner = winner_kind_or_none(state)
+        next_tick = time.perf_counter()
+        while True:
+            _, _, stop, speed = _HEADER.unpack_from(buf, 0)
+            if stop:
+                break
+            if winner is None:
+                state = step_game(
+                    state,
+                    None,
+                    convert_loser_to_winner=config.convert_loser_to_winner,
+                    bounce_off_creatures=config.bounce_off_creatures,
+                    grow_on_win=config.grow_on_win,
+                    encounter_distance=config.creature_radius * 2,
+                    dt_seconds=tick_seconds * speed * config.tps_multiplier,
+                    continuous_collision=config.continuous_collision,
+                )
+                winner = winner_kind_or_none(state)
+                _publish(buf, capacity, state, winner)
+
+            next_tick += tick_seconds
+            delay = next_tick - time.perf_counter()
+            if delay > 0.0:
+                time.sleep(delay)
+            else:
+                # Running behind real time: don't try to catch up in a burst.
+                next_tick = time.perf_counter()
+    finally:
+        del buf
+        memory.close()
+
+
+class SimulationProcess:
+    """A worker process stepping one game at `config.fps` ticks per second."""
+
+    def __init__(self, state: GameState, config: SimConfig) -> None:
+        self.capacity = max(1, len(state.creatures))
+        self.board = state.board
+        self.obstacles = state.obstacles
+        self.obstacle_field = state.obstacle_field
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=_HEADER.size + (2 * _buffer_size(self.capacity))
+        )
+        buf = self._memory.buf
+        _HEADER.pack_into(buf, 0, 0, 0, 0, 1.0)
+        _publish(buf, self.capacity, state, winner_kind_or_none(state))
+        self._last_sequence = -1
+        self._last_snapshot: Snapshot | None = None
+        # The renderer has usually started SDL by now, and forking a process with
+        # SDL's threads running can deadlock the child, so start it fresh instead.
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_simulation_main,
+            args=(self._memory.name, self.capacity, state, config),
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._process.start()
+
+    def set_speed(self, multiplier: float) -> None:
+        struct.pack_into("<d", self._memory.buf, 24, multiplier)
+
+    def latest(self) -> Snapshot | None:
+        """Most recent complete tick, or the previous one if every read raced the worker."""
+        buf = self._memory.buf
+        for _ in range(_READ_ATTEMPTS):
+            sequence, latest, _, _ = _HEADER.unpack_from(buf, 0)
+            if sequence == self._last_sequence:
+                return self._last_snapshot
+            snapshot = _read_buffer(buf, self.capacity, latest)
+            if snapshot is None:
+                continue
+            tick, creatures, kind_counts, winner = snapshot
+            if self._last_snapshot is not None and tick < self._last_snapshot.state.tick:
+                # An earlier read caught a newer tick before the header pointed at it.
+                break
+            self._last_sequence = sequence
+            self._last_snapshot = Snapshot(
+                state=GameState(
+                    board=self.board,
+                    creatures=creatures,
+                    obstacles=self.obstacles,
+                    tick=tick,
+                    obstacle_field=self.obstacle_field,
+                    _kind_counts=kind_counts,
+                ),
+                winner=winner,
+            )
+            break
+        return self._last_snapshot
+
+    def close(self) -> None:
+        struct.pack_into("<q", self._memory.buf, 16, 1)
+        if self._process.pid is not None:
+            self._process.join(_JOIN_TIMEOUT_SECONDS)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        self._memory.close()
+        self._memory.unlink()
@@ -0,0 +1,18 @@
+import pytest
+
+from sim.game import GameState
+
+
+def _snapshot(state: GameState):
+    return (
+        [(c.id, c.kind, c.pos, c.vx, c.vy, c.radius, c.mass) for c in state.creatures],
+        state.active_collision_pairs,
+        state.tick,
+        state.conversions,
+    )
+
+
+@pytest.fixture
+def snapshot():
+    """Everything that decides how a game goes on, to compare states exactly."""
+    return _snapshot
@@ -0,0 +1,115 @@
+import math
+import pickle
+import random
+
+import pytest
+
+from sim.checkpoint import checkpoint_bytes, fork_state, load_checkpoint, restore_checkpoint, save_checkpoint
+from sim.config import SimConfig
+from sim.game import GameState, create_game, step_game
+from sim.tournament import GameResult, run_tournament
+
+
+def _advance(state: GameState, ticks: int) -> GameState:
+    for _ in range(ticks):
+        state = step_game(state, None, encounter_distance=40.0, dt_seconds=1.0 / 60.0)
+    return state
+
+
+def test_restored_games_continue_exactly(tmp_path, snapshot) -> None:
+    config = SimConfig(
+        board_width=16,
+        board_height=12,
+        cell_size=20,
+        creature_count=30,
+        obstacle_count=4,
+        random_seed=11,
+    )
+    state = _advance(create_game(config), 120)
+    assert state.active_collision_pairs
+    assert state.conversions > 0
+
+    save_checkpoint(state, tmp_path / "mid.rpsc")
+    restored = load_checkpoint(tmp_path / "mid.rpsc")
+
+    assert restored.obstacles == state.obstacles
+    assert snapshot(restored) == snapshot(state)
+    assert snapshot(_advance(restored, 60)) == snapshot(_advance(state, 60))
+    assert len(checkpoint_bytes(state)) < len(pickle.dumps(state))
+
+
+def test_checkpoints_rebuild_the_distance_field_for_its_config() -> None:
+    config = SimConfig(
+        board_width=16,
+        board_height=12,
+        cell_size=20,
+        creature_count=30,
+        obstacle_count=4,
+        random_seed=11,
+        obstacle_collision="sdf",
+    )
+    data = checkpoint_bytes(create_game(config))
+
+    assert restore_checkpoint(data).obstacle_field.sdf is None
+    assert restore_checkpoint(data, config).obstacle_field.sdf is not None
+
+
+def test_array_checkpoints_match_the_game_state_format(snapshot) -> None:
+    pytest.importorskip("numpy")
+    from sim.soa import array_checkpoint_bytes, restore_array_checkpoint, to_array_state, to_game_state
+
+    config = SimConfig(
+        board_width=16,
+        board_height=12,
+        cell_size=20,
+        creature_count=30,
+        obstacle_count=4,
+        random_seed=11,
+    )
+    state = _advance(create_game(config), 100)
+    arrays = restore_array_checkpoint(checkpoint_bytes(state))
+
+    assert snapshot(to_game_state(arrays)) == snapshot(to_game_state(to_array_state(state)))
+    assert array_checkpoint_bytes(arrays) == checkpoint_bytes(to_game_state(arrays))
+
+
+def test_forks_keep_speeds_and_diverge_by_seed(snapshot) -> None:
+    config = SimConfig(
+        board_width=16,
+        board_height=12,
+        cell_size=20,
+        creature_count=30,
+        obstacle_count=4,
+        random_seed=11,
+    )
+    state = _advance(create_game(config), 10)
+
+    same = fork_state(state, random.Random(1), velocity_jitter=0.0)
+    left = fork_state(state, random.Random(1), velocity_jitter=0.2)
+    right = fork_state(state, random.Random(2), velocity_jitter=0.2)
+
+    assert snapshot(same) == snapshot(state)
+    for original, forked in zip(state.creatures, left.creatures, strict=True):
+        assert forked.pos == original.pos
+        assert math.hypot(forked.vx, forked.vy) == pytest.approx(math.hypot(original.vx, original.vy))
+    assert snapshot(left) != snapshot(right)
+
+
+def test_tournaments_can_fork_a_shared_checkpoint() -> None:
+    config = SimConfig(
+        board_width=16,
+        board_height=12,
+        cell_size=20,
+        creature_count=12,
+        obstacle_count=4,
+        random_seed=11,
+    )
+    start = _advance(create_game(config), 300)
+    results: list[GameResult] = []
+
+    run_tournament(
+        config, runs=3, workers=1, max_ticks=5_000, on_result=results.append, checkpoint=checkpoint_bytes(start)
+    )
+
+    assert all(result.ticks > 300 for result in results)
+    assert len({result.ticks for result in results}) > 1
@@ -1,4 +1,8 @@
-from sim.cli import build_parser
+import sys
+
+import pytest
+
+from sim.cli import build_parser, main
 from sim.config import SimConfig
 
 
@@ -44,3 +48,103 @@ def test_parser_defaults_come_from_sim_config() -> None:
     assert args.tps_multiplier == defaults.tps_multiplier
     assert args.obstacle_count == defaults.obstacle_count
     assert args.obstacle_avg_size == defaults.obstacle_avg_size
+
+
+def test_engine_option_parses() -> None:
+    parser = build_parser()
+
+    assert parser.parse_args([]).engine == "step"
+    assert parser.parse_args(["--engine", "array"]).engine == "array"
+    assert parser.parse_args(["--engine", "inplace"]).engine == "inplace"
+    assert parser.parse_args(["--engine", "kinetic"]).engine == "kinetic"
+
+
+def test_obstacle_collision_options_parse() -> None:
+    args = build_parser().parse_args(["--obstacle-collision", "sdf", "--sdf-resolution", "2.5"])
+
+    assert args.obstacle_collision == "sdf"
+    assert args.sdf_resolution == 2.5
+
+
+def test_tournament_subcommand_parses_simulation_options() -> None:
+    args = build_parser().parse_args(["tournament", "--runs", "50", "--workers", "3", "--count", "20"])
+
+    assert args.command == "tournament"
+    assert args.runs == 50
+    assert args.workers == 3
+    assert args.count == 20
+    assert build_parser().parse_args([]).command is None
+
+
+def test_simulation_options_before_the_tournament_subcommand_are_kept() -> None:
+    args = build_parser().parse_args(["--count", "500", "--seed", "3", "--grow-on-win", "tournament"])
+
+    assert (args.count, args.seed, args.grow_on_win) == (500, 3, True)
+    assert args.width == SimConfig().board_width
+
+    args = build_parser().parse_args(["--count", "500", "tournament", "--count", "40"])
+    assert args.count == 40
+
+
+def test_sim_process_flag_parses() -> None:
+    assert build_parser().parse_args(["--sim-process"]).sim_process is True
+    assert build_parser().parse_args([]).sim_process is False
+
+
+def test_ccd_flag_parses() -> None:
+    assert build_parser().parse_args(["--ccd"]).ccd is True
+    assert build_parser().parse_args([]).ccd is False
+
+
+def test_ccd_is_rejected_with_distance_field_obstacles(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(sys, "argv", ["rpsbattle", "--headless", "--ccd", "--obstacle-collision", "sdf"])
+
+    with pytest.raises(SystemExit):
+        main()
+    assert "--ccd sweeps the exact obstacle shapes" in capsys.readouterr().err
+
+
+def test_dirty_rects_flag_parses() -> None:
+    assert build_parser().parse_args(["--dirty-rects"]).dirty_rects is True
+    assert build_parser().parse_args([]).dirty_rects is False
+
+
+def test_record_options_parse() -> None:
+    args = build_parser().parse_args(["--record", "out", "--record-every", "5", "--record-format", "raw"])
+
+    assert (args.record, args.record_every, args.record_format) == ("out", 5, "raw")
+    assert build_parser().parse_args([]).record is None
+
+
+def test_replay_options_parse() -> None:
+    args = build_parser().parse_args(["--save-replay", "game.rpsr", "--save-replay-every", "3"])
+    assert (args.save_replay, args.save_replay_every, args.replay) == ("game.rpsr", 3, None)
+    assert build_parser().parse_args(["--replay", "game.rpsr"]).replay == "game.rpsr"
+
+
+def test_checkpoint_options_parse() -> None:
+    args = build_parser().parse_args(["--headless", "--save-checkpoint", "mid.rpsc"])
+    assert (args.save_checkpoint, args.from_checkpoint) == ("mid.rpsc", None)
+
+    args = build_parser().parse_args(["tournament", "--from-checkpoint", "mid.rpsc", "--fork-jitter", "0.2"])
+    assert (args.from_checkpoint, args.fork_jitter) == ("mid.rpsc", 0.2)
+
+
+@pytest.mark.parametrize("option", ["--from-checkpoint", "--save-checkpoint"])
+def test_checkpoint_options_need_a_headless_run(monkeypatch, capsys, option: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["rpsbattle", option, "mid.rpsc"])
+
+    with pytest.raises(SystemExit):
+        main()
+    assert f"{option} needs --headless" in capsys.readouterr().err
+
+
+def test_metrics_options_parse() -> None:
+    args = build_parser().parse_args(["--metrics-out", "run.csv", "--metrics-every", "10"])
+    assert (args.metrics_out, args.metrics_every) == ("run.csv", 10)
+    assert build_parser().parse_args([]).metrics_out is None
+
+
+def test_spawn_option_parses() -> None:
+    assert build_parser().parse_args([]).spawn == "random"
+    assert build_parser().parse_args(["--spawn", "grid"]).spawn == "grid"
@@ -1,8 +1,12 @@
 import math
 import random
+from collections import Counter
+from dataclasses import replace
 
 import pytest
+import sim.game
 from sim.board import Board, Obstacle, Position
+from sim.config import SimConfig
 from sim.creature import Creature
 from sim.game import (
     GameState,
@@ -284,6 +288,25 @@ def test_create_game_spawns_non_overlapping_obstacles() -> None:
             assert (dx * dx) + (dy * dy) >= min_distance * min_distance
 
 
+def test_dense_obstacle_placement_never_overlaps() -> None:
+    config = SimConfig(
+        board_width=40,
+        board_height=30,
+        cell_size=10,
+        creature_count=0,
+        random_seed=8,
+        obstacle_count=400,
+        obstacle_avg_size=10.0,
+    )
+
+    shapes = create_game(config).obstacle_field.shapes
+
+    # Dense enough that some candidates are retried or given up on.
+    assert 100 < len(shapes) < 400
+    for index, shape in enumerate(shapes):
+        assert not any(sim.game._obstacles_overlap(shape, other) for other in shapes[index + 1 :])
+
+
 def test_create_game_spawns_creatures_away_from_walls() -> None:
     from sim.config import SimConfig
 
@@ -331,6 +354,66 @@ def test_create_game_spawns_creatures_outside_obstacles() -> None:
             assert (dx * dx) + (dy * dy) >= min_distance * min_distance
 
 
+def test_grid_spawn_places_every_creature_without_overlaps() -> None:
+    config = SimConfig(
+        board_width=40,
+        board_height=30,
+        cell_size=8,
+        creature_count=1_000,
+        creature_radius=3,
+        random_seed=5,
+        obstacle_count=30,
+        obstacle_avg_size=20,
+        spawn_mode="grid",
+    )
+
+    state = create_game(config)
+    creatures = state.creatures
+
+    assert [creature.id for creature in creatures] == list(range(1_000))
+    assert len({creature.kind for creature in creatures}) == 3
+    min_speed = config.creature_speed * config.min_speed_multiplier
+    max_speed = config.creature_speed * config.max_speed_multiplier
+    for creature in creatures:
+        assert min_speed - 1e-9 <= math.hypot(creature.vx, creature.vy) <= max_speed + 1e-9
+        assert 3 <= creature.pos.x <= config.window_width - 3
+        assert 3 <= creature.pos.y <= config.window_height - 3
+        assert not any(
+            sim.game._creature_overlaps_obstacle(creature, shape) for shape in state.obstacle_field.shapes
+        )
+    points = sorted((creature.pos.x, creature.pos.y) for creature in creatures)
+    for index, (x, y) in enumerate(points):
+        for other_x, other_y in points[index + 1 :]:
+            if other_x - x >= 6:
+                break
+            assert math.hypot(other_x - x, other_y - y) >= 6 - 1e-9
+    assert create_game(config).creatures == creatures
+
+
+def test_grid_spawn_overflows_to_random_spawns_when_the_board_is_full() -> None:
+    config = SimConfig(
+        board_width=4,
+        board_height=3,
+        cell_size=10,
+        creature_count=50,
+        creature_radius=5,
+        obstacle_count=0,
+        random_seed=2,
+        spawn_mode="grid",
+    )
+
+    creatures = create_game(config).creatures
+
+    # 4 x 3 cells of one creature diameter fit; the rest may overlap.
+    assert [creature.id for creature in creatures] == list(range(50))
+    assert all(5 <= creature.pos.x <= 35 and 5 <= creature.pos.y <= 25 for creature in creatures)
+
+
+def test_create_game_rejects_unknown_spawn_mode() -> None:
+    with pytest.raises(ValueError):
+        create_game(SimConfig(spawn_mode="poisson"))
+
+
 def test_creature_bounces_off_obstacle() -> None:
     state = GameState(
         board=Board(width=20, height=20),
@@ -440,6 +523,52 @@ def test_creature_counts() -> None:
     assert counts[CreatureType.SCISSORS] == 0
 
 
+@pytest.mark.parametrize("convert", [True, False])
+def test_kind_counts_follow_conversions_and_eliminations(convert: bool, monkeypatch) -> None:
+    monkeypatch.setattr(sim.game, "CHECK_COUNTS", True)
+    state = create_game(
+        SimConfig(board_width=8, board_height=6, creature_count=60, random_seed=11, creature_radius=12)
+    )
+
+    for _ in range(60):
+        state = step_game(state, None, convert_loser_to_winner=convert, encounter_distance=24.0, dt_seconds=0.1)
+
+    assert creature_counts(state) == Counter(c.kind for c in state.creatures)
+    assert sum(creature_counts(state).values()) == len(state.creatures)
+
+
+def test_replaced_states_recount_their_creatures() -> None:
+    state = create_game(SimConfig(board_width=8, board_height=6, creature_count=12, random_seed=11))
+
+    survivors = replace(state, creatures=state.creatures[:1])
+
+    assert creature_counts(survivors) == Counter({state.creatures[0].kind: 1})
+
+
+def test_stepped_states_take_the_counts_step_game_kept(monkeypatch) -> None:
+    monkeypatch.setattr(sim.game, "CHECK_COUNTS", False)
+    state = GameState(
+        board=Board(width=10, height=10),
+        creatures=[Creature(id=1, kind=CreatureType.ROCK, pos=Position(5, 5))],
+    )
+    state.kind_counts = Counter({CreatureType.PAPER: 1})
+
+    # Nothing recounts the stepped state, so the drift carries over.
+    assert creature_counts(step_game(state, None)) == Counter({CreatureType.PAPER: 1})
+
+
+def test_count_check_reports_drifted_counts(monkeypatch) -> None:
+    monkeypatch.setattr(sim.game, "CHECK_COUNTS", True)
+    state = GameState(
+        board=Board(width=10, height=10),
+        creatures=[Creature(id=1, kind=CreatureType.ROCK, pos=Position(5, 5))],
+    )
+    state.kind_counts = Counter({CreatureType.PAPER: 1})
+
+    with pytest.raises(AssertionError, match="recount"):
+        step_game(state, None)
+
+
 def test_randomize_creature_speeds_changes_speed_and_keeps_direction() -> None:
     creatures = [
         Creature(
@@ -483,3 +612,102 @@ def test_randomize_creature_speeds_changes_speed_and_keeps_direction() -> None:
         assert new_angle == pytest.approx(original_angle, abs=1e-6)
 
     assert any_speed_changed
+
+
+def test_growth_mid_tick_reaches_creatures_beyond_starting_radius() -> None:
+    state = GameState(
+        board=Board(width=200, height=100),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(50, 50), radius=5, mass=20),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(55, 50), radius=5, mass=20),
+            Creature(id=3, kind=CreatureType.SCISSORS, pos=Position(80, 50), radius=5, mass=1),
+        ],
+    )
+
+    next_state = step_game(state, StubRng(), grow_on_win=True, dt_seconds=0.0)
+
+    assert [creature.kind for creature in next_state.creatures] == [CreatureType.ROCK] * 3
+    assert next_state.creatures[0].radius == 26.0
+
+
+def test_distant_creatures_never_become_collision_pairs() -> None:
+    creatures = [
+        Creature(id=index, kind=CreatureType.ROCK, pos=Position(10 + (index * 30), 50), radius=5)
+        for index in range(20)
+    ]
+    creatures.append(Creature(id=99, kind=CreatureType.ROCK, pos=Position(15, 50), radius=5))
+    state = GameState(board=Board(width=700, height=100), creatures=creatures)
+
+    next_state = step_game(state, StubRng(), dt_seconds=0.0)
+
+    assert next_state.active_collision_pairs == {(0, 99)}
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+def test_continuous_collision_catches_creatures_crossing_within_one_step(continuous: bool) -> None:
+    state = GameState(
+        board=Board(width=200, height=40),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(80, 20), vx=60.0, vy=0.0, radius=4.0),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(120, 20), vx=-60.0, vy=0.0, radius=4.0),
+        ],
+        tick=0,
+    )
+
+    next_state = step_game(state, StubRng(), dt_seconds=1.0, continuous_collision=continuous)
+
+    left, right = next_state.creatures
+    if not continuous:
+        # End-of-step positions are 80 px apart again: the pair tunnels.
+        assert (left.kind, right.kind) == (CreatureType.ROCK, CreatureType.SCISSORS)
+        return
+    assert right.kind == CreatureType.ROCK
+    # They touch 4/15 s into the step at x=96 and x=104, then bounce apart.
+    assert left.vx == pytest.approx(-60.0)
+    assert right.vx == pytest.approx(60.0)
+    assert left.pos.x == pytest.approx(96.0 - 44.0)
+    assert right.pos.x == pytest.approx(104.0 + 44.0)
+
+
+def test_continuous_collision_sweeps_the_rest_of_the_step_after_a_pair_bounce() -> None:
+    state = GameState(
+        board=Board(width=200, height=40),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(80, 20), vx=60.0, vy=0.0, radius=4.0),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(120, 20), vx=-60.0, vy=0.0, radius=4.0),
+        ],
+        obstacles=[
+            Obstacle(kind="square", pos=Position(50, 20), size=2.0, rotation=0.0, color=(120, 125, 135))
+        ],
+        tick=0,
+    )
+
+    left, right = step_game(state, StubRng(), dt_seconds=1.0, continuous_collision=True).creatures
+
+    # Bounced back from x=96 with 44 px to go, the rock meets the face at x=52
+    # from x=56 and turns again for the last 4 px instead of passing it.
+    assert left.vx == pytest.approx(60.0)
+    assert left.pos.x == pytest.approx(56.0 + 4.0)
+    assert right.pos.x == pytest.approx(104.0 + 44.0)
+
+
+def test_continuous_collision_bounces_off_thin_obstacle_crossed_mid_step() -> None:
+    state = GameState(
+        board=Board(width=200, height=40),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(60, 20), vx=80.0, vy=0.0, radius=4.0)
+        ],
+        obstacles=[
+            Obstacle(kind="square", pos=Position(100, 20), size=2.0, rotation=0.0, color=(120, 125, 135))
+        ],
+        tick=0,
+    )
+
+    tunneled = step_game(state, StubRng(), dt_seconds=1.0).creatures[0]
+    swept = step_game(state, StubRng(), dt_seconds=1.0, continuous_collision=True).creatures[0]
+
+    assert tunneled.pos.x == pytest.approx(140.0)
+    assert tunneled.vx == pytest.approx(80.0)
+    # Contact with the face at x=98 happens at x=94, with 46 px of the step left.
+    assert swept.vx == pytest.approx(-80.0)
+    assert swept.pos.x == pytest.approx(94.0 - 46.0)
@@ -0,0 +1,270 @@
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import sim.geometry
+from sim.board import Position
+from sim.geometry import (
+    Capsule,
+    Circle,
+    Polygon,
+    circle_circle_contact,
+    circle_polygon_contact,
+    circle_capsule_overlap,
+    circle_capsule_overlap_batch,
+    circle_circle_overlap,
+    circle_circle_overlap_batch,
+    circle_polygon_overlap,
+    circle_polygon_overlap_batch,
+    closest_point_on_segment,
+    closest_point_on_segment_batch,
+    distance_sq_point_segment,
+    distance_sq_point_segment_batch,
+    normalize,
+    normalize_batch,
+    point_in_polygon,
+    point_in_polygon_batch,
+    polygon_capsule_overlap,
+    polygon_closest_point,
+    polygon_closest_point_batch,
+    polygon_polygon_overlap,
+    segments_intersect,
+)
+
+SEEDS = range(20)
+
+
+def _random_polygon(rng: random.Random) -> Polygon:
+    """A star-shaped polygon, often concave, or an axis-aligned square for horizontal edges."""
+    center_x, center_y = rng.uniform(-20, 20), rng.uniform(-20, 20)
+    if rng.random() < 0.25:
+        size = rng.uniform(1, 15)
+        corners = ((-1, -1), (1, -1), (1, 1), (-1, 1))
+        return Polygon(
+            tuple(Position(center_x + (dx * size), center_y + (dy * size)) for dx, dy in corners)
+        )
+    vertices = []
+    for angle in sorted(rng.uniform(0, math.tau) for _ in range(rng.randint(3, 8))):
+        radius = rng.uniform(2, 20)
+        vertices.append(
+            Position(center_x + (math.cos(angle) * radius), center_y + (math.sin(angle) * radius))
+        )
+    return Polygon(tuple(vertices))
+
+
+def _random_points(
+    rng: random.Random, polygon: Polygon | None = None
+) -> tuple[list[float], list[float]]:
+    xs = [rng.uniform(-45, 45) for _ in range(200)]
+    ys = [rng.uniform(-45, 45) for _ in range(200)]
+    if polygon is not None:
+        # Points exactly on vertices and on vertex rows, where ties and boundaries live.
+        for vertex in polygon.vertices:
+            xs.extend([vertex.x, rng.uniform(-45, 45)])
+            ys.extend([vertex.y, vertex.y])
+    return xs, ys
+
+
+def _random_segment(rng: random.Random) -> tuple[Position, Position]:
+    start = Position(rng.uniform(-30, 30), rng.uniform(-30, 30))
+    if rng.random() < 0.1:
+        return start, start
+    return start, Position(rng.uniform(-30, 30), rng.uniform(-30, 30))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_segment_kernels_match_scalar(seed: int) -> None:
+    rng = random.Random(seed)
+    start, end = _random_segment(rng)
+    xs, ys = _random_points(rng)
+
+    closest_x, closest_y = closest_point_on_segment_batch(np.array(xs), np.array(ys), start, end)
+    distances = distance_sq_point_segment_batch(np.array(xs), np.array(ys), start, end)
+
+    for index, (x, y) in enumerate(zip(xs, ys)):
+        expected = closest_point_on_segment(Position(x, y), start, end)
+        assert (closest_x[index], closest_y[index]) == (expected.x, expected.y)
+        assert distances[index] == distance_sq_point_segment(Position(x, y), start, end)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_polygon_kernels_match_scalar(seed: int) -> None:
+    rng = random.Random(seed)
+    polygon = _random_polygon(rng)
+    xs, ys = _random_points(rng, polygon)
+    radii = [rng.uniform(0, 8) for _ in xs]
+
+    inside = point_in_polygon_batch(np.array(xs), np.array(ys), polygon)
+    overlaps = circle_polygon_overlap_batch(np.array(xs), np.array(ys), np.array(radii), polygon)
+    closest_x, closest_y = polygon_closest_point_batch(np.array(xs), np.array(ys), polygon)
+
+    for index, (x, y, radius) in enumerate(zip(xs, ys, radii)):
+        point = Position(x, y)
+        expected = polygon_closest_point(point, polygon)
+        assert inside[index] == point_in_polygon(point, polygon)
+        assert overlaps[index] == circle_polygon_overlap(Circle(point, radius), polygon)
+        assert (closest_x[index], closest_y[index]) == (expected.x, expected.y)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_circle_and_capsule_kernels_match_scalar(seed: int) -> None:
+    rng = random.Random(seed)
+    circle = Circle(Position(rng.uniform(-20, 20), rng.uniform(-20, 20)), rng.uniform(0, 15))
+    start, end = _random_segment(rng)
+    capsule = Capsule(start, end, rng.uniform(0, 10))
+    xs, ys = _random_points(rng)
+    radii = [rng.uniform(0, 8) for _ in xs]
+
+    circles = circle_circle_overlap_batch(np.array(xs), np.array(ys), np.array(radii), circle)
+    capsules = circle_capsule_overlap_batch(np.array(xs), np.array(ys), np.array(radii), capsule)
+
+    for index, (x, y, radius) in enumerate(zip(xs, ys, radii)):
+        assert circles[index] == circle_circle_overlap(Circle(Position(x, y), radius), circle)
+        assert capsules[index] == circle_capsule_overlap(Circle(Position(x, y), radius), capsule)
+
+
+def test_normalize_batch_matches_scalar() -> None:
+    rng = random.Random(3)
+    dxs = [rng.uniform(-5, 5) for _ in range(100)] + [0.0, 0.0, 3.0]
+    dys = [rng.uniform(-5, 5) for _ in range(100)] + [0.0, 2.0, 0.0]
+
+    normal_x, normal_y = normalize_batch(np.array(dxs), np.array(dys))
+
+    assert list(zip(normal_x, normal_y)) == [normalize(dx, dy) for dx, dy in zip(dxs, dys)]
+
+
+def test_batch_kernels_accept_one_radius_for_every_circle() -> None:
+    polygon = Polygon((Position(0, 0), Position(4, 0), Position(0, 4)))
+
+    overlaps = circle_polygon_overlap_batch(np.array([5.0, 9.0]), np.array([0.0, 0.0]), 1.5, polygon)
+    assert overlaps.tolist() == [True, False]
+
+
+def _convex_polygon(rng: random.Random) -> Polygon:
+    center_x, center_y = rng.uniform(-15, 15), rng.uniform(-15, 15)
+    count = rng.randint(3, 6)
+    start = rng.uniform(0, math.tau)
+    radius = rng.uniform(2, 12)
+    angles = [start + (index * math.tau / count) for index in range(count)]
+    if rng.random() < 0.5:
+        angles.reverse()
+    return Polygon(
+        tuple(
+            Position(center_x + (math.cos(angle) * radius), center_y + (math.sin(angle) * radius))
+            for angle in angles
+        )
+    )
+
+
+def _edges(polygon: Polygon):
+    vertices = polygon.vertices
+    return [(start, vertices[(index + 1) % len(vertices)]) for index, start in enumerate(vertices)]
+
+
+def _edge_walk_overlap(left: Polygon, right: Polygon) -> bool:
+    if any(segments_intersect(a, b, c, d) for a, b in _edges(left) for c, d in _edges(right)):
+        return True
+    return point_in_polygon(left.vertices[0], right) or point_in_polygon(right.vertices[0], left)
+
+
+def test_polygon_caches_outward_normals_bounds_and_convexity() -> None:
+    corners = (Position(0, 0), Position(4, 0), Position(4, 2), Position(0, 2))
+    for square in (Polygon(corners), Polygon(corners[::-1])):
+        assert square.convex
+        assert (square.min_x, square.min_y, square.max_x, square.max_y) == (0, 0, 4, 2)
+        for (start, end), (normal_x, normal_y) in zip(_edges(square), square.edge_normals):
+            middle_x, middle_y = (start.x + end.x) / 2, (start.y + end.y) / 2
+            assert math.hypot(normal_x, normal_y) == pytest.approx(1.0)
+            assert not point_in_polygon(Position(middle_x + normal_x, middle_y + normal_y), square)
+
+    arrow = Polygon((Position(0, 0), Position(4, 2), Position(0, 4), Position(1, 2)))
+    star_angles = [index * 4 * math.pi / 5 for index in range(5)]
+    star = Polygon(tuple(Position(math.cos(angle), math.sin(angle)) for angle in star_angles))
+    flat = Polygon((Position(0, 0), Position(1, 1), Position(2, 2)))
+    assert not arrow.convex and not star.convex and not flat.convex
+    assert Polygon(corners) == Polygon(corners)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_separating_axis_overlap_matches_edge_walk(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(50):
+        left = _convex_polygon(rng)
+        right = _convex_polygon(rng)
+        assert polygon_polygon_overlap(left, right) == _edge_walk_overlap(left, right)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_convex_capsule_overlap_matches_distance_to_edges(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(50):
+        polygon = _convex_polygon(rng)
+        start, end = _random_segment(rng)
+        capsule = Capsule(start, end, rng.uniform(0, 6))
+        inside = point_in_polygon(start, polygon) or point_in_polygon(end, polygon)
+        crossing = any(segments_intersect(start, end, a, b) for a, b in _edges(polygon))
+        ends_to_edges = [
+            distance_sq_point_segment(point, a, b) for point in (start, end) for a, b in _edges(polygon)
+        ]
+        vertices_to_segment = [
+            distance_sq_point_segment(vertex, start, end) for vertex in polygon.vertices
+        ]
+        gap_sq = min(ends_to_edges + vertices_to_segment)
+        expected = inside or crossing or gap_sq <= capsule.radius * capsule.radius
+        assert polygon_capsule_overlap(polygon, capsule) == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_circle_polygon_contact_points_from_the_outline_to_the_center(seed: int) -> None:
+    rng = random.Random(seed)
+    polygon = _random_polygon(rng) if seed % 2 else _convex_polygon(rng)
+    xs, ys = _random_points(rng, polygon)
+
+    for x, y in zip(xs, ys):
+        circle = Circle(Position(x, y), rng.uniform(0, 8))
+        contact = circle_polygon_contact(circle, polygon)
+        assert (contact is not None) == circle_polygon_overlap(circle, polygon)
+        if contact is None:
+            continue
+        assert contact.point == polygon_closest_point(circle.center, polygon)
+        assert math.hypot(contact.normal_x, contact.normal_y) == pytest.approx(1.0)
+        pushed_x = contact.point.x + (contact.normal_x * circle.radius)
+        pushed_y = contact.point.y + (contact.normal_y * circle.radius)
+        # Moving the center by the depth along the normal leaves the circle just touching.
+        assert pushed_x == pytest.approx(x + (contact.normal_x * contact.depth), abs=1e-9)
+        assert pushed_y == pytest.approx(y + (contact.normal_y * contact.depth), abs=1e-9)
+        if not point_in_polygon(circle.center, polygon):
+            assert contact.depth >= -1e-12
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_convex_closest_point_matches_edge_walk(seed: int) -> None:
+    rng = random.Random(seed)
+    polygon = _convex_polygon(rng)
+    xs, ys = _random_points(rng, polygon)
+    # Centers and edge midpoints, where several edges are equally near.
+    xs.append(sum(vertex.x for vertex in polygon.vertices) / len(polygon.vertices))
+    ys.append(sum(vertex.y for vertex in polygon.vertices) / len(polygon.vertices))
+    for start, end in zip(polygon.vertices, polygon.vertices[1:] + polygon.vertices[:1]):
+        xs.append((start.x + end.x) / 2)
+        ys.append((start.y + end.y) / 2)
+
+    for x, y in zip(xs, ys):
+        point = Position(x, y)
+        closest, inside = sim.geometry._convex_closest_point(point, polygon)
+        assert closest == polygon_closest_point(point, polygon)
+        if math.hypot(x - closest.x, y - closest.y) > 1e-9:
+            assert inside == point_in_polygon(point, polygon)
+
+
+def test_circle_circle_contact() -> None:
+    contact = circle_circle_contact(Circle(Position(3, 4), 2.0), Circle(Position(0, 0), 4.0))
+
+    assert contact is not None
+    assert (contact.normal_x, contact.normal_y) == (0.6, 0.8)
+    assert contact.point == Position(2.4, 3.2)
+    assert contact.depth == 1.0
+    assert circle_circle_contact(Circle(Position(9, 0), 2.0), Circle(Position(0, 0), 4.0)) is None
@@ -0,0 +1,104 @@
+import tracemalloc
+
+import pytest
+
+from sim.board import Board, Position
+from sim.config import SimConfig
+from sim.creature import Creature
+from sim.game import GameState, create_game, step_game
+from sim.inplace import step_game_inplace, to_game_state, to_mutable_state
+from sim.rps import CreatureType
+
+
+@pytest.mark.parametrize("convert", [True, False])
+@pytest.mark.parametrize("grow", [False, True])
+def test_step_game_inplace_matches_step_game(convert: bool, grow: bool, snapshot) -> None:
+    config = SimConfig(
+        board_width=12,
+        board_height=10,
+        creature_count=60,
+        random_seed=8,
+        obstacle_count=4,
+        creature_mass=3,
+    )
+    state = create_game(config)
+    mutable = to_mutable_state(state)
+    options = dict(
+        convert_loser_to_winner=convert,
+        grow_on_win=grow,
+        encounter_distance=config.creature_radius * 2,
+        dt_seconds=1.0 / 20.0,
+    )
+
+    for _ in range(30):
+        state = step_game(state, None, **options)
+        step_game_inplace(mutable, **options)
+
+    assert snapshot(to_game_state(mutable)) == snapshot(state)
+
+
+def test_step_game_inplace_removes_loser_when_conversion_disabled() -> None:
+    state = GameState(
+        board=Board(width=3, height=3),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(1, 1)),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(1, 1)),
+        ],
+    )
+    mutable = to_mutable_state(state)
+
+    step_game_inplace(mutable, convert_loser_to_winner=False)
+
+    assert [record.kind for record in mutable.records] == [CreatureType.ROCK]
+
+
+def test_step_game_inplace_allocations_stay_flat() -> None:
+    config = SimConfig(board_width=8, board_height=6, creature_count=150, random_seed=2)
+    mutable = to_mutable_state(create_game(config))
+    options = dict(bounce_off_creatures=False, encounter_distance=40.0, dt_seconds=1.0 / 60.0)
+    for _ in range(50):
+        step_game_inplace(mutable, **options)
+
+    tracemalloc.start()
+    try:
+        for _ in range(20):
+            step_game_inplace(mutable, **options)
+        early, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(100):
+            step_game_inplace(mutable, **options)
+        late, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert late - early < 1024
+    # Only short-lived temporaries; no per-creature objects survive a tick.
+    assert peak - late < 16 * 1024
+
+
+def test_step_game_inplace_allocations_stay_flat_while_bouncing() -> None:
+    # A roomier board than above: pairs keep touching every tick, but not so
+    # many that rebuilding the pair sets dominates what is measured.
+    config = SimConfig(board_width=20, board_height=15, creature_count=150, random_seed=2)
+    mutable = to_mutable_state(create_game(config))
+    options = dict(encounter_distance=40.0, dt_seconds=1.0 / 60.0)
+    for _ in range(50):
+        step_game_inplace(mutable, **options)
+
+    fewest_pairs = len(mutable.active_collision_pairs)
+    tracemalloc.start()
+    try:
+        for _ in range(20):
+            step_game_inplace(mutable, **options)
+        early, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(100):
+            step_game_inplace(mutable, **options)
+            fewest_pairs = min(fewest_pairs, len(mutable.active_collision_pairs))
+        late, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert fewest_pairs > 50
+    assert late - early < 1024
+    assert peak - late < 16 * 1024
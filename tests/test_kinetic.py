@@ -0,0 +1,113 @@
+import pytest
+
+from sim.app import play_headless
+from sim.board import Board, Obstacle, Position
+from sim.config import SimConfig
+from sim.creature import Creature
+from sim.game import GameState
+from sim.kinetic import kinetic_creature_counts, step_kinetic_state, to_game_state, to_kinetic_state
+from sim.rps import CreatureType
+
+
+def _state(creatures: list[Creature], obstacles: list[Obstacle] | None = None) -> GameState:
+    return GameState(board=Board(width=200, height=100), creatures=creatures, obstacles=obstacles or [])
+
+
+def test_head_on_contact_converts_at_predicted_tick() -> None:
+    state = _state(
+        [
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(50.0, 50.0), vx=10.0, vy=0.0, radius=5.0),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(150.0, 50.0), vx=-10.0, vy=0.0, radius=5.0),
+        ]
+    )
+    kinetic = to_kinetic_state(state, dt_seconds=0.1)
+
+    kinetic = step_kinetic_state(kinetic, max_tick=1000)
+
+    # Gap of 90 px closing at 20 px/s: contact at t=4.5 s, i.e. during tick 45.
+    assert kinetic.tick == 45
+    assert kinetic_creature_counts(kinetic) == {CreatureType.ROCK: 2}
+    left, right = to_game_state(kinetic).creatures
+    assert left.vx == pytest.approx(-10.0)
+    assert right.vx == pytest.approx(10.0)
+    assert right.pos.x - left.pos.x == pytest.approx(10.0, abs=1.0)
+
+
+def test_wall_bounce_keeps_creature_on_board() -> None:
+    state = _state([Creature(id=1, kind=CreatureType.ROCK, pos=Position(100.0, 50.0), vx=30.0, vy=7.0, radius=5.0)])
+    kinetic = to_kinetic_state(state, dt_seconds=1.0 / 60.0)
+
+    while kinetic.tick < 6000:
+        kinetic = step_kinetic_state(kinetic, max_tick=6000)
+        creature = to_game_state(kinetic).creatures[0]
+        assert 5.0 - 1e-9 <= creature.pos.x <= 195.0 + 1e-9
+        assert 5.0 - 1e-9 <= creature.pos.y <= 95.0 + 1e-9
+
+    assert kinetic.tick == 6000
+    # About one wall contact per few simulated seconds, not one step per tick.
+    assert kinetic.events_processed < 200
+
+
+@pytest.mark.parametrize("kind", ["square", "circle"])
+def test_obstacle_contact_reflects_velocity(kind: str) -> None:
+    obstacle = Obstacle(kind=kind, pos=Position(100.0, 50.0), size=10.0, rotation=0.0, color=(120, 125, 135))
+    state = _state(
+        [Creature(id=1, kind=CreatureType.ROCK, pos=Position(40.0, 50.0), vx=20.0, vy=0.0, radius=5.0)],
+        [obstacle],
+    )
+    kinetic = to_kinetic_state(state, dt_seconds=0.1)
+
+    kinetic = step_kinetic_state(kinetic, max_tick=1000)
+
+    creature = to_game_state(kinetic).creatures[0]
+    assert creature.vx == pytest.approx(-20.0)
+    assert creature.pos.x <= 85.0 + 1e-6
+
+
+def test_elimination_without_bounce_passes_through() -> None:
+    state = _state(
+        [
+            Creature(id=1, kind=CreatureType.PAPER, pos=Position(50.0, 50.0), vx=10.0, vy=0.0, radius=5.0),
+            Creature(id=2, kind=CreatureType.ROCK, pos=Position(150.0, 50.0), vx=-10.0, vy=0.0, radius=5.0),
+        ]
+    )
+    kinetic = to_kinetic_state(state, dt_seconds=0.1, convert_loser_to_winner=False, bounce_off_creatures=False)
+
+    kinetic = step_kinetic_state(kinetic, max_tick=1000)
+
+    creatures = to_game_state(kinetic).creatures
+    assert [creature.kind for creature in creatures] == [CreatureType.PAPER]
+    assert creatures[0].vx == 10.0
+
+
+def test_play_headless_kinetic_finds_winner_with_few_steps() -> None:
+    config = SimConfig(creature_count=12, random_seed=1, obstacle_count=3)
+
+    result = play_headless(config, max_ticks=200_000, engine="kinetic")
+
+    assert result.winner is not None
+    assert sum(result.counts.values()) == config.creature_count
+    assert 0 < result.ticks < 200_000
+
+
+def test_winner_that_outgrows_the_grid_still_meets_distant_creatures() -> None:
+    state = _state(
+        [
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(20.0, 50.0), vx=10.0, vy=0.0, radius=5.0),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(45.0, 50.0), radius=5.0, mass=30.0),
+            Creature(id=3, kind=CreatureType.PAPER, pos=Position(125.0, 50.0), radius=5.0),
+        ]
+    )
+    kinetic = to_kinetic_state(
+        state, dt_seconds=0.1, convert_loser_to_winner=False, bounce_off_creatures=False, grow_on_win=True
+    )
+
+    kinetic = step_kinetic_state(kinetic, max_tick=1000)
+    # The rock eats the scissors at t=1.5 s and grows to radius 35, far wider than the grid cells.
+    assert kinetic.tick == 15
+    assert kinetic_creature_counts(kinetic) == {CreatureType.ROCK: 1, CreatureType.PAPER: 1}
+
+    kinetic = step_kinetic_state(kinetic, max_tick=1000)
+    # It now touches the paper 40 px away, at x=85, i.e. at t=6.5 s.
+    assert kinetic.tick == 65
+    assert kinetic_creature_counts(kinetic) == {CreatureType.PAPER: 1}
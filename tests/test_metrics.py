@@ -0,0 +1,71 @@
+from itertools import islice
+import json
+
+import pytest
+
+from sim.app import iter_game, play_headless, run_headless
+from sim.config import SimConfig
+from sim.metrics import METRIC_FIELDS, MetricsWriter, TickMetrics
+
+
+def test_iter_game_samples_every_few_ticks_and_the_last() -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=30, obstacle_count=1, random_seed=4
+    )
+    records = list(iter_game(config, every=10, max_ticks=35))
+
+    assert [record.tick for record in records] == [0, 10, 20, 30, 35]
+    assert all(record.state is None for record in records)
+    assert all(sum(record.counts.values()) == 30 for record in records)
+
+
+@pytest.mark.parametrize("engine", ["step", "inplace", "array", "kinetic"])
+def test_iter_game_conversions_add_up_to_the_final_count(engine: str) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=30, obstacle_count=1, random_seed=4
+    )
+    records = list(iter_game(config, every=7, engine=engine, max_ticks=200, snapshots=True))
+    final = records[-1]
+
+    assert final.state is not None and final.state.tick == final.tick
+    assert sum(record.conversions for record in records) == final.state.conversions
+    assert final.state.conversions > 0
+    assert final.winner == play_headless(config, max_ticks=200, engine=engine).winner
+
+
+def test_iter_game_stops_when_the_consumer_does() -> None:
+    records = list(islice(iter_game(SimConfig(creature_count=30, random_seed=4)), 3))
+
+    assert [record.tick for record in records] == [0, 1, 2]
+
+
+def test_iter_game_rejects_engine_options_up_front() -> None:
+    with pytest.raises(ValueError):
+        iter_game(SimConfig(), engine="warp")
+
+
+@pytest.mark.parametrize("name", ["metrics.csv", "metrics.jsonl"])
+def test_metrics_writer_streams_records(tmp_path, name: str) -> None:
+    path = tmp_path / name
+    with MetricsWriter(path) as writer:
+        writer.write(TickMetrics(tick=0, rock=3, paper=2, scissors=1, contacts=4, conversions=0))
+        writer.write(TickMetrics(tick=5, rock=4, paper=1, scissors=1, contacts=2, conversions=1))
+
+    lines = path.read_text().splitlines()
+    if path.suffix == ".csv":
+        assert lines == [",".join(METRIC_FIELDS), "0,3,2,1,4,0", "5,4,1,1,2,1"]
+    else:
+        assert [json.loads(line)["rock"] for line in lines] == [3, 4]
+    assert writer.records == 2
+
+
+def test_run_headless_writes_metrics_out(tmp_path, capsys) -> None:
+    path = tmp_path / "run.jsonl"
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=30, obstacle_count=1, random_seed=4
+    )
+    run_headless(config, max_ticks=40, metrics_out=path, metrics_every=10)
+
+    ticks = [json.loads(line)["tick"] for line in path.read_text().splitlines()]
+    assert ticks[:4] == [0, 10, 20, 30]
+    assert f"metrics records to {path}" in capsys.readouterr().out
@@ -0,0 +1,102 @@
+import math
+import random
+
+import pytest
+
+from sim.board import Board, Obstacle, Position
+from sim.creature import Creature
+from sim.game import GameState, step_game
+from sim.geometry import Polygon, polygon_closest_point
+from sim.obstacles import bake_obstacle, bake_obstacles, closest_point, time_of_impact
+from sim.rps import CreatureType
+
+
+def _obstacle(kind: str, rotation: float = 0.3) -> Obstacle:
+    return Obstacle(
+        kind=kind,
+        pos=Position(50.0, 40.0),
+        size=10.0,
+        rotation=rotation,
+        color=(120, 125, 135),
+    )
+
+
+def test_baked_bounds_cover_every_vertex() -> None:
+    for kind in ("square", "triangle"):
+        shape = bake_obstacle(_obstacle(kind))
+
+        assert isinstance(shape.primitive, Polygon)
+        for vertex in shape.primitive.vertices:
+            assert shape.min_x <= vertex.x <= shape.max_x
+            assert shape.min_y <= vertex.y <= shape.max_y
+            distance = math.hypot(vertex.x - 50.0, vertex.y - 40.0)
+            assert distance <= shape.bounding_radius + 1e-9
+
+
+def test_closest_point_matches_geometry_polygon_closest_point() -> None:
+    rng = random.Random(5)
+    shape = bake_obstacle(_obstacle("triangle", rotation=1.1))
+
+    for _ in range(200):
+        point = Position(rng.uniform(20, 80), rng.uniform(10, 70))
+        expected = polygon_closest_point(point, shape.primitive)
+
+        assert closest_point(shape, point.x, point.y) == (expected.x, expected.y)
+
+
+def test_game_state_bakes_obstacles_when_built_directly() -> None:
+    state = GameState(board=Board(width=100, height=80), creatures=[], obstacles=[_obstacle("circle")])
+
+    assert [shape.obstacle for shape in state.obstacle_field.shapes] == state.obstacles
+    assert state.obstacle_field.shapes[0].min_x == 40.0
+
+
+def _row_of_circles(count: int) -> list[Obstacle]:
+    return [
+        Obstacle(
+            kind="circle",
+            pos=Position(10.0 + (index * 30.0), 10.0),
+            size=2.0,
+            rotation=0.0,
+            color=(120, 125, 135),
+        )
+        for index in range(count)
+    ]
+
+
+def test_obstacle_index_only_returns_nearby_obstacles() -> None:
+    field = bake_obstacles(_row_of_circles(20))
+
+    assert field.index is not None
+    assert field.nearby_circle(100.0, 10.0, 5.0) == [3]
+    assert field.nearby(0.0, 0.0, 45.0, 20.0) == [0, 1]
+    assert field.nearby_circle(100.0, 200.0, 5.0) == []
+
+
+def test_indexed_obstacles_still_bounce_creatures() -> None:
+    state = GameState(
+        board=Board(width=700, height=20),
+        creatures=[Creature(id=1, kind=CreatureType.ROCK, pos=Position(304, 10), vx=3.0, vy=0.0)],
+        obstacles=_row_of_circles(20),
+    )
+
+    next_state = step_game(state, None, creature_radius=2.0, encounter_distance=1.0)
+
+    creature = next_state.creatures[0]
+    assert state.obstacle_field.index is not None
+    assert creature.vx == -3.0
+    assert creature.pos.x == 306.0
+
+
+def test_time_of_impact_hits_polygon_face_and_corner() -> None:
+    shape = bake_obstacle(_obstacle("square", rotation=0.0))
+
+    # The left face sits at x=40; a radius-2 circle from x=20 touches it at x=38.
+    assert time_of_impact(shape, 20.0, 40.0, 9.0, 0.0, 2.0) == pytest.approx(2.0)
+    # Heading at the top-left corner (40, 30) along the diagonal.
+    diagonal = math.sqrt(0.5)
+    time = time_of_impact(shape, 30.0, 20.0, diagonal, diagonal, 2.0)
+    assert time == pytest.approx(math.hypot(10.0, 10.0) - 2.0)
+    # Moving away or passing by never touches.
+    assert time_of_impact(shape, 20.0, 40.0, -1.0, 0.0, 2.0) is None
+    assert time_of_impact(shape, 20.0, 10.0, 1.0, 0.0, 2.0) is None
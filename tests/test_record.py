@@ -0,0 +1,72 @@
+import pytest
+
+from sim.app import play_headless, run_headless
+from sim.config import SimConfig
+from sim.record import FrameRecorder
+
+
+def test_recording_writes_a_png_every_few_ticks(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=9, obstacle_count=1, random_seed=4
+    )
+    with FrameRecorder(tmp_path, config, every=10) as recorder:
+        result = play_headless(config, max_ticks=35, recorders=[recorder])
+
+    frames = sorted(path.name for path in tmp_path.iterdir())
+    # Ticks 0, 10, 20, 30 and the final tick 35.
+    assert result.ticks == 35
+    assert len(frames) == recorder.frames == 5
+    assert frames[0] == "frame-0000000.png"
+
+
+@pytest.mark.parametrize("engine", ["inplace", "kinetic"])
+def test_raw_recording_appends_fixed_size_frames(tmp_path, engine: str) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=9, obstacle_count=1, random_seed=4
+    )
+    with FrameRecorder(tmp_path, config, every=7, image_format="raw") as recorder:
+        play_headless(config, max_ticks=30, engine=engine, recorders=[recorder])
+
+    frame_bytes = config.window_width * config.window_height * 3
+    assert recorder.frames >= 5
+    assert (tmp_path / "frames.rgb").stat().st_size == recorder.frames * frame_bytes
+
+
+def test_writer_errors_surface_on_the_simulation_side(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=9, obstacle_count=1, random_seed=4
+    )
+    recorder = FrameRecorder(tmp_path / "frames", config, queue_frames=1)
+    # Replace the output directory with a file so every PNG save fails.
+    (tmp_path / "frames").rmdir()
+    (tmp_path / "frames").write_text("")
+
+    with pytest.raises(RuntimeError, match="Writing frames"):
+        play_headless(config, max_ticks=50, recorders=[recorder])
+        recorder.close()
+
+
+def test_run_headless_finishes_every_output_when_a_recorder_fails(tmp_path, monkeypatch) -> None:
+    close = FrameRecorder.close
+
+    def failing_close(recorder: FrameRecorder) -> int:
+        close(recorder)
+        raise RuntimeError("Writing frames failed")
+
+    monkeypatch.setattr(FrameRecorder, "close", failing_close)
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=9, obstacle_count=1, random_seed=4
+    )
+
+    with pytest.raises(RuntimeError, match="Writing frames"):
+        run_headless(
+            config,
+            max_ticks=20,
+            record=tmp_path / "frames",
+            save_replay=tmp_path / "game.rpsr",
+            metrics_out=tmp_path / "metrics.jsonl",
+        )
+
+    # The replay still got its seek index, and the buffered metrics reached the file.
+    assert (tmp_path / "game.rpsr").read_bytes().endswith(b"RPSI")
+    assert len((tmp_path / "metrics.jsonl").read_text().splitlines()) == 21
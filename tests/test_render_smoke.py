@@ -2,9 +2,12 @@ import os
 
 import pygame
 
+import sim.render
 from sim.config import SimConfig
-from sim.game import create_game
-from sim.render import draw_state
+from sim.game import create_game, step_game
+from sim.render import DirtyRects, LevelOfDetail, draw_state, draw_state_dirty
+from sim.rps import CreatureType
+from sim.stats import TickStats
 
 
 def test_draw_state_smoke() -> None:
@@ -44,3 +47,136 @@ def test_draw_state_with_debug_boundaries_smoke() -> None:
         assert screen.get_size() == (config.window_width, config.window_height)
     finally:
         pygame.quit()
+
+
+def test_draw_state_with_tick_stats_smoke() -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        config = SimConfig(board_width=6, board_height=4, cell_size=16, creature_count=5, obstacle_count=2)
+        screen = pygame.display.set_mode((config.window_width, config.window_height))
+        state = create_game(config)
+
+        stats = TickStats()
+        state = step_game(state, None, stats=stats)
+        draw_state(screen, state, config, tick_stats=stats)
+        pygame.display.flip()
+
+        assert screen.get_size() == (config.window_width, config.window_height)
+    finally:
+        pygame.quit()
+
+
+def test_static_layer_is_reused_until_a_new_game_arrives() -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        config = SimConfig(board_width=6, board_height=4, cell_size=16, creature_count=5, obstacle_count=2)
+        screen = pygame.display.set_mode((config.window_width, config.window_height))
+        state = create_game(config)
+
+        draw_state(screen, state, config)
+        layer = sim.render._static_layer[2]
+        draw_state(screen, step_game(state, None), config)
+        assert sim.render._static_layer[2] is layer
+
+        draw_state(screen, create_game(config), config)
+        assert sim.render._static_layer[2] is not layer
+    finally:
+        pygame.quit()
+
+
+def test_dirty_rect_frames_match_full_redraws() -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        config = SimConfig(board_width=40, board_height=30, cell_size=16, creature_count=12, random_seed=3)
+        screen = pygame.display.set_mode((config.window_width, config.window_height))
+        reference = screen.copy()
+        state = create_game(config)
+        dirty = DirtyRects()
+
+        assert draw_state_dirty(screen, state, config, dirty) == [screen.get_rect()]
+        for _ in range(5):
+            state = step_game(state, None, dt_seconds=0.2)
+            rects = draw_state_dirty(screen, state, config, dirty)
+            draw_state(reference, state, config)
+
+            assert rects != [screen.get_rect()]
+            assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(reference, "RGB")
+    finally:
+        pygame.quit()
+
+
+def test_radius_buckets_are_exact_when_small_and_close_when_large() -> None:
+    assert [sim.render.radius_bucket(radius) for radius in (0.2, 1, 7.4, 15, 20)] == [1, 1, 7, 15, 20]
+    for radius in range(16, 5000):
+        assert abs(sim.render.radius_bucket(radius) - radius) <= radius / 16
+    # Eight doublings from 16 to 4096 px, plus 4096 itself for the radii just below it.
+    assert len({sim.render.radius_bucket(radius) for radius in range(16, 4096)}) == (8 * 8) + 1
+
+
+def test_sprite_atlas_builds_each_bucket_once_without_disk_io(monkeypatch) -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        monkeypatch.setattr(pygame.image, "save", None)
+        monkeypatch.setattr(pygame.image, "load", None)
+        atlas = sim.render.SpriteAtlas()
+
+        sprite = atlas.sprite(CreatureType.ROCK, 40.2)
+        assert atlas.sprite(CreatureType.ROCK, 39.6) is sprite
+        assert sprite.get_size() == (80, 80)
+        for radius in range(20, 200):
+            atlas.sprite(CreatureType.PAPER, radius + 0.5)
+
+        assert len(atlas.sprites) == 1 + len({sim.render.radius_bucket(r + 0.5) for r in range(20, 200)})
+        assert atlas.memory_bytes == sum(
+            sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+            for sprite in atlas.sprites.values()
+        )
+    finally:
+        pygame.quit()
+
+
+def test_level_of_detail_switches_with_hysteresis_and_can_be_forced() -> None:
+    lod = LevelOfDetail(dots_above=100, heatmap_above=1_000, hysteresis=0.8)
+
+    assert lod.update(100) == "sprites"
+    assert lod.update(101) == "dots"
+    # Dropping just under the threshold keeps the current level...
+    assert lod.update(90) == "dots"
+    # ...until the count falls below the hysteresis band.
+    assert lod.update(79) == "sprites"
+    assert lod.update(5_000) == "heatmap"
+    assert lod.update(850) == "heatmap"
+    assert lod.update(500) == "dots"
+
+    assert [lod.cycle() for _ in range(4)] == ["sprites", "dots", "heatmap", "auto"]
+    lod.cycle()
+    assert lod.update(5_000) == "sprites"
+
+
+def test_low_detail_levels_draw_kind_colors() -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        config = SimConfig(
+            board_width=20, board_height=15, cell_size=16, creature_count=60, obstacle_count=0, random_seed=3
+        )
+        screen = pygame.display.set_mode((config.window_width, config.window_height))
+        state = create_game(config)
+        creature = state.creatures[0]
+        center = (int(creature.pos.x), int(creature.pos.y))
+
+        draw_state(screen, state, config, lod=LevelOfDetail(forced="dots"))
+        assert screen.get_at(center)[:3] == sim.render._COLOR_BY_TYPE[creature.kind]
+
+        draw_state(screen, state, config, lod=LevelOfDetail(forced="heatmap"))
+        assert screen.get_at(center)[:3] != sim.render._BG_COLOR
+
+        # The dirty-rect path hands low-detail frames to a full redraw.
+        rects = draw_state_dirty(screen, state, config, DirtyRects(), lod=LevelOfDetail(forced="dots"))
+        assert rects == [screen.get_rect()]
+    finally:
+        pygame.quit()
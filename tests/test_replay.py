@@ -0,0 +1,115 @@
+from dataclasses import replace
+import random
+
+import pytest
+
+from sim.app import play_headless
+from sim.config import SimConfig
+from sim.game import create_game, step_game
+from sim.replay import MAX_RADIUS, Replay, ReplayWriter
+
+
+def _record(path, config: SimConfig, ticks: int, every: int = 1, close: bool = True) -> list:
+    state = create_game(config)
+    rng = random.Random(config.random_seed)
+    states = []
+    writer = ReplayWriter(path, every=every)
+    for _ in range(ticks):
+        writer.capture(state)
+        states.append(state)
+        state = step_game(
+            state,
+            rng,
+            convert_loser_to_winner=config.convert_loser_to_winner,
+            grow_on_win=config.grow_on_win,
+            encounter_distance=config.creature_radius * 2,
+        )
+    if close:
+        writer.finish(state)
+        writer.close()
+    else:
+        writer._file.flush()
+    states.append(state)
+    return states
+
+
+def test_replay_frames_match_the_game_within_quantization(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20,
+        board_height=15,
+        cell_size=16,
+        creature_count=12,
+        obstacle_count=3,
+        random_seed=5,
+        grow_on_win=True,
+    )
+    states = _record(tmp_path / "game.rpsr", config, ticks=60)
+
+    with Replay(tmp_path / "game.rpsr") as replay:
+        assert list(replay.ticks) == list(range(61))
+        assert replay.board == states[0].board
+        assert replay.obstacles == states[0].obstacles
+        for index in (0, 17, 60):
+            original = states[index]
+            replayed = replay.state(index)
+            assert replayed.tick == original.tick
+            assert replayed.kind_counts == original.kind_counts
+            for got, want in zip(replayed.creatures, original.creatures, strict=True):
+                assert (got.id, got.kind) == (want.id, want.kind)
+                assert abs(got.pos.x - want.pos.x) < 0.01
+                assert abs(got.pos.y - want.pos.y) < 0.01
+                assert abs(got.radius - want.radius) <= 1 / 32
+
+
+def test_replay_seeks_to_the_last_frame_at_or_before_a_tick(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=12, obstacle_count=3, random_seed=5
+    )
+    _record(tmp_path / "game.rpsr", config, ticks=25, every=10)
+
+    with Replay(tmp_path / "game.rpsr") as replay:
+        assert list(replay.ticks) == [0, 10, 20, 25]
+        assert replay.state_at_tick(19).tick == 10
+        assert replay.state_at_tick(1_000).tick == 25
+
+
+def test_unfinished_recordings_are_indexed_by_walking_the_frames(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=12, obstacle_count=3, random_seed=5
+    )
+    states = _record(tmp_path / "cut.rpsr", config, ticks=30, close=False)
+
+    with Replay(tmp_path / "cut.rpsr") as replay:
+        assert len(replay) == 30
+        assert [c.id for c in replay.state(29).creatures] == [c.id for c in states[29].creatures]
+
+
+def test_headless_runs_can_save_a_replay(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=12, obstacle_count=3, random_seed=5
+    )
+    with ReplayWriter(tmp_path / "headless.rpsr", every=5) as writer:
+        result = play_headless(config, max_ticks=42, engine="inplace", recorders=[writer])
+
+    with Replay(tmp_path / "headless.rpsr") as replay:
+        assert replay.ticks[-1] == result.ticks == 42
+        assert replay.state(len(replay) - 1).kind_counts == result.counts
+
+
+def test_replay_keeps_radii_past_uint16_and_rejects_overflowing_ones(tmp_path) -> None:
+    config = SimConfig(
+        board_width=20, board_height=15, cell_size=16, creature_count=3, obstacle_count=3, random_seed=5
+    )
+    state = create_game(config)
+    grown = replace(state.creatures[0], radius=5000.25)
+    state = replace(state, creatures=[grown, *state.creatures[1:]])
+    with ReplayWriter(tmp_path / "game.rpsr") as writer:
+        writer.write(state)
+
+    with Replay(tmp_path / "game.rpsr") as replay:
+        assert replay.state(0).creatures[0].radius == 5000.25
+
+    huge = replace(state, creatures=[replace(grown, radius=MAX_RADIUS * 2), *state.creatures[1:]])
+    with ReplayWriter(tmp_path / "huge.rpsr") as writer:
+        with pytest.raises(ValueError, match="radius"):
+            writer.write(huge)
@@ -0,0 +1,101 @@
+from dataclasses import replace
+import math
+import random
+
+from sim.board import Board, Obstacle, Position
+from sim.config import SimConfig
+from sim.creature import Creature
+from sim.game import GameState, create_game, step_game
+from sim.geometry import Circle, circle_circle_overlap, circle_polygon_overlap
+from sim.obstacles import bake_obstacle, index_shapes
+from sim.rps import CreatureType
+from sim.sdf import bake_distance_field, signed_distance
+
+
+def _shapes():
+    return tuple(
+        bake_obstacle(
+            Obstacle(kind=kind, pos=pos, size=12.0, rotation=0.7, color=(120, 125, 135))
+        )
+        for kind, pos in (
+            ("square", Position(40.0, 40.0)),
+            ("triangle", Position(90.0, 50.0)),
+            ("circle", Position(60.0, 100.0)),
+        )
+    )
+
+
+def test_sampled_distance_stays_within_documented_bound() -> None:
+    shapes = _shapes()
+    sdf = bake_distance_field(shapes, Board(width=140, height=140), spacing=3.0, band=40.0)
+    rng = random.Random(2)
+
+    for _ in range(500):
+        x = rng.uniform(0, 140)
+        y = rng.uniform(0, 140)
+        exact = min(signed_distance(shape, x, y) for shape in shapes)
+        sampled, _, _ = sdf.sample(x, y)
+        assert abs(sampled - min(exact, sdf.band)) <= sdf.max_error + 1e-9
+
+
+def test_penetration_agrees_with_exact_overlap_outside_error_band() -> None:
+    shapes = _shapes()
+    sdf = bake_distance_field(shapes, Board(width=140, height=140), spacing=3.0, band=40.0)
+    rng = random.Random(3)
+    radius = 8.0
+
+    for _ in range(500):
+        circle = Circle(center=Position(rng.uniform(0, 140), rng.uniform(0, 140)), radius=radius)
+        exact_hit = any(
+            circle_circle_overlap(circle, shape.primitive)
+            if isinstance(shape.primitive, Circle)
+            else circle_polygon_overlap(circle, shape.primitive)
+            for shape in shapes
+        )
+        distance, _, _ = sdf.sample(circle.center.x, circle.center.y)
+        if exact_hit:
+            assert radius - distance >= -sdf.max_error - 1e-9
+        if distance <= radius - sdf.max_error:
+            assert exact_hit
+
+
+def test_sdf_gradient_points_away_from_obstacle() -> None:
+    shapes = _shapes()
+    sdf = bake_distance_field(shapes, Board(width=140, height=140), spacing=2.0, band=30.0)
+
+    _, gradient_x, gradient_y = sdf.sample(60.0 + 15.0, 100.0)
+
+    assert gradient_x > 0.9
+    assert abs(gradient_y) < 0.1
+
+
+def test_sdf_mode_pushes_creature_out_of_obstacle() -> None:
+    shapes = _shapes()
+    board = Board(width=140, height=140)
+    field = index_shapes(shapes)
+    sdf = bake_distance_field(shapes, board, spacing=2.0, band=30.0)
+    state = GameState(
+        board=board,
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(60.0, 86.0), vx=0.0, vy=10.0, radius=5),
+        ],
+        obstacles=[shape.obstacle for shape in shapes],
+        obstacle_field=replace(field, sdf=sdf),
+    )
+
+    creature = step_game(state, None, dt_seconds=0.1).creatures[0]
+
+    assert math.hypot(creature.pos.x - 60.0, creature.pos.y - 100.0) >= 12.0 + 5.0 - sdf.max_error
+    assert creature.vy < 0
+
+
+def test_create_game_bakes_sdf_only_when_requested() -> None:
+    exact = create_game(SimConfig(creature_count=5, random_seed=1))
+    sdf = create_game(
+        SimConfig(creature_count=5, random_seed=1, obstacle_collision="sdf", sdf_resolution=8.0)
+    )
+
+    assert exact.obstacle_field.sdf is None
+    assert sdf.obstacle_field.sdf is not None
+    assert sdf.obstacle_field.sdf.spacing == 8.0
+    assert [c.pos for c in sdf.creatures] == [c.pos for c in exact.creatures]
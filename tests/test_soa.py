@@ -0,0 +1,111 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from sim.board import Board, Obstacle, Position
+from sim.config import SimConfig
+from sim.creature import Creature
+from sim.game import GameState, create_game, step_game
+from sim.rps import CreatureType
+from sim.soa import step_array_state, to_array_state, to_game_state
+
+
+def test_array_state_round_trips_game_state(snapshot) -> None:
+    state = create_game(SimConfig(creature_count=12, random_seed=4))
+
+    restored = to_game_state(to_array_state(state))
+
+    assert snapshot(restored) == snapshot(state)
+
+
+@pytest.mark.parametrize("convert", [True, False])
+@pytest.mark.parametrize("grow", [False, True])
+def test_step_array_state_matches_step_game(convert: bool, grow: bool, snapshot) -> None:
+    config = SimConfig(
+        board_width=12,
+        board_height=10,
+        creature_count=60,
+        random_seed=8,
+        obstacle_count=4,
+        creature_mass=3,
+    )
+    state = create_game(config)
+    array_state = to_array_state(state)
+    options = dict(
+        convert_loser_to_winner=convert,
+        grow_on_win=grow,
+        encounter_distance=config.creature_radius * 2,
+        dt_seconds=1.0 / 20.0,
+    )
+
+    for _ in range(30):
+        state = step_game(state, None, **options)
+        array_state = step_array_state(array_state, **options)
+
+    assert snapshot(to_game_state(array_state)) == snapshot(state)
+
+
+def test_step_array_state_matches_step_game_with_sdf_obstacles(snapshot) -> None:
+    config = SimConfig(
+        board_width=12,
+        board_height=10,
+        creature_count=60,
+        random_seed=3,
+        obstacle_count=6,
+        obstacle_collision="sdf",
+    )
+    state = create_game(config)
+    array_state = to_array_state(state)
+    options = dict(grow_on_win=True, encounter_distance=config.creature_radius * 2, dt_seconds=1.0 / 20.0)
+
+    for _ in range(30):
+        state = step_game(state, None, **options)
+        array_state = step_array_state(array_state, **options)
+
+    assert snapshot(to_game_state(array_state)) == snapshot(state)
+
+
+def test_step_array_state_matches_step_game_for_centers_inside_obstacles(snapshot) -> None:
+    creatures = [
+        Creature(id=index, kind=CreatureType.ROCK, pos=Position(25.0 + index, 26.5), vx=1.0, radius=2.0)
+        for index in range(8)
+    ]
+    obstacles = [
+        Obstacle(kind=kind, pos=Position(28, 28), size=6.0, rotation=0.4, color=(0, 0, 0))
+        for kind in ("square", "triangle")
+    ]
+    for obstacle in obstacles:
+        state = GameState(board=Board(width=60, height=60), creatures=creatures, obstacles=[obstacle])
+        array_state = to_array_state(state)
+
+        state = step_game(state, None, dt_seconds=0.0)
+        array_state = step_array_state(array_state, dt_seconds=0.0)
+
+        assert snapshot(to_game_state(array_state)) == snapshot(state)
+
+
+def test_step_array_state_removes_loser_when_conversion_disabled() -> None:
+    state = GameState(
+        board=Board(width=3, height=3),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(1, 1)),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(1, 1)),
+        ],
+    )
+
+    next_state = step_array_state(to_array_state(state), convert_loser_to_winner=False)
+
+    assert [c.kind for c in to_game_state(next_state).creatures] == [CreatureType.ROCK]
+
+
+def test_run_headless_array_engine_reports_winner(capsys) -> None:
+    from sim.app import run_headless
+
+    winner = run_headless(
+        config=SimConfig(creature_count=1, random_seed=1),
+        max_ticks=10,
+        engine="array",
+    )
+
+    assert winner in set(CreatureType)
+    assert "Winner:" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+import random
+
+from sim.spatial import SpatialHash
+
+
+def _grid(rng: random.Random) -> SpatialHash:
+    grid = SpatialHash(cell_size=10)
+    for item in range(40):
+        x, y = rng.uniform(-50, 50), rng.uniform(-50, 50)
+        grid.insert_bounds(item, x, y, x + rng.uniform(0, 25), y + rng.uniform(0, 25))
+    return grid
+
+
+def _brute_force(grid: SpatialHash, min_x: float, min_y: float, max_x: float, max_y: float) -> set[int]:
+    min_cx, min_cy = grid.cell_of(min_x, min_y)
+    max_cx, max_cy = grid.cell_of(max_x, max_y)
+    return {
+        item
+        for cx in range(min_cx, max_cx + 1)
+        for cy in range(min_cy, max_cy + 1)
+        for item in grid.cells.get((cx, cy), ())
+    }
+
+
+def test_query_bounds_matches_cell_walk_for_small_boxes() -> None:
+    rng = random.Random(5)
+    grid = _grid(rng)
+    for _ in range(100):
+        x, y = rng.uniform(-60, 60), rng.uniform(-60, 60)
+        box = (x, y, x + rng.uniform(0, 15), y + rng.uniform(0, 15))
+        assert grid.query_bounds(*box) == _brute_force(grid, *box)
+
+
+def test_query_bounds_with_oversized_or_distant_boxes() -> None:
+    grid = _grid(random.Random(6))
+    everything = {item for items in grid.cells.values() for item in items}
+
+    # These span far more cells than the grid holds, so they take the occupied-cell walk.
+    assert grid.query_bounds(-1e7, -1e7, 1e7, 1e7) == everything
+    lower_half = {item for (_, cy), items in grid.cells.items() if cy <= 0 for item in items}
+    assert grid.query_bounds(-1e7, -1e7, 1e7, 0) == lower_half
+    assert grid.query_bounds(-1e7, 0, -60, 1e7) == set()
+    assert grid.query_bounds(1e6, 1e6, 1e7, 1e7) == set()
+    assert grid.query_bounds(1e6, 1e6, 1e6 + 5, 1e6 + 5) == set()
+
+
+def test_query_with_huge_reach_finds_every_item() -> None:
+    grid = SpatialHash(cell_size=4)
+    for item, (x, y) in enumerate([(0, 0), (30, -7), (-90, 12)]):
+        grid.insert(item, x, y)
+
+    assert sorted(grid.query(0, 0, 1e9)) == [0, 1, 2]
+    assert sorted(grid.query(0, 0, 1)) == [0]
+
+
+def test_move_refiles_an_item_under_its_new_cell() -> None:
+    grid = SpatialHash(cell_size=10)
+    grid.insert(1, 5, 5)
+    grid.insert(2, 6, 6)
+
+    grid.move(1, 5, 5, 25, 5)
+    grid.move(2, 6, 6, 8, 8)
+
+    assert grid.query(5, 5, 0) == [2]
+    assert grid.query(25, 5, 0) == [1]
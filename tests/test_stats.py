@@ -0,0 +1,50 @@
+from sim.app import run_headless
+from sim.board import Board, Position
+from sim.config import SimConfig
+from sim.creature import Creature
+from sim.game import GameState, create_game, step_game
+from sim.rps import CreatureType
+from sim.stats import PHASES, TickStats
+
+
+def test_stats_do_not_change_the_simulation() -> None:
+    config = SimConfig(board_width=10, board_height=8, creature_count=40, random_seed=6, obstacle_count=5)
+    plain = create_game(config)
+    profiled = create_game(config)
+    stats = TickStats()
+
+    for _ in range(20):
+        plain = step_game(plain, None, encounter_distance=40.0, dt_seconds=1.0 / 20.0)
+        profiled = step_game(profiled, None, encounter_distance=40.0, dt_seconds=1.0 / 20.0, stats=stats)
+
+    assert profiled.creatures == plain.creatures
+    assert profiled.active_collision_pairs == plain.active_collision_pairs
+    assert stats.ticks == 20
+    assert set(stats.phase_seconds) == set(PHASES)
+    assert stats.total_seconds > 0.0
+    assert stats.candidate_pairs >= stats.narrow_tests >= stats.overlaps > 0
+    assert stats.obstacle_tests > 0
+
+
+def test_stats_count_conversions_and_bounces() -> None:
+    state = GameState(
+        board=Board(width=20, height=20),
+        creatures=[
+            Creature(id=1, kind=CreatureType.ROCK, pos=Position(10, 10), radius=2),
+            Creature(id=2, kind=CreatureType.SCISSORS, pos=Position(11, 10), radius=2),
+        ],
+    )
+    stats = TickStats()
+
+    step_game(state, None, dt_seconds=0.0, stats=stats)
+
+    assert (stats.narrow_tests, stats.overlaps, stats.bounces, stats.conversions) == (1, 1, 1, 1)
+    assert "ms/tick" in stats.summary_lines()[0]
+
+
+def test_run_headless_profile_prints_phase_summary(capsys) -> None:
+    run_headless(SimConfig(creature_count=6, random_seed=2), max_ticks=5, profile=True)
+
+    output = capsys.readouterr().out
+    for phase in PHASES:
+        assert phase in output
@@ -0,0 +1,41 @@
+from sim.config import SimConfig
+from sim.rps import CreatureType
+from sim.tournament import GameResult, TournamentSummary, format_summary, run_tournament
+
+
+def test_summary_counts_wins_and_timeouts() -> None:
+    summary = TournamentSummary()
+
+    summary.add(GameResult(seed=0, winner=CreatureType.ROCK, ticks=10))
+    summary.add(GameResult(seed=1, winner=CreatureType.ROCK, ticks=30))
+    summary.add(GameResult(seed=2, winner=None, ticks=50))
+    summary.add(GameResult(seed=3, winner=CreatureType.PAPER, ticks=20))
+
+    assert summary.runs == 4
+    assert summary.timeouts == 1
+    assert summary.win_rate(CreatureType.ROCK) == 0.5
+    assert summary.win_rate(CreatureType.SCISSORS) == 0.0
+    assert summary.tick_percentiles()["p50"] == 20
+    assert "timeouts: 1" in format_summary(summary)
+
+
+def test_tournament_plays_consecutive_seeds_and_streams_results() -> None:
+    seen: list[GameResult] = []
+    config = SimConfig(board_width=10, board_height=8, creature_count=12, obstacle_count=2, random_seed=5)
+
+    summary = run_tournament(config, runs=4, workers=1, max_ticks=300, on_result=seen.append)
+
+    assert sorted(result.seed for result in seen) == [5, 6, 7, 8]
+    assert summary.runs == 4
+    assert summary.timeouts + sum(summary.wins.values()) == 4
+
+
+def test_process_pool_matches_serial_results() -> None:
+    serial: list[GameResult] = []
+    pooled: list[GameResult] = []
+    config = SimConfig(board_width=10, board_height=8, creature_count=12, obstacle_count=2, random_seed=5)
+
+    run_tournament(config, runs=4, workers=1, max_ticks=300, on_result=serial.append)
+    run_tournament(config, runs=4, workers=2, max_ticks=300, on_result=pooled.append)
+
+    assert sorted(pooled, key=lambda r: r.seed) == serial
@@ -0,0 +1,101 @@
+import time
+from collections import Counter
+
+from sim import worker
+from sim.config import SimConfig
+from sim.game import create_game, creature_counts, step_game
+from sim.rps import CreatureType
+from sim.worker import (
+    _STAMP,
+    SimulationProcess,
+    _buffer_offset,
+    _buffer_size,
+    _publish,
+    _read_buffer,
+    _write_buffer,
+)
+
+
+def test_snapshot_buffer_round_trips_creatures() -> None:
+    state = step_game(create_game(SimConfig(creature_count=9, random_seed=3)), None)
+    capacity = len(state.creatures)
+    buf = memoryview(bytearray(64 + (2 * _buffer_size(capacity))))
+
+    _write_buffer(buf, capacity, 1, state, CreatureType.PAPER)
+    tick, creatures, kind_counts, winner = _read_buffer(buf, capacity, 1)
+
+    assert tick == state.tick
+    assert kind_counts == state.kind_counts
+    assert winner is CreatureType.PAPER
+    assert [(c.id, c.kind, c.pos, c.radius) for c in creatures] == [
+        (c.id, c.kind, c.pos, c.radius) for c in state.creatures
+    ]
+
+
+def test_simulation_process_publishes_ticks() -> None:
+    config = SimConfig(board_width=10, board_height=8, creature_count=20, random_seed=4, fps=240)
+    state = create_game(config)
+    simulation = SimulationProcess(state, config)
+    try:
+        assert simulation.latest().state.tick == 0
+        simulation.start()
+        simulation.set_speed(2.0)
+        deadline = time.monotonic() + 10.0
+        snapshot = simulation.latest()
+        while snapshot.state.tick < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            snapshot = simulation.latest()
+    finally:
+        simulation.close()
+
+    assert snapshot.state.tick >= 5
+    assert len(snapshot.state.creatures) == 20
+    assert creature_counts(snapshot.state) == Counter(c.kind for c in snapshot.state.creatures)
+    assert snapshot.state.obstacles == state.obstacles
+
+
+class _WorkerRacesTheCopy:
+    """Stands in for the buffer header struct; the first read lets the "worker" run first.
+
+    The worker publishes tick 1 into the other buffer, then starts overwriting
+    the buffer being read with tick 2 and is caught halfway through.
+    """
+
+    def __init__(self, header, buf, capacity: int, states) -> None:
+        self.header = header
+        self.size = header.size
+        self.pack_into = header.pack_into
+        self.buf = buf
+        self.capacity = capacity
+        self.states = states
+
+    def unpack_from(self, buf, offset):
+        if self.states:
+            first, second = self.states
+            self.states = None
+            _publish(self.buf, self.capacity, first, None)
+            stamp_offset = _buffer_offset(self.capacity, 0)
+            (stamp,) = _STAMP.unpack_from(self.buf, stamp_offset)
+            _write_buffer(self.buf, self.capacity, 0, second, None)
+            _STAMP.pack_into(self.buf, stamp_offset, stamp + 1)
+        return self.header.unpack_from(buf, offset)
+
+
+def test_latest_rejects_a_buffer_overwritten_during_the_copy(monkeypatch) -> None:
+    config = SimConfig(board_width=10, board_height=8, creature_count=20, random_seed=4)
+    state = create_game(config)
+    first = step_game(state, None)
+    second = step_game(first, None)
+    simulation = SimulationProcess(state, config)
+    try:
+        race = _WorkerRacesTheCopy(
+            worker._BUFFER_HEADER, simulation._memory.buf, simulation.capacity, (first, second)
+        )
+        monkeypatch.setattr(worker, "_BUFFER_HEADER", race)
+        snapshot = simulation.latest()
+    finally:
+        monkeypatch.undo()
+        simulation.close()
+
+    assert snapshot.state.tick == 1
+    assert [c.pos for c in snapshot.state.creatures] == [c.pos for c in first.creatures]